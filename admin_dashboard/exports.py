@@ -0,0 +1,261 @@
+"""
+Streaming CSV and XLSX exports of applications for staff.
+
+Rows are read with QuerySet.iterator(), which uses a server-side cursor on
+PostgreSQL and chunked fetches elsewhere, and encoded as they arrive, so an
+export of a million rows holds one chunk in memory and its first bytes go out
+before the query has finished. XLSX files are written by a small incremental
+writer: the worksheet XML is deflated into a zip stream that is drained after
+every batch of rows, instead of building the workbook in memory.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from applications.models import Application
+
+# Rows fetched per database round trip
+CHUNK_SIZE = 2000
+# Rows encoded before the output is handed to the response
+ROWS_PER_WRITE = 500
+# Rows per worksheet including the header, the most Excel opens; longer exports continue on a new sheet
+MAX_SHEET_ROWS = 1048576
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+STATUS_LABELS = dict(Application.STATUS_CHOICES)
+CATEGORY_LABELS = dict(Application.CATEGORY_CHOICES)
+
+# (header, values_list field, labels of the stored values or None) per export
+APPLICATION_COLUMNS = [
+    ('Application #', 'application_number', None),
+    ('IIN', 'applicant__iin', None),
+    ('First Name', 'applicant__first_name', None),
+    ('Last Name', 'applicant__last_name', None),
+    ('Status', 'status', STATUS_LABELS),
+    ('Category', 'category', CATEGORY_LABELS),
+    ('Submission Date', 'submission_date', None),
+    ('Priority Score', 'priority_score', None),
+    ('Queue Rank', 'queue_rank', None),
+]
+QUEUE_COLUMNS = [
+    ('Queue Rank', 'queue_rank', None),
+    ('Application #', 'application_number', None),
+    ('IIN', 'applicant__iin', None),
+    ('First Name', 'applicant__first_name', None),
+    ('Last Name', 'applicant__last_name', None),
+    ('Category', 'category', CATEGORY_LABELS),
+    ('Priority Score', 'priority_score', None),
+    ('Submission Date', 'submission_date', None),
+]
+HISTORY_COLUMNS = [
+    ('Date', 'change_date', None),
+    ('Application #', 'application__application_number', None),
+    ('IIN', 'application__applicant__iin', None),
+    ('Previous Status', 'previous_status', STATUS_LABELS),
+    ('New Status', 'new_status', STATUS_LABELS),
+    ('Changed By', 'changed_by__email', None),
+    ('Notes', 'notes', None),
+]
+
+# Characters XML 1.0 does not allow, even escaped
+XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+# Leading characters spreadsheet programs read as a formula in a CSV cell
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_rows(queryset, columns):
+    """The header, then one tuple per row of `queryset`, streamed from the database in chunks"""
+    yield [header for header, _, _ in columns]
+    fields = [field for _, field, _ in columns]
+    labels = [(i, choices) for i, (_, _, choices) in enumerate(columns) if choices]
+    for row in queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        if labels:
+            row = list(row)
+            for i, choices in labels:
+                row[i] = choices.get(row[i], row[i])
+        yield row
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+def stream_csv(rows):
+    """UTF-8 CSV of `rows`, ROWS_PER_WRITE rows per chunk; text cells can't start a formula"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # A byte order mark makes Excel read the file as UTF-8
+    yield '\ufeff'.encode()
+    for n, row in enumerate(rows, 1):
+        writer.writerow([
+            f"'{text}" if isinstance(value, str) and text.startswith(FORMULA_PREFIXES) else text
+            for value, text in ((value, _cell_text(value)) for value in row)
+        ])
+        if n == 1 or n % ROWS_PER_WRITE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _Drain:
+    """Write-only file whose contents are taken by the caller after every write to the zip"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _column_name(index):
+    """Spreadsheet column letters of a 0-based index: A, B, ..., Z, AA, ..."""
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+def _xlsx_row(number, row):
+    cells = []
+    for i, value in enumerate(row):
+        if value is None:
+            continue
+        ref = f'{_column_name(i)}{number}'
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(XML_ILLEGAL.sub('', _cell_text(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+
+def _package_parts(sheet_names):
+    """The XLSX parts besides the worksheets, for sheets xl/worksheets/sheet1.xml onwards"""
+    numbers = range(1, len(sheet_names) + 1)
+    overrides = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for n in numbers
+    )
+    sheets = ''.join(
+        f'<sheet name={quoteattr(name)} sheetId="{n}" r:id="rId{n}"/>' for n, name in zip(numbers, sheet_names)
+    )
+    relationships = ''.join(
+        f'<Relationship Id="rId{n}" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{n}.xml"/>'
+        for n in numbers
+    )
+    declaration = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    return {
+        '[Content_Types].xml': (
+            f'{declaration}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{overrides}</Types>'
+        ),
+        '_rels/.rels': (
+            f'{declaration}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ),
+        'xl/workbook.xml': (
+            f'{declaration}<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            f'{declaration}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relationships}</Relationships>'
+        ),
+    }
+
+
+def stream_xlsx(rows, title='Sheet'):
+    """
+    XLSX workbook of `rows`, the first of them being the header, written as
+    it is read. Rows past MAX_SHEET_ROWS continue on sheets "<title> 2" and
+    so on, each starting with the header again.
+    """
+    drain = _Drain()
+    rows = iter(rows)
+    header = next(rows)
+    sheet_names = []
+
+    # Without seek() on the output, zipfile writes sizes and CRCs after each part's data
+    with zipfile.ZipFile(drain, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+        def open_sheet():
+            sheet_names.append(title if not sheet_names else f'{title} {len(sheet_names) + 1}')
+            sheet = package.open(f'xl/worksheets/sheet{len(sheet_names)}.xml', 'w')
+            sheet.write((SHEET_START + _xlsx_row(1, header)).encode())
+            return sheet
+
+        sheet = open_sheet()
+        number = 1
+        # The response starts before the query runs
+        yield drain.take()
+        lines = []
+        for row in rows:
+            if number == MAX_SHEET_ROWS:
+                sheet.write((''.join(lines) + SHEET_END).encode())
+                sheet.close()
+                sheet = open_sheet()
+                number = 1
+                lines = []
+            number += 1
+            lines.append(_xlsx_row(number, row))
+            if len(lines) >= ROWS_PER_WRITE:
+                sheet.write(''.join(lines).encode())
+                lines = []
+                yield drain.take()
+        sheet.write((''.join(lines) + SHEET_END).encode())
+        sheet.close()
+        for name, content in _package_parts(sheet_names).items():
+            package.writestr(name, content)
+    yield drain.take()
+
+
+def export_response(rows, filename, file_format, title='Sheet'):
+    """StreamingHttpResponse downloading `rows` (header first) as `filename`.csv or .xlsx"""
+    content = stream_xlsx(rows, title) if file_format == 'xlsx' else stream_csv(rows)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
@@ -18,6 +18,14 @@ class ApplicationFilterForm(forms.Form):
             'placeholder': 'Application Number'
         })
     )
+    applicant_name = forms.CharField(
+        label='Applicant Name',
+        required=False,
+        widget=forms.TextInput(attrs={
+            'class': 'w-full p-2 border border-gray-300 rounded mt-1', 
+            'placeholder': 'Applicant Name'
+        })
+    )
     status = forms.ChoiceField(
         label='Status',
         required=False,
@@ -5,4 +5,7 @@ app_name = 'dashboard'
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
-]
\ No newline at end of file
+    path('export/applications.<str:file_format>', views.export_applications, name='export_applications'),
+    path('export/queue.<str:file_format>', views.export_queue, name='export_queue'),
+    path('export/history.<str:file_format>', views.export_history, name='export_history'),
+]
@@ -1,40 +1,108 @@
+import hashlib
+from django.conf import settings
+from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import render
-from applications.models import Application
+from django.utils import timezone
+from applications.models import Application, ApplicationHistory
+from .exports import APPLICATION_COLUMNS, CONTENT_TYPES, HISTORY_COLUMNS, QUEUE_COLUMNS, export_response, export_rows
 from .forms import ApplicationFilterForm
-from django.core.paginator import Paginator
+from applications.pagination import KeysetPaginator
+from applications.ranking import RANK_ORDERING
+from applications.search import filter_applications
 
-# Create your views here.
-def dashboard(request):
-    # Initialize the filter form
-    filter_form = ApplicationFilterForm(request.GET or None)
-    
+staff_required = user_passes_test(lambda user: user.is_authenticated and (user.is_staff or user.is_administrator))
+COUNT_KEY = 'dashboard:count:{filters}'
+
+
+def filtered_applications(filter_form):
+    """Applications matching a bound ApplicationFilterForm, all of them if it is empty or invalid"""
     # Start with all applications
-    applications = Application.objects.all().order_by('-priority_score')
+    applications = Application.objects.select_related('applicant')
     
     # Apply filters if form is valid
     if filter_form.is_valid():
         applicant_iin = filter_form.cleaned_data.get('applicant_iin')
         application_number = filter_form.cleaned_data.get('application_number')
+        applicant_name = filter_form.cleaned_data.get('applicant_name')
         status = filter_form.cleaned_data.get('status')
         
         # Apply filters conditionally
         if applicant_iin:
-            applications = applications.filter(applicant__iin__icontains=applicant_iin)
+            applications = filter_applications(applications, 'iin', applicant_iin)
         
         if application_number:
-            applications = applications.filter(application_number__icontains=application_number)
+            applications = filter_applications(applications, 'number', application_number)
+        
+        if applicant_name:
+            applications = filter_applications(applications, 'name', applicant_name)
         
         if status:
             applications = applications.filter(status=status)
+    return applications
+
+
+def filtered_count(filter_form, applications):
+    """Number of filtered applications, cached briefly per set of filters so paging doesn't recount them"""
+    filters = []
+    if filter_form.is_valid():
+        filters = sorted((name, value) for name, value in filter_form.cleaned_data.items() if value)
+    key = COUNT_KEY.format(filters=hashlib.md5(repr(filters).encode()).hexdigest())
+    count = cache.get(key)
+    if count is None:
+        count = applications.count()
+        cache.set(key, count, getattr(settings, 'DASHBOARD_COUNT_CACHE_TIMEOUT', 60))
+    return count
+
+
+# Create your views here.
+def dashboard(request):
+    # Initialize the filter form
+    filter_form = ApplicationFilterForm(request.GET or None)
+    applications = filtered_applications(filter_form)
     
-    # Pagination
-    paginator = Paginator(applications, 10)  # Show 10 applications per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination over the queue ordering
+    paginator = KeysetPaginator(applications, RANK_ORDERING, 10)  # Show 10 applications per page
+    page_obj = paginator.page(request.GET.get('cursor'))
     
     context = {
         'applications': page_obj,
+        'total_count': filtered_count(filter_form, applications),
         'filter_form': filter_form
     }
     
-    return render(request, 'dashboard2.html', context)
\ No newline at end of file
+    return render(request, 'dashboard2.html', context)
+
+
+def _check_format(file_format):
+    if file_format not in CONTENT_TYPES:
+        raise Http404("Unknown export format")
+
+
+def _filename(name):
+    return f"{name}-{timezone.localdate():%Y-%m-%d}"
+
+
+@staff_required
+def export_applications(request, file_format):
+    # The dashboard's filtered results, in queue order, as one streamed file
+    _check_format(file_format)
+    applications = filtered_applications(ApplicationFilterForm(request.GET or None)).order_by(*RANK_ORDERING)
+    return export_response(export_rows(applications, APPLICATION_COLUMNS), _filename('applications'),
+                           file_format, title='Applications')
+
+
+@staff_required
+def export_queue(request, file_format):
+    _check_format(file_format)
+    queue = Application.objects.filter(queue_rank__isnull=False).order_by('queue_rank')
+    return export_response(export_rows(queue, QUEUE_COLUMNS), _filename('queue'), file_format, title='Queue')
+
+
+@staff_required
+def export_history(request, file_format):
+    _check_format(file_format)
+    history = ApplicationHistory.objects.order_by('change_date', 'id')
+    return export_response(export_rows(history, HISTORY_COLUMNS), _filename('application-history'),
+                           file_format, title='History')
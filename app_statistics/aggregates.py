@@ -0,0 +1,217 @@
+import threading
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast
+from .house_data import HOUSE_DATA_PATH, UNIT_DEFAULTS, load_house_data, source_id
+
+# Columns of the statistics frame that charts group by
+DIMENSIONS = ('location', 'size', 'availability', 'area_type', 'bath', 'balcony')
+# Dimensions whose groups are numbers, ordered as such
+NUMERIC_DIMENSIONS = ('bath', 'balcony')
+SUMS = ('count', 'price_sum', 'price_sumsq', 'sqft_sum', 'sqft_sumsq')
+UNIT_FIELDS = ('address', 'rooms_count', 'status', 'total_area')
+
+
+def group_label(value):
+    """Group key as stored; whole floats such as bath counts lose their .0"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def frame_sums(df):
+    """{dimension: DataFrame of SUMS per group} of a statistics frame, in O(rows)"""
+    price = df['price'].to_numpy(dtype=np.float64)
+    sqft = df['sqft'].to_numpy(dtype=np.float64)
+    values = pd.DataFrame({
+        'count': 1, 'price_sum': price, 'price_sumsq': price * price, 'sqft_sum': sqft, 'sqft_sumsq': sqft * sqft,
+    })
+    sums = {}
+    for dimension in DIMENSIONS:
+        grouped = values.groupby(df[dimension].to_numpy(), dropna=True).sum()
+        grouped.index = [group_label(value) for value in grouped.index]
+        sums[dimension] = grouped.groupby(level=0).sum()
+    return sums
+
+
+def group_stats_from_sums(sums, dimension):
+    """count, mean and sample variance of price and square feet per group, in O(groups)"""
+    sums = sums[sums['count'] > 0]
+    count = sums['count']
+    stats = pd.DataFrame({'count': count.astype(np.int64)}, index=sums.index)
+    for measure in ('price', 'sqft'):
+        total = sums[f'{measure}_sum']
+        stats[f'{measure}_mean'] = total / count
+        variance = (sums[f'{measure}_sumsq'] - total * total / count) / (count - 1)
+        # Rounding can take the variance of equal values slightly below zero
+        stats[f'{measure}_var'] = variance.clip(lower=0).where(count > 1)
+    if dimension in NUMERIC_DIMENSIONS:
+        stats.index = stats.index.astype(np.float64)
+    return stats
+
+
+def frame_group_stats(df):
+    return {dimension: group_stats_from_sums(sums, dimension) for dimension, sums in frame_sums(df).items()}
+
+
+_lock = threading.Lock()
+_baseline = None
+
+
+def baseline_sums():
+    """frame_sums of house_data, recomputed only after house_data.csv changes"""
+    global _baseline
+    source = tuple(source_id(HOUSE_DATA_PATH))
+    with _lock:
+        if _baseline is None or _baseline[0] != source:
+            df = load_house_data().dropna(subset=['price', 'sqft'])
+            _baseline = (source, frame_sums(df))
+        return _baseline[1]
+
+
+def group_stats():
+    """
+    {dimension: per-group count, means and variances} of house_data and the
+    housing units together: the cached house_data sums plus the GroupAggregate
+    rows, one query and O(groups) work.
+    """
+    from .models import GroupAggregate
+
+    rows = GroupAggregate.objects.filter(count__gt=0).values_list('dimension', 'group', *SUMS)
+    units = pd.DataFrame(list(rows), columns=['dimension', 'group', *SUMS])
+    stats = {}
+    for dimension, baseline in baseline_sums().items():
+        unit_sums = units[units['dimension'] == dimension].set_index('group')[list(SUMS)]
+        sums = baseline.add(unit_sums, fill_value=0) if len(unit_sums) else baseline
+        stats[dimension] = group_stats_from_sums(sums, dimension)
+    return stats
+
+
+def unit_summary_sums():
+    """summary_sums of the housing units as rows of the statistics frame, in one query"""
+    from housing_units.models import HousingUnit
+
+    area = Cast('total_area', FloatField())
+    totals = HousingUnit.objects.filter(total_area__isnull=False).aggregate(
+        count=Count('id'), sqft=Sum(area), inverse_sqft=Sum(1.0 / area, filter=Q(total_area__gt=0)),
+    )
+    price = float(UNIT_DEFAULTS['price'])
+    return {
+        'count': totals['count'],
+        'price': totals['count'] * price,
+        'sqft': totals['sqft'] or 0.0,
+        'price_per_sqft': (totals['inverse_sqft'] or 0.0) * price * 100000,
+    }
+
+
+def summary_sums(df):
+    """Row count and the price, sqft and price_per_sqft totals of a statistics frame"""
+    return {
+        'count': len(df),
+        'price': float(df['price'].sum()),
+        'sqft': float(df['sqft'].sum()),
+        'price_per_sqft': float(df['price_per_sqft'].sum()),
+    }
+
+
+# Groups every housing unit is in, whatever its fields
+SHARED_UNIT_GROUPS = [
+    ('area_type', UNIT_DEFAULTS['area_type']),
+    ('bath', group_label(float(UNIT_DEFAULTS['bath']))),
+    ('balcony', group_label(float(UNIT_DEFAULTS['balcony']))),
+]
+
+
+def unit_groups(address, rooms_count, status):
+    """The (dimension, group) pairs of a housing unit laid out as a house_data.csv row"""
+    return [('location', address), ('size', f'{int(rooms_count)} BHK'), ('availability', status), *SHARED_UNIT_GROUPS]
+
+
+def _contribution(sqft, sign=1):
+    price = float(UNIT_DEFAULTS['price'])
+    sqft = float(sqft)
+    return sign * np.array([1, price, price * price, sqft, sqft * sqft])
+
+
+def unit_deltas(previous=None, current=None):
+    """Changes to the sums when a unit goes from `previous` to `current` (UNIT_FIELDS rows, None if absent)"""
+    deltas = defaultdict(lambda: np.zeros(len(SUMS)))
+    for row, sign in ((previous, -1), (current, 1)):
+        if row is None:
+            continue
+        address, rooms_count, status, total_area = row
+        for key in unit_groups(address, rooms_count, status):
+            deltas[key] += _contribution(total_area, sign)
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Add `deltas` ({(dimension, group): SUMS}) to the GroupAggregate rows, creating missing ones"""
+    from .models import GroupAggregate
+
+    deltas = {key: delta for key, delta in deltas.items() if delta.any()}
+    if not deltas:
+        return
+    with transaction.atomic():
+        GroupAggregate.objects.bulk_create(
+            [GroupAggregate(dimension=dimension, group=group) for dimension, group in deltas],
+            ignore_conflicts=True,
+        )
+        for (dimension, group), delta in deltas.items():
+            # F() expressions keep concurrent updates of the same group from overwriting each other
+            GroupAggregate.objects.filter(dimension=dimension, group=group).update(**{
+                name: F(name) + (int(value) if name == 'count' else float(value))
+                for name, value in zip(SUMS, delta)
+            })
+
+
+def move_units(unit_ids, previous_status, status):
+    """Move units from one availability group to another after a queryset update of their status"""
+    from housing_units.models import HousingUnit
+
+    deltas = defaultdict(lambda: np.zeros(len(SUMS)))
+    for total_area in HousingUnit.objects.filter(id__in=unit_ids).values_list('total_area', flat=True):
+        deltas[('availability', previous_status)] += _contribution(total_area, -1)
+        deltas[('availability', status)] += _contribution(total_area)
+    apply_deltas(deltas)
+
+
+def rebuild_unit_aggregates(unit_model=None, aggregate_model=None):
+    """
+    Recompute every GroupAggregate row from the housing units, with one
+    GROUP BY query per dimension. Used after bulk imports, which send no
+    per-unit signals, and to clear accumulated rounding.
+    """
+    if unit_model is None:
+        from housing_units.models import HousingUnit as unit_model
+    if aggregate_model is None:
+        from .models import GroupAggregate as aggregate_model
+    price = float(UNIT_DEFAULTS['price'])
+    area = Cast('total_area', FloatField())
+    totals = {'count': Count('id'), 'sqft_sum': Sum(area), 'sqft_sumsq': Sum(area * area)}
+
+    def groups(field):
+        return unit_model.objects.order_by().values(field).annotate(**totals).values_list(field, *totals)
+
+    everything = unit_model.objects.aggregate(**totals)
+    rows = [
+        (dimension, group, everything['count'], everything['sqft_sum'], everything['sqft_sumsq'])
+        for dimension, group in SHARED_UNIT_GROUPS
+    ] if everything['count'] else []
+    rows += [('location', address, *sums) for address, *sums in groups('address')]
+    rows += [('size', f'{rooms_count} BHK', *sums) for rooms_count, *sums in groups('rooms_count')]
+    rows += [('availability', status, *sums) for status, *sums in groups('status')]
+
+    with transaction.atomic():
+        aggregate_model.objects.all().delete()
+        aggregate_model.objects.bulk_create([
+            aggregate_model(
+                dimension=dimension, group=group, count=count,
+                price_sum=count * price, price_sumsq=count * price * price,
+                sqft_sum=sqft_sum or 0, sqft_sumsq=sqft_sumsq or 0,
+            )
+            for dimension, group, count, sqft_sum, sqft_sumsq in rows
+        ])
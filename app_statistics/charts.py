@@ -0,0 +1,241 @@
+"""
+Chart specs of the statistics page.
+
+Each chart is an independent spec: the DataFrame columns it needs, or the
+dimension whose per-group stats it reads (see aggregates.py), and a
+function reducing them to a small JSON-serializable series (histogram
+bins, value counts, grouped means, ...). The series is what the page
+renders client-side; draw_series turns the same series into a matplotlib
+figure for the PNG export. This module does not import Django, so process
+pool workers (see rendering.py) can import it cheaply.
+"""
+import base64
+from collections import namedtuple
+from io import BytesIO
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+Chart = namedtuple('Chart', ['key', 'figsize', 'columns', 'series', 'groups'], defaults=[None])
+
+HIST_BINS = 40
+SCATTER_SAMPLE = 1000
+PALETTE = ['#10B981', '#3B82F6', '#F59E0B', '#EF4444', '#8B5CF6']
+
+
+def setup_style():
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.facecolor'] = 'white'
+
+
+setup_style()
+
+
+def get_plot(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format='png', dpi=80, bbox_inches='tight')
+    buf.seek(0)
+    img = base64.b64encode(buf.read()).decode('utf-8')
+    buf.close()
+    plt.close(fig)
+    return img
+
+
+def _label(value):
+    """Axis label of a category; whole floats such as bath counts lose their .0"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _numbers(values):
+    return [None if np.isnan(value) else round(value, 4) for value in np.asarray(values, dtype=np.float64).tolist()]
+
+
+def histogram(values, **series):
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=HIST_BINS)
+    return dict(series, kind='hist', edges=_numbers(edges), values=counts.tolist())
+
+
+def categories(kind, counts, **series):
+    """Bar, horizontal bar or pie series of a value_counts/groupby result"""
+    return dict(series, kind=kind, labels=[_label(label) for label in counts.index], values=_numbers(counts.values))
+
+
+def line(means, **series):
+    return dict(series, kind='line', x=[_label(x) for x in means.index], y=_numbers(means.values))
+
+
+def price_hist(df):
+    return histogram(df['price'], color='#3B82F6', title='Price Distribution',
+                     xlabel='Price (Lakhs)', ylabel='Count')
+
+
+def sqft_hist(df):
+    return histogram(df['sqft'], color='#10B981', title='Square Feet Distribution',
+                     xlabel='Square Feet', ylabel='Count')
+
+
+def _by_count(stats):
+    """Group counts, most frequent first like value_counts"""
+    return stats['count'].sort_values(ascending=False, kind='stable')
+
+
+def top_locations(stats):
+    top_loc = stats['price_mean'].sort_values(ascending=False).head(15)
+    return categories('barh', top_loc, color='#8B5CF6', title='Top 15 Locations by Price',
+                      xlabel='Average Price (Lakhs)', fontsize=9)
+
+
+def size_dist(stats):
+    return categories('bar', _by_count(stats).head(6), color='#F59E0B',
+                      title='Property Size Distribution', ylabel='Count', rotation=45)
+
+
+def price_by_size(stats):
+    size_price = stats['price_mean'].sort_values().head(8)
+    return categories('barh', size_price, color='#EF4444', title='Average Price by Property Size',
+                      xlabel='Average Price (Lakhs)')
+
+
+def availability(stats):
+    return categories('bar', _by_count(stats).head(8), color='#06B6D4',
+                      title='Property Availability', ylabel='Count', rotation=45, fontsize=9)
+
+
+def area_type(stats):
+    return categories('pie', _by_count(stats), color=['#3B82F6', '#10B981', '#F59E0B', '#EF4444'],
+                      title='Area Type Distribution')
+
+
+def bathrooms(stats):
+    return categories('bar', stats['count'].sort_index().head(6), color='#8B5CF6',
+                      title='Bathroom Distribution', xlabel='Number of Bathrooms', ylabel='Count')
+
+
+def balconies(stats):
+    return categories('bar', stats['count'].sort_index().head(6), color='#EC4899',
+                      title='Balcony Distribution', xlabel='Number of Balconies', ylabel='Count')
+
+
+def price_per_sqft(df):
+    return histogram(df['price_per_sqft'], color='#14B8A6', title='Price per Square Foot Distribution',
+                     xlabel='Price per Sq Ft (₹)', ylabel='Count')
+
+
+def scatter(df):
+    sample = df.sample(min(SCATTER_SAMPLE, len(df)))
+    return dict(kind='scatter', x=_numbers(sample['sqft']), y=_numbers(sample['price']), color='#3B82F6',
+                title='Price vs Square Feet', xlabel='Square Feet', ylabel='Price (Lakhs)')
+
+
+def bath_price(stats):
+    return line(stats['price_mean'].sort_index().dropna().head(7), marker='o', color='#8B5CF6',
+                title='Price by Number of Bathrooms', xlabel='Bathrooms', ylabel='Average Price (Lakhs)')
+
+
+def balcony_price(stats):
+    return line(stats['price_mean'].sort_index().dropna().head(7), marker='s', color='#EC4899',
+                title='Price by Number of Balconies', xlabel='Balconies', ylabel='Average Price (Lakhs)')
+
+
+def location_counts(stats):
+    return categories('barh', _by_count(stats).head(15), color='#F59E0B',
+                      title='Top 15 Locations by Property Count', xlabel='Number of Properties', fontsize=9)
+
+
+def price_ranges(df):
+    bins = [0, 50, 100, 150, 200, df['price'].max()]
+    labels = ['0-50L', '50-100L', '100-150L', '150-200L', '200L+']
+    range_counts = pd.cut(df['price'], bins=bins, labels=labels).value_counts().sort_index()
+    return categories('bar', range_counts, color=PALETTE, title='Properties by Price Range', ylabel='Count')
+
+
+def size_sqft(stats):
+    size_sqft = stats['sqft_mean'].sort_values().head(8)
+    return categories('barh', size_sqft, color='#06B6D4', title='Average Square Feet by Property Size',
+                      xlabel='Average Square Feet')
+
+
+CHARTS = [
+    Chart('price_hist', (10, 5), ('price',), price_hist),
+    Chart('sqft_hist', (10, 5), ('sqft',), sqft_hist),
+    Chart('top_locations', (10, 6), (), top_locations, groups='location'),
+    Chart('size_dist', (10, 5), (), size_dist, groups='size'),
+    Chart('price_by_size', (10, 5), (), price_by_size, groups='size'),
+    Chart('availability', (10, 5), (), availability, groups='availability'),
+    Chart('area_type', (10, 5), (), area_type, groups='area_type'),
+    Chart('bathrooms', (10, 5), (), bathrooms, groups='bath'),
+    Chart('balconies', (10, 5), (), balconies, groups='balcony'),
+    Chart('price_per_sqft', (10, 5), ('price_per_sqft',), price_per_sqft),
+    Chart('scatter', (10, 5), ('sqft', 'price'), scatter),
+    Chart('bath_price', (10, 5), (), bath_price, groups='bath'),
+    Chart('balcony_price', (10, 5), (), balcony_price, groups='balcony'),
+    Chart('location_counts', (10, 6), (), location_counts, groups='location'),
+    Chart('price_ranges', (10, 5), ('price',), price_ranges),
+    Chart('size_sqft', (10, 5), (), size_sqft, groups='size'),
+]
+CHARTS_BY_KEY = {chart.key: chart for chart in CHARTS}
+
+
+def chart_input(chart, df, groups):
+    """What a chart's series function reads: its dimension's group stats, or its columns of the frame"""
+    return groups[chart.groups] if chart.groups else df[list(chart.columns)]
+
+
+def draw_series(series, ax):
+    """Draw a chart series on a matplotlib Axes, in the style of the original PNG charts"""
+    kind = series['kind']
+    color = series.get('color')
+    fontsize = series.get('fontsize')
+    if kind == 'hist':
+        edges = series['edges']
+        ax.hist(edges[:-1], bins=edges, weights=series['values'], color=color, edgecolor='black', alpha=0.7)
+    elif kind in ('bar', 'barh'):
+        positions = range(len(series['labels']))
+        values = [0 if value is None else value for value in series['values']]
+        if kind == 'bar':
+            ax.bar(positions, values, color=color, edgecolor='black')
+            ax.set_xticks(positions)
+            rotation = series.get('rotation', 0)
+            ax.set_xticklabels(series['labels'], rotation=rotation, ha='right' if rotation and fontsize else 'center',
+                               fontsize=fontsize)
+        else:
+            ax.barh(positions, values, color=color)
+            ax.set_yticks(positions)
+            ax.set_yticklabels(series['labels'], fontsize=fontsize)
+    elif kind == 'pie':
+        ax.pie(series['values'], labels=series['labels'], autopct='%1.1f%%', colors=color, startangle=90)
+    elif kind == 'line':
+        ax.plot(series['x'], series['y'], marker=series.get('marker'), linewidth=2, markersize=8, color=color)
+        ax.grid(True, alpha=0.3)
+    elif kind == 'scatter':
+        ax.scatter(series['x'], series['y'], alpha=0.5, s=30, color=color)
+    else:
+        raise ValueError(f'Unknown chart kind {kind!r}')
+    if series.get('xlabel'):
+        ax.set_xlabel(series['xlabel'], fontsize=11)
+    if series.get('ylabel'):
+        ax.set_ylabel(series['ylabel'], fontsize=11)
+    ax.set_title(series['title'], fontsize=13, fontweight='bold')
+
+
+def render_chart(chart, data):
+    """Compute one chart spec's series from its chart_input, draw it on a new figure and return it as a base64 PNG"""
+    series = chart.series(data)
+    fig, ax = plt.subplots(figsize=chart.figsize)
+    try:
+        draw_series(series, ax)
+    except BaseException:
+        plt.close(fig)
+        raise
+    return get_plot(fig)
+
+
+def warm_up():
+    """Pool initializer: draw a throwaway chart so fonts and caches are loaded before the first request"""
+    render_chart(CHARTS_BY_KEY['price_hist'], {'price': [0.0, 1.0]})
@@ -0,0 +1,195 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+HOUSE_DATA_PATH = settings.BASE_DIR / 'house_data.csv'
+
+CATEGORICAL_COLUMNS = ('area_type', 'availability', 'location', 'size', 'society', 'total_sqft')
+NUMERIC_COLUMNS = ('bath', 'balcony', 'price')
+# House_data columns that housing units have no field for
+UNIT_DEFAULTS = {'area_type': 'Carpet  Area', 'society': '', 'bath': 1, 'balcony': 1, 'price': 50}
+
+# Square feet per unit of the suffixes found in total_sqft, e.g. "34.46Sq. Meter"
+UNIT_FACTORS = {
+    'sqmeter': 10.7639,
+    'sqyards': 9.0,
+    'perch': 272.25,
+    'acres': 43560.0,
+    'cents': 435.6,
+    'guntha': 1089.0,
+    'grounds': 2400.0,
+}
+# A number, or a "low - high" range, optionally followed by a unit
+SQFT_PATTERN = (
+    r'^\s*(?P<low>\d+(?:\.\d+)?)\s*(?:-\s*(?P<high>\d+(?:\.\d+)?))?\s*(?P<unit>[A-Za-z][A-Za-z. ]*)?\s*$'
+)
+
+# File layout: MAGIC, header length (little endian u64), JSON header, then
+# every column's array at the offset the header gives, 64-byte aligned
+MAGIC = b'HDCOL001'
+PREFIX = struct.Struct('<8sQ')
+ALIGNMENT = 64
+
+
+def cache_path():
+    return str(getattr(settings, 'HOUSE_DATA_CACHE_PATH', settings.BASE_DIR / 'snapshots' / 'house_data.columns'))
+
+
+def parse_sqft(values):
+    """
+    Square feet of total_sqft values: plain numbers, the midpoint of ranges
+    like "1133 - 1384", and numbers with one of the UNIT_FACTORS suffixes.
+    Anything else is NaN.
+    """
+    parts = pd.Series(values).astype(str).str.extract(SQFT_PATTERN)
+    low = pd.to_numeric(parts['low'])
+    high = pd.to_numeric(parts['high']).fillna(low)
+    unit = parts['unit'].str.lower().str.replace(r'[^a-z]', '', regex=True)
+    factor = unit.map(UNIT_FACTORS).where(unit.notna(), 1.0)
+    return ((low + high) / 2 * factor).to_numpy(dtype=np.float64)
+
+
+def normalize(df):
+    """Typed house_data: categoricals for the text columns, float64 numbers and the parsed sqft"""
+    columns = {}
+    for name in CATEGORICAL_COLUMNS:
+        columns[name] = pd.Categorical(df[name].astype(object).where(df[name].notna(), None))
+    for name in NUMERIC_COLUMNS:
+        columns[name] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+    columns['sqft'] = parse_sqft(df['total_sqft'])
+    return pd.DataFrame(columns)
+
+
+def write_columns(df, path, source=None):
+    """Store a normalized frame in the columnar format, replacing `path` atomically"""
+    header = {'rows': len(df), 'source': source, 'columns': []}
+    arrays = []
+    offset = 0
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            array = np.ascontiguousarray(column.cat.codes.to_numpy())
+            entry = {'name': name, 'categories': column.cat.categories.tolist()}
+        else:
+            array = np.ascontiguousarray(column.to_numpy(dtype=np.float64))
+            entry = {'name': name}
+        entry.update(dtype=array.dtype.str, offset=offset)
+        header['columns'].append(entry)
+        arrays.append(array)
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    encoded = json.dumps(header).encode()
+    data_start = -(-(PREFIX.size + len(encoded)) // ALIGNMENT) * ALIGNMENT
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.house-data-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, len(encoded)))
+            f.write(encoded)
+            for entry, array in zip(header['columns'], arrays):
+                f.seek(data_start + entry['offset'])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def source_id(source):
+    stat = os.stat(source)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def ingest(source=None, path=None):
+    """Parse and normalize the CSV once and store it as columns; returns the row count"""
+    source = source or HOUSE_DATA_PATH
+    path = path or cache_path()
+    fingerprint = source_id(source)
+    df = normalize(pd.read_csv(source, dtype=str, keep_default_na=False, na_values=['']))
+    write_columns(df, path, fingerprint)
+    return len(df)
+
+
+class HouseDataColumns:
+    """Memory-mapped house_data columns; numeric arrays and category codes are views of the file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+        self.file_id = (stat.st_ino, stat.st_mtime_ns)
+
+        magic, length = PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a house data column file')
+        header = json.loads(self._mmap[PREFIX.size:PREFIX.size + length])
+        self.source = header['source']
+        self.rows = header['rows']
+        data_start = -(-(PREFIX.size + length) // ALIGNMENT) * ALIGNMENT
+
+        # Raw arrays: float64 values, or category codes for the columns in `categories`
+        self.arrays = {}
+        self.categories = {}
+        columns = {}
+        for entry in header['columns']:
+            array = np.frombuffer(self._mmap, dtype=entry['dtype'], count=self.rows,
+                                  offset=data_start + entry['offset'])
+            self.arrays[entry['name']] = array
+            if 'categories' in entry:
+                self.categories[entry['name']] = entry['categories']
+                array = pd.Categorical.from_codes(array, categories=entry['categories'])
+            columns[entry['name']] = array
+        self.frame = pd.DataFrame(columns, copy=False)
+
+    def chunks(self, size, starts=None):
+        """{name: raw array slice} for row chunks of `size`, at the given chunk `starts` or all of them"""
+        for start in range(0, self.rows, size) if starts is None else starts:
+            yield {name: array[start:start + size] for name, array in self.arrays.items()}
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def load_columns(source=None, path=None):
+    """
+    The HouseDataColumns of the column file, re-ingested first if the CSV
+    changed since, and shared by every caller in this process.
+    """
+    source = source or HOUSE_DATA_PATH
+    path = path or cache_path()
+    fingerprint = source_id(source)
+    with _lock:
+        columns = _loaded.get(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        if columns is None or stat is None or columns.file_id != (stat.st_ino, stat.st_mtime_ns):
+            try:
+                columns = HouseDataColumns(path) if stat is not None else None
+            except ValueError:
+                columns = None
+        if columns is None or columns.source != fingerprint:
+            ingest(source, path)
+            columns = HouseDataColumns(path)
+        _loaded[path] = columns
+    return columns
+
+
+def load_house_data(source=None, path=None):
+    """
+    The normalized house_data as a DataFrame, read from the column file (see
+    load_columns). Each call returns a shallow copy, so callers may add or
+    drop columns freely.
+    """
+    return load_columns(source, path).frame.copy(deep=False)
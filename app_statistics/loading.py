@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+
+# NumPy dtype per Django field type; nullable columns use the matching pandas extension type
+INTEGER_DTYPES = {
+    'SmallIntegerField': np.int16,
+    'PositiveSmallIntegerField': np.int16,
+    'IntegerField': np.int32,
+    'PositiveIntegerField': np.int32,
+    'SmallAutoField': np.int16,
+    'AutoField': np.int32,
+    'BigAutoField': np.int64,
+    'BigIntegerField': np.int64,
+    'PositiveBigIntegerField': np.int64,
+}
+FLOAT_TYPES = ('DecimalField', 'FloatField')
+
+HOUSING_UNIT_FIELDS = (
+    'id', 'unit_number', 'address', 'floor', 'total_area', 'rooms_count', 'status',
+    'has_elevator', 'has_heating', 'last_inspection_date', 'next_available_date',
+)
+APPLICATION_FIELDS = (
+    'id', 'applicant_id', 'application_number', 'category', 'status', 'submission_date', 'last_updated',
+    'is_homeless', 'current_residence_condition', 'monthly_income', 'current_living_area',
+    'is_veteran', 'is_single_parent', 'waiting_years', 'has_disability',
+    'adults_count', 'children_count', 'elderly_count', 'priority_score', 'queue_rank',
+)
+HISTORY_FIELDS = ('id', 'application_id', 'previous_status', 'new_status', 'change_date', 'changed_by_id')
+
+
+def resolve_field(model, path):
+    """
+    (model field, nullable) behind a values_list() path such as
+    'applicant__iin'; (None, True) for paths that are not plain fields.
+    """
+    nullable = False
+    for part in path.split(LOOKUP_SEP):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None, True
+        # Values reached through a nullable relation can be None as well
+        nullable = nullable or field.null
+        if field.is_relation:
+            model = field.related_model
+            # A foreign key on its own yields the related primary key
+            field = field.target_field
+    return field, nullable
+
+
+class Column:
+    """Accumulates one values_list() column chunk by chunk as typed arrays"""
+
+    def __init__(self, field, nullable):
+        self.field = field
+        self.kind = field.get_internal_type() if field is not None else None
+        self.nullable = nullable
+        self.choices = [value for value, _ in field.flatchoices] if field is not None and field.choices else None
+        self.parts = []
+        self.masks = []
+
+    def add(self, values):
+        kind = self.kind
+        if kind in INTEGER_DTYPES or kind == 'BooleanField':
+            dtype = bool if kind == 'BooleanField' else INTEGER_DTYPES[kind]
+            if self.nullable:
+                mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+                self.masks.append(mask)
+                values = [0 if value is None else value for value in values] if mask.any() else values
+            self.parts.append(np.array(values, dtype=dtype))
+        elif kind in FLOAT_TYPES:
+            self.parts.append(np.fromiter(
+                (np.nan if value is None else float(value) for value in values), dtype=np.float64, count=len(values)
+            ))
+        elif kind == 'DateField':
+            self.parts.append(np.array(values, dtype='datetime64[D]'))
+        elif kind == 'DateTimeField':
+            self.parts.append(pd.to_datetime(values, utc=True).tz_convert(None).to_numpy('datetime64[ns]'))
+        elif self.choices is not None:
+            self.parts.append(pd.Categorical(values, categories=self.choices).codes)
+        else:
+            self.parts.append(np.array(values, dtype=object))
+
+    def series(self, name):
+        kind = self.kind
+        data = np.concatenate(self.parts) if self.parts else np.array([])
+        if kind in INTEGER_DTYPES or kind == 'BooleanField':
+            dtype = bool if kind == 'BooleanField' else INTEGER_DTYPES[kind]
+            data = data.astype(dtype, copy=False)
+            if self.nullable:
+                mask = np.concatenate(self.masks) if self.masks else np.zeros(0, dtype=bool)
+                array_type = pd.arrays.BooleanArray if kind == 'BooleanField' else pd.arrays.IntegerArray
+                data = array_type(data, mask)
+        elif kind in FLOAT_TYPES:
+            data = data.astype(np.float64, copy=False)
+        elif kind == 'DateField':
+            data = data.astype('datetime64[D]', copy=False).astype('datetime64[ns]')
+        elif kind == 'DateTimeField':
+            data = pd.DatetimeIndex(data.astype('datetime64[ns]', copy=False)).tz_localize('UTC')
+        elif self.choices is not None:
+            data = pd.Categorical.from_codes(data, categories=self.choices)
+        else:
+            data = data.astype(object, copy=False)
+        return pd.Series(data, name=name)
+
+
+def load_frame(queryset, fields, chunk_size=10000):
+    """
+    Load `queryset.values_list(*fields)` into a DataFrame in one pass.
+
+    Rows are read through a chunked (server-side where supported) cursor and
+    every chunk is converted straight into typed NumPy columns, so memory
+    holds one chunk of Python objects plus the compact columns, and the
+    DataFrame is built once at the end. Column types follow the model fields:
+    integers and booleans keep their width (pandas nullable types when the
+    field is nullable), decimals become float64, dates datetime64, fields with
+    choices categoricals and other text stays object.
+    """
+    columns = [Column(*resolve_field(queryset.model, name)) for name in fields]
+    chunk = []
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _add_chunk(columns, chunk)
+            chunk = []
+    if chunk or not any(column.parts for column in columns):
+        _add_chunk(columns, chunk)
+    return pd.DataFrame({name: column.series(name) for name, column in zip(fields, columns)})
+
+
+def _add_chunk(columns, chunk):
+    values = list(zip(*chunk)) if chunk else [()] * len(columns)
+    for column, column_values in zip(columns, values):
+        column.add(list(column_values))
+
+
+def load_housing_units(fields=HOUSING_UNIT_FIELDS, queryset=None, chunk_size=10000):
+    from housing_units.models import HousingUnit
+    return load_frame(queryset if queryset is not None else HousingUnit.objects.order_by('id'), fields, chunk_size)
+
+
+def load_applications(fields=APPLICATION_FIELDS, queryset=None, chunk_size=10000):
+    from applications.models import Application
+    return load_frame(queryset if queryset is not None else Application.objects.order_by('id'), fields, chunk_size)
+
+
+def load_application_history(fields=HISTORY_FIELDS, queryset=None, chunk_size=10000):
+    from applications.models import ApplicationHistory
+    return load_frame(
+        queryset if queryset is not None else ApplicationHistory.objects.order_by('id'), fields, chunk_size
+    )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from app_statistics.queue_analytics import analytics_path, compute_queue_analytics, write_queue_analytics
+
+
+class Command(BaseCommand):
+    help = (
+        'Count the queue analytics series and store them for the queue analytics page. '
+        'Run periodically (e.g. hourly from cron); the page shows the latest stored result.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Analytics file to write (defaults to settings.QUEUE_ANALYTICS_PATH)')
+
+    def handle(self, *args, **options):
+        data = compute_queue_analytics()
+        path = options['path'] or analytics_path()
+        write_queue_analytics(data, path)
+        self.stdout.write(f'Wrote analytics of {data["stats"]["total"]} applications to {path}.')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app_statistics.house_data import HOUSE_DATA_PATH, cache_path, ingest
+from app_statistics.profiling import build_profile
+
+
+class Command(BaseCommand):
+    help = (
+        'Parse house_data.csv once into the typed, memory-mapped column file read by the statistics pages, '
+        'and store its full profile for the dataframe info page. '
+        'The pages also re-ingest on their own when the CSV changes; run this after deploying a new file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='CSV file to ingest (defaults to house_data.csv)')
+        parser.add_argument('--path', help='Column file to write (defaults to settings.HOUSE_DATA_CACHE_PATH)')
+
+    def handle(self, *args, **options):
+        source = options['source'] or HOUSE_DATA_PATH
+        path = options['path'] or cache_path()
+        rows = ingest(source, path)
+        build_profile(path)
+        self.stdout.write(f'Ingested {rows} rows from {source} into {path}.')
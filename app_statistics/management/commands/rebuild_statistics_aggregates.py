@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app_statistics.aggregates import rebuild_unit_aggregates
+from app_statistics.models import GroupAggregate
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the per-group housing unit aggregates of the statistics pages from scratch. '
+        'They are kept up to date incrementally; run this to repair them after changing units outside the ORM.'
+    )
+
+    def handle(self, *args, **options):
+        rebuild_unit_aggregates()
+        self.stdout.write(f'Rebuilt {GroupAggregate.objects.count()} group aggregates.')
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:07
+
+from django.db import migrations, models
+
+
+def populate_aggregates(apps, schema_editor):
+    from app_statistics.aggregates import rebuild_unit_aggregates
+
+    rebuild_unit_aggregates(apps.get_model('housing_units', 'HousingUnit'), apps.get_model('app_statistics', 'GroupAggregate'))
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('housing_units', '0009_housingallocation_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('group', models.TextField()),
+                ('count', models.BigIntegerField(default=0)),
+                ('price_sum', models.FloatField(default=0)),
+                ('price_sumsq', models.FloatField(default=0)),
+                ('sqft_sum', models.FloatField(default=0)),
+                ('sqft_sumsq', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'group'), name='group_aggregate_unique')],
+            },
+        ),
+        migrations.RunPython(populate_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,24 @@
 from django.db import models
 
-# Create your models here.
+
+class GroupAggregate(models.Model):
+    """
+    Running count, sum and sum of squares of price and square feet over the
+    housing units in one group of a statistics dimension, e.g. the units at
+    one location. Maintained incrementally by app_statistics.aggregates.
+    """
+    dimension = models.CharField(max_length=20)
+    group = models.TextField()
+    count = models.BigIntegerField(default=0)
+    price_sum = models.FloatField(default=0)
+    price_sumsq = models.FloatField(default=0)
+    sqft_sum = models.FloatField(default=0)
+    sqft_sumsq = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'group'], name='group_aggregate_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.group}: {self.count}"
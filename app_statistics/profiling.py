@@ -0,0 +1,208 @@
+"""
+Profile of house_data for the dataframe_info page: dtypes, memory, describe()
+of the numeric columns, missing values and value counts.
+
+The profile is computed in one pass over row chunks of the memory-mapped
+column file (see house_data), so memory stays flat however big the data
+gets: numeric columns keep streaming count, mean and sum of squared
+deviations, merged chunk by chunk, plus a fixed-size uniform sample for the
+quartiles; categorical columns are already dictionary-encoded, so their
+exact counts are one bincount of the codes per chunk. Above
+HOUSE_DATA_PROFILE_SAMPLE_ROWS rows only a random sample of chunks is read
+and the counts are scaled up.
+
+The result is stored as JSON next to the column file with the CSV's
+fingerprint, and only recomputed after the CSV changes.
+"""
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+from django.conf import settings
+from .house_data import HouseDataColumns, cache_path, load_columns
+
+CHUNK_ROWS = 65536
+# Values kept per numeric column to estimate quartiles; exact up to this many rows
+QUANTILE_SAMPLE = 20000
+# Most frequent values kept per categorical column
+TOP_VALUES = 50
+SEED = 0
+
+
+def profile_path(path=None):
+    """The profile of the column file at `path`, stored next to it"""
+    return f'{path or cache_path()}.profile.json'
+
+
+def sample_rows():
+    """Row count above which profiles are estimated from a sample of that many rows; None to always read everything"""
+    return getattr(settings, 'HOUSE_DATA_PROFILE_SAMPLE_ROWS', 1_000_000)
+
+
+class NumericSummary:
+    """Streaming count, mean, sum of squared deviations, min, max and a uniform sample of a numeric column"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.missing = 0
+        self.sample = np.empty(0)
+        self.keys = np.empty(0)
+
+    def update(self, values, rng):
+        present = values[~np.isnan(values)]
+        self.missing += len(values) - len(present)
+        if not len(present):
+            return
+        # Chan et al.'s merge of two partial (count, mean, M2) summaries
+        count = len(present)
+        mean = present.mean()
+        m2 = np.square(present - mean).sum()
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, present.min())
+        self.max = max(self.max, present.max())
+
+        # Keeping the values with the smallest random keys is a uniform sample of everything seen
+        keys = np.concatenate([self.keys, rng.random(count)])
+        sample = np.concatenate([self.sample, present])
+        if len(keys) > QUANTILE_SAMPLE:
+            kept = np.argpartition(keys, QUANTILE_SAMPLE)[:QUANTILE_SAMPLE]
+            keys, sample = keys[kept], sample[kept]
+        self.keys, self.sample = keys, sample
+
+    def describe(self, scale=1.0):
+        if not self.count:
+            return {'count': 0, 'mean': None, 'std': None, 'min': None,
+                    'q25': None, 'q50': None, 'q75': None, 'max': None}
+        q25, q50, q75 = np.quantile(self.sample, [0.25, 0.5, 0.75])
+        return {
+            'count': round(self.count * scale),
+            'mean': float(self.mean),
+            'std': float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None,
+            'min': float(self.min),
+            'q25': float(q25),
+            'q50': float(q50),
+            'q75': float(q75),
+            'max': float(self.max),
+        }
+
+
+def profile_columns(columns, max_rows=None):
+    """
+    The profile of a HouseDataColumns. With `max_rows` below its row count,
+    only random chunks adding up to about `max_rows` rows are read.
+    """
+    rng = np.random.default_rng(SEED)
+    chunks = -(-columns.rows // CHUNK_ROWS)
+    starts = None
+    if max_rows is not None and columns.rows > max_rows:
+        picked = rng.choice(chunks, size=max(1, -(-max_rows // CHUNK_ROWS)), replace=False)
+        starts = [int(chunk) * CHUNK_ROWS for chunk in np.sort(picked)]
+
+    numeric = {name: NumericSummary() for name in columns.arrays if name not in columns.categories}
+    counts = {name: np.zeros(len(categories), dtype=np.int64) for name, categories in columns.categories.items()}
+    missing = dict.fromkeys(counts, 0)
+    first = next(iter(columns.arrays))
+    read = 0
+    for chunk in columns.chunks(CHUNK_ROWS, starts):
+        read += len(chunk[first])
+        for name, summary in numeric.items():
+            summary.update(chunk[name], rng)
+        for name, codes in chunk.items():
+            if name in counts:
+                present = codes[codes >= 0]
+                missing[name] += len(codes) - len(present)
+                counts[name] += np.bincount(present, minlength=len(counts[name]))
+
+    scale = columns.rows / read if read else 1.0
+    frame = columns.frame
+    value_counts = {}
+    for name, totals in counts.items():
+        top = np.argsort(-totals, kind='stable')[:TOP_VALUES]
+        value_counts[name] = {
+            str(columns.categories[name][i]): round(int(totals[i]) * scale) for i in top if totals[i]
+        }
+        missing[name] = round(missing[name] * scale)
+    for name, summary in numeric.items():
+        missing[name] = round(summary.missing * scale)
+
+    return {
+        'source': columns.source,
+        'rows': columns.rows,
+        'sampled_rows': read if starts is not None else None,
+        'columns': list(columns.arrays),
+        'dtypes': {name: str(dtype) for name, dtype in frame.dtypes.items()},
+        # Only reads the array sizes and the categories, never the rows
+        'memory': int(frame.memory_usage(deep=True).sum()),
+        'describe': {name: summary.describe(scale) for name, summary in numeric.items()},
+        'missing': {name: missing[name] for name in columns.arrays},
+        'distinct': {name: int(np.count_nonzero(totals)) for name, totals in counts.items()},
+        'value_counts': value_counts,
+    }
+
+
+def write_profile(profile, path):
+    """Store a profile as JSON, replacing `path` atomically"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.house-data-profile-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(profile, f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def build_profile(path=None, max_rows=None):
+    """Profile the column file at `path` and store the result next to it; returns the profile"""
+    path = path or cache_path()
+    profile = profile_columns(HouseDataColumns(path), max_rows)
+    write_profile(profile, profile_path(path))
+    return profile
+
+
+_lock = threading.Lock()
+_profiles = {}
+
+
+def _read_profile(path):
+    try:
+        with open(path) as f:
+            return (os.fstat(f.fileno()).st_mtime_ns, json.load(f))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def house_data_profile(source=None, path=None):
+    """
+    The stored profile of house_data, computed first if there is none for the
+    current CSV: from a sample of the rows when there are more than
+    sample_rows(). `manage.py ingest_house_data` stores a full profile.
+    """
+    columns = load_columns(source, path)
+    stored = profile_path(path)
+    with _lock:
+        cached = _profiles.get(stored)
+        try:
+            mtime = os.stat(stored).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if cached is None or cached[0] != mtime:
+            cached = _read_profile(stored)
+        if cached is None or cached[1]['source'] != columns.source:
+            profile = profile_columns(columns, sample_rows())
+            write_profile(profile, stored)
+            cached = (os.stat(stored).st_mtime_ns, profile)
+        _profiles[stored] = cached
+    return cached[1]
@@ -0,0 +1,193 @@
+"""
+Queue analytics: how the Application queue breaks down by category, status,
+priority score, household size, income and submission month.
+
+Everything is counted by the database with GROUP BY queries that return at
+most a few hundred rows, which are put into buckets here; no application
+rows are loaded. `manage.py compute_queue_analytics`, run periodically,
+stores the result as JSON; the page only reads the latest stored result
+(see queue_analytics) and flags it as stale once it is older than the
+refresh interval, rather than recomputing it inside a request.
+"""
+import bisect
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+from applications.models import Application
+
+SCORE_BINS = 20
+# Upper bounds of the income bands; the reference income of the income_band scoring rule is 100000
+INCOME_BANDS = (25000, 50000, 75000, 100000, 150000)
+# Household sizes from 1 to this, the last one including bigger households
+MAX_HOUSEHOLD = 6
+SUBMISSION_MONTHS = 24
+
+HOUSEHOLD = F('adults_count') + F('children_count') + F('elderly_count')
+# Index of the income band, 0 to len(INCOME_BANDS)
+INCOME_BAND = Case(
+    *[When(monthly_income__lt=bound, then=Value(i)) for i, bound in enumerate(INCOME_BANDS)],
+    default=Value(len(INCOME_BANDS)),
+)
+
+
+def _month_starts(today, months):
+    """Aware datetimes starting each of the last `months` months, oldest first, then the start of next month"""
+    first = today.year * 12 + today.month - months
+    return [timezone.make_aware(datetime(i // 12, i % 12 + 1, 1)) for i in range(first, first + months + 1)]
+
+
+def _score_edges(low, high):
+    """SCORE_BINS + 1 whole-number bin edges covering [low, high]"""
+    width = max(1, -(-(high - low + 1) // SCORE_BINS))
+    return [low + width * i for i in range(SCORE_BINS + 1)]
+
+
+def _bucket(value, edges):
+    """Index of the bucket of `value` between consecutive `edges`; 0 below the first, len(edges) from the last"""
+    return bisect.bisect_right(edges, value)
+
+
+def compute_queue_analytics(today=None):
+    """The analytics series and summary stats, straight from the database"""
+    today = today or timezone.localdate()
+    queryset = Application.objects.order_by()
+    months = _month_starts(today, SUBMISSION_MONTHS)
+
+    # Small GROUP BYs, bucketed here: category and status pairs and the score
+    # values are read from indexes, household sizes and income bands take one scan
+    pairs = list(queryset.values_list('category', 'status').annotate(n=Count('id')))
+    scores = list(queryset.values_list('priority_score').annotate(n=Count('id')))
+    households = list(
+        queryset.annotate(household=HOUSEHOLD, band=INCOME_BAND)
+        .values_list('household', 'band').annotate(n=Count('id'))
+    )
+    # One filtered COUNT per month, over the submissions within the window
+    submissions = queryset.filter(submission_date__gte=months[0], submission_date__lt=months[-1]).aggregate(**{
+        str(i): Count('id', filter=Q(submission_date__gte=start, submission_date__lt=end))
+        for i, (start, end) in enumerate(zip(months, months[1:]))
+    })
+
+    categories = Application.CATEGORY_CHOICES + [(None, 'Not specified')]
+    category_index = {value: i for i, (value, _) in enumerate(categories)}
+    status_index = {value: i for i, (value, _) in enumerate(Application.STATUS_CHOICES)}
+    category_counts = [0] * len(categories)
+    status_counts = [0] * len(Application.STATUS_CHOICES)
+    for category, status, n in pairs:
+        category_counts[category_index.get(category or None, len(categories) - 1)] += n
+        if status in status_index:
+            status_counts[status_index[status]] += n
+
+    low = min((score for score, _ in scores), default=0)
+    high = max((score for score, _ in scores), default=0)
+    score_edges = _score_edges(low, high)
+    score_counts = [0] * SCORE_BINS
+    for score, n in scores:
+        score_counts[_bucket(score, score_edges[1:-1])] += n
+
+    household_counts = [0] * MAX_HOUSEHOLD
+    income_counts = [0] * (len(INCOME_BANDS) + 1)
+    for household, band, n in households:
+        household_counts[_bucket(household, range(2, MAX_HOUSEHOLD + 1))] += n
+        income_counts[band] += n
+
+    total = sum(n for _, _, n in pairs)
+    income_labels = [f'< {INCOME_BANDS[0] // 1000}k'] + [
+        f'{low // 1000}k–{high // 1000}k' for low, high in zip(INCOME_BANDS, INCOME_BANDS[1:])
+    ] + [f'{INCOME_BANDS[-1] // 1000}k+']
+    series = {
+        'category': {
+            'kind': 'barh', 'labels': [label for _, label in categories], 'values': category_counts,
+            'color': '#3B82F6', 'title': 'Applications by Category', 'xlabel': 'Applications',
+        },
+        'status': {
+            'kind': 'pie', 'labels': [label for _, label in Application.STATUS_CHOICES], 'values': status_counts,
+            'color': ['#F59E0B', '#10B981', '#3B82F6', '#EF4444'], 'title': 'Applications by Status',
+        },
+        'priority_score': {
+            'kind': 'hist', 'edges': score_edges, 'values': score_counts,
+            'color': '#8B5CF6', 'title': 'Priority Score Distribution', 'xlabel': 'Priority Score',
+            'ylabel': 'Applications',
+        },
+        'household': {
+            'kind': 'bar', 'labels': [str(size) for size in range(1, MAX_HOUSEHOLD)] + [f'{MAX_HOUSEHOLD}+'],
+            'values': household_counts, 'color': '#EC4899', 'title': 'Household Size',
+            'xlabel': 'Household Members', 'ylabel': 'Applications',
+        },
+        'income': {
+            'kind': 'bar', 'labels': income_labels, 'values': income_counts,
+            'color': '#14B8A6', 'title': 'Monthly Income Bands', 'xlabel': 'Monthly Income', 'ylabel': 'Applications',
+        },
+        'submissions': {
+            'kind': 'line', 'x': [month.strftime('%b %Y') for month in months[:-1]],
+            'y': [submissions[str(i)] for i in range(SUBMISSION_MONTHS)], 'marker': 'o', 'color': '#F59E0B',
+            'title': 'Submissions per Month', 'xlabel': 'Month', 'ylabel': 'Applications',
+        },
+    }
+    stats = {
+        'total': total,
+        'in_queue': status_counts[status_index['IN_QUEUE']],
+        'avg_score': round(sum(score * n for score, n in scores) / total, 1) if total else 0,
+        'avg_household': round(sum(household * n for household, _, n in households) / total, 1) if total else 0,
+    }
+    return {'series': series, 'stats': stats, 'computed_at': timezone.now().isoformat()}
+
+
+def refresh_interval():
+    """Seconds between scheduled runs of compute_queue_analytics; older results are flagged as stale"""
+    return getattr(settings, 'QUEUE_ANALYTICS_REFRESH_INTERVAL', 3600)
+
+
+def is_stale(data, now=None):
+    """Whether stored analytics are older than the refresh interval, i.e. a scheduled run was missed"""
+    age = (now or timezone.now()) - data['computed_at']
+    return age.total_seconds() > refresh_interval()
+
+
+def analytics_path():
+    return str(getattr(settings, 'QUEUE_ANALYTICS_PATH', settings.BASE_DIR / 'snapshots' / 'queue_analytics.json'))
+
+
+def write_queue_analytics(data, path=None):
+    """Store a compute_queue_analytics result as JSON, replacing the previous one atomically"""
+    path = path or analytics_path()
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.queue-analytics-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def queue_analytics(path=None):
+    """
+    The latest stored analytics, read again only after the file changes, or
+    None if they have never been computed.
+    """
+    path = path or analytics_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    file_id = (stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        loaded = _loaded.get(path)
+        if loaded is None or loaded[0] != file_id:
+            with open(path) as f:
+                data = json.load(f)
+            data['computed_at'] = datetime.fromisoformat(data['computed_at'])
+            loaded = _loaded[path] = (file_id, data)
+        return loaded[1]
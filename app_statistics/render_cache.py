@@ -0,0 +1,62 @@
+import os
+import time
+import uuid
+from django.core.cache import cache
+from housing_units.inventory import get_inventory_version
+
+STATISTICS_KEY = 'statistics:render'
+# A regeneration holding the lock longer than this is presumed dead
+LOCK_TIMEOUT = 120
+# How long a request without any cached copy waits for another worker's regeneration
+WAIT_TIMEOUT = 30
+POLL_INTERVAL = 0.1
+
+
+def csv_fingerprint(path):
+    """Changes whenever the CSV file is replaced or edited"""
+    stat = os.stat(path)
+    return f'{stat.st_mtime_ns}:{stat.st_size}'
+
+
+def data_fingerprint(path):
+    """Changes whenever the CSV file is replaced or edited, or any HousingUnit changes"""
+    return f'{csv_fingerprint(path)}:{get_inventory_version()}'
+
+
+def cached_render(fingerprint, build, wait_timeout=WAIT_TIMEOUT, is_complete=None, key=STATISTICS_KEY):
+    """
+    The result of `build()` for the data identified by `fingerprint`.
+
+    The latest result is kept in the cache without expiry. When the fingerprint
+    no longer matches, a single worker (whoever takes the cache lock) calls
+    `build()` while the others keep serving the stale copy. Only when there is
+    no copy at all do they wait for that worker, building themselves if it
+    does not finish within `wait_timeout` seconds.
+
+    Results for which `is_complete(result)` is false are kept only as the
+    stale copy, so the next request builds again. Results of different
+    builds are kept apart by their cache `key`.
+    """
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + wait_timeout
+    while True:
+        entry = cache.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+
+        token = uuid.uuid4().hex
+        if cache.add(lock_key, token, LOCK_TIMEOUT):
+            try:
+                result = build()
+                complete = is_complete is None or is_complete(result)
+                cache.set(key, (fingerprint if complete else None, result), None)
+                return result
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+        if entry is not None:
+            return entry[1]
+        if time.monotonic() >= deadline:
+            return build()
+        time.sleep(POLL_INTERVAL)
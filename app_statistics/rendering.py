@@ -0,0 +1,147 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from .aggregates import frame_group_stats
+from .charts import CHARTS, chart_input, render_chart, warm_up
+
+logger = logging.getLogger(__name__)
+
+# Seconds a render round may take before its unfinished charts are given up
+CHART_TIMEOUT = 60
+# Seconds a terminated worker has to exit before it is killed
+WORKER_EXIT_TIMEOUT = 5
+
+
+def render_workers():
+    """Worker processes for chart rendering; 0 or 1 renders in the calling process"""
+    default = min(len(CHARTS), os.cpu_count() or 1)
+    return getattr(settings, 'STATISTICS_RENDER_WORKERS', default)
+
+
+_lock = threading.Lock()
+_pool = None
+
+
+def get_pool():
+    """
+    This process's chart rendering pool, created on first use. Workers are
+    forked from a forkserver that has already imported matplotlib, pandas
+    and seaborn, and each renders a chart once on startup.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['app_statistics.charts'])
+            _pool = ProcessPoolExecutor(render_workers(), mp_context=context, initializer=warm_up)
+        return _pool
+
+
+def _discard_pool(pool, terminate=False):
+    """
+    Stop using `pool`. With `terminate`, its live workers are also killed,
+    since a worker stuck in a render would otherwise keep running forever.
+    """
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    workers = list((pool._processes or {}).values()) if terminate else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+    for worker in workers:
+        worker.join(WORKER_EXIT_TIMEOUT)
+        if worker.is_alive():
+            worker.kill()
+
+
+def _render_round(charts, df, groups, timeout):
+    """
+    Render charts in the pool. Returns (plots, crashed): plots maps keys to a
+    PNG, or None for charts that raised or timed out; crashed lists the
+    charts lost to a dead worker, which breaks the whole pool.
+    """
+    pool = get_pool()
+    futures = {}
+    try:
+        for chart in charts:
+            futures[pool.submit(render_chart, chart, chart_input(chart, df, groups))] = chart
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return {}, list(charts)
+    _, not_done = wait(futures, timeout)
+
+    plots = {}
+    crashed = []
+    for future, chart in futures.items():
+        if future in not_done:
+            logger.error('Chart %s did not render within %s seconds', chart.key, timeout)
+            plots[chart.key] = None
+            continue
+        try:
+            plots[chart.key] = future.result()
+        except BrokenProcessPool:
+            crashed.append(chart)
+        except Exception:
+            logger.exception('Chart %s failed to render', chart.key)
+            plots[chart.key] = None
+    if crashed or not_done:
+        _discard_pool(pool, terminate=bool(not_done))
+    return plots, crashed
+
+
+def render_charts(df, groups=None, charts=CHARTS, timeout=CHART_TIMEOUT):
+    """
+    Render chart specs concurrently, one task per chart, so a cold render
+    takes about as long as the slowest chart. Grouped charts read `groups`
+    (see aggregates.group_stats), computed from `df` when not given. Returns
+    {key: base64 PNG}, with None for charts that failed.
+
+    A worker crash takes down every chart still running in the pool, so those
+    are retried one at a time in a fresh pool; only the chart that crashes
+    again is lost.
+    """
+    if groups is None:
+        groups = frame_group_stats(df)
+    if render_workers() <= 1:
+        plots = {}
+        for chart in charts:
+            try:
+                plots[chart.key] = render_chart(chart, chart_input(chart, df, groups))
+            except Exception:
+                logger.exception('Chart %s failed to render', chart.key)
+                plots[chart.key] = None
+        return plots
+
+    plots, crashed = _render_round(charts, df, groups, timeout)
+    for chart in crashed:
+        retried, crashed_again = _render_round([chart], df, groups, timeout)
+        plots.update(retried)
+        if crashed_again:
+            logger.error('Chart %s crashed its render worker', chart.key)
+            plots[chart.key] = None
+    return {chart.key: plots[chart.key] for chart in charts}
+
+
+def chart_series(df, groups=None, charts=CHARTS):
+    """
+    Every chart's JSON series, computed in this process: reducing the frame
+    and the group stats takes milliseconds, drawing is left to the browser.
+    Returns {key: series}, with None for charts that failed.
+    """
+    if groups is None:
+        groups = frame_group_stats(df)
+    series = {}
+    for chart in charts:
+        try:
+            series[chart.key] = chart.series(chart_input(chart, df, groups))
+        except Exception:
+            logger.exception('Chart %s failed to compute', chart.key)
+            series[chart.key] = None
+    return series
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from housing_units.models import HousingUnit
+from housing_units.signals import units_updated
+from .aggregates import UNIT_FIELDS, apply_deltas, move_units, rebuild_unit_aggregates, unit_deltas
+
+
+def _row(unit):
+    return tuple(getattr(unit, name) for name in UNIT_FIELDS)
+
+
+@receiver(pre_save, sender=HousingUnit)
+@receiver(pre_delete, sender=HousingUnit)
+def remember_unit(sender, instance, **kwargs):
+    """
+    Keep the stored version of a changed or deleted unit, to take it out of
+    its groups afterwards; the instance itself may be out of date.
+    """
+    instance._aggregate_row = None
+    if instance.pk is not None and not instance._state.adding:
+        instance._aggregate_row = HousingUnit.objects.filter(pk=instance.pk).values_list(*UNIT_FIELDS).first()
+
+
+@receiver(post_save, sender=HousingUnit)
+def unit_saved(sender, instance, **kwargs):
+    apply_deltas(unit_deltas(getattr(instance, '_aggregate_row', None), _row(instance)))
+
+
+@receiver(post_delete, sender=HousingUnit)
+def unit_deleted(sender, instance, **kwargs):
+    apply_deltas(unit_deltas(getattr(instance, '_aggregate_row', None), None))
+
+
+@receiver(units_updated)
+def units_changed(sender, unit_ids=None, previous_status=None, status=None, **kwargs):
+    if unit_ids is None:
+        rebuild_unit_aggregates()
+    else:
+        move_units(unit_ids, previous_status, status)
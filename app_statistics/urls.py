@@ -5,5 +5,8 @@ app_name = "app_statistics"
 
 urlpatterns = [
     path('', views.statistics, name='statistics'),
+    path('export', views.statistics_export, name='statistics_export'),
+    path('charts/<slug:key>.json', views.chart_data, name='chart_data'),
+    path('queue', views.queue_dashboard, name='queue_analytics'),
     path('info', views.dataframe_info, name='pd_info'),
 ]
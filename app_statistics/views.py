@@ -1,285 +1,206 @@
-import pandas as pd
-import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
+import hashlib
+from django.conf import settings
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
-from io import BytesIO
-import base64
-from housing_units.models import HousingUnit
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from housing_units.inventory import get_inventory_version
+from .charts import CHARTS, CHARTS_BY_KEY
+from .aggregates import group_stats, summary_sums, unit_summary_sums
+from .house_data import HOUSE_DATA_PATH, load_house_data
+from .profiling import house_data_profile
+from .queue_analytics import is_stale, queue_analytics
+from .render_cache import cached_render, csv_fingerprint, data_fingerprint
+from .rendering import chart_series, render_charts
 
-sns.set_style("whitegrid")
-plt.rcParams['figure.facecolor'] = 'white'
+ROW_SERIES_KEY = 'statistics:series:rows'
+GROUP_SERIES_KEY = 'statistics:series:groups'
+ROW_CHARTS = [chart for chart in CHARTS if not chart.groups]
+GROUP_CHARTS = [chart for chart in CHARTS if chart.groups]
 
-def get_housing_units():
-    housing_units = HousingUnit.objects.all()
-    
-    df = pd.DataFrame()
-    for unit in housing_units:
-        new_data = pd.DataFrame([{
-            "area_type": "Carpet  Area",
-            "availability": unit.status,
-            "location": unit.address,
-            "size": f'{unit.rooms_count} BHK',
-            "society": "",
-            "total_sqft": unit.total_area,
-            "bath": 1,
-            "balcony": 1,
-            "price": 50
-        }])
-        df = pd.concat([df, new_data], ignore_index=True)
-    
-    return df
-
-def get_plot(fig):
-    buf = BytesIO()
-    fig.savefig(buf, format='png', dpi=80, bbox_inches='tight')
-    buf.seek(0)
-    img = base64.b64encode(buf.read()).decode('utf-8')
-    buf.close()
-    plt.close(fig)
-    return img
+# Sections of the statistics pages: (title, description, border colour, [(chart key, card title)])
+SECTIONS = [
+    ('Price Analysis', 'Distribution and trends of property prices', 'border-blue-500', [
+        ('price_hist', 'Price Distribution'),
+        ('price_per_sqft', 'Price per Square Foot'),
+        ('price_ranges', 'Properties by Price Range'),
+        ('scatter', 'Price vs Square Feet'),
+    ]),
+    ('Location Insights', 'Most expensive and popular locations', 'border-green-500', [
+        ('top_locations', 'Top 15 Locations by Price'),
+        ('location_counts', 'Top Locations by Property Count'),
+    ]),
+    ('Property Characteristics', 'Size, type, and availability analysis', 'border-purple-500', [
+        ('size_dist', 'Property Size Distribution'),
+        ('sqft_hist', 'Square Feet Distribution'),
+        ('area_type', 'Area Type Distribution'),
+        ('availability', 'Property Availability'),
+    ]),
+    ('Size & Space Analysis', 'How property size affects price and space', 'border-orange-500', [
+        ('price_by_size', 'Average Price by Size'),
+        ('size_sqft', 'Square Feet by Size'),
+    ]),
+    ('Amenities Impact', 'How bathrooms and balconies affect property value', 'border-pink-500', [
+        ('bathrooms', 'Bathroom Distribution'),
+        ('bath_price', 'Price by Bathrooms'),
+        ('balconies', 'Balcony Distribution'),
+        ('balcony_price', 'Price by Balconies'),
+    ]),
+]
 
 def statistics(request):
-    df = pd.read_csv('house_data.csv')
-    db_df = get_housing_units()
-    df = pd.concat([df, db_df], ignore_index=True)
-    
-    # Clean data
-    df['price'] = pd.to_numeric(df['price'], errors='coerce')
-    df['bath'] = pd.to_numeric(df['bath'], errors='coerce')
-    df['balcony'] = pd.to_numeric(df['balcony'], errors='coerce')
-    
-    def get_sqft(x):
-        try:
-            if '-' in str(x):
-                vals = str(x).split('-')
-                return (float(vals[0]) + float(vals[1])) / 2
-            return float(x)
-        except:
-            return np.nan
-    
-    df['sqft'] = df['total_sqft'].apply(get_sqft)
-    df = df.dropna(subset=['price', 'sqft'])
-    
-    df['price_per_sqft'] = df['price'] * 100000 / df['sqft']
-    
-    plots = {}
-    
-    # 1. Price Distribution
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.hist(df['price'], bins=40, color='#3B82F6', edgecolor='black', alpha=0.7)
-    ax.set_xlabel('Price (Lakhs)', fontsize=11)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Price Distribution', fontsize=13, fontweight='bold')
-    plots['price_hist'] = get_plot(fig)
-    
+    # Only the stat cards are rendered here; the page fetches each chart's series from chart_data
+    data = get_chart_data()
+    return render(request, 'statistics.html', {'stats': data['stats'], 'sections': chart_sections()})
 
 
-    # 2. Square Feet Distribution
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.hist(df['sqft'], bins=40, color='#10B981', edgecolor='black', alpha=0.7)
-    ax.set_xlabel('Square Feet', fontsize=11)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Square Feet Distribution', fontsize=13, fontweight='bold')
-    plots['sqft_hist'] = get_plot(fig)
-    
+def statistics_export(request):
+    # Charts are only re-rendered after house_data.csv or a housing unit changes
+    plots = cached_render(
+        data_fingerprint(HOUSE_DATA_PATH), build_statistics,
+        # A page with failed charts is served but rebuilt by the next request
+        is_complete=lambda result: all(result.values()),
+    )
+    return render(request, 'statistics_export.html', {
+        'plots': plots, 'stats': get_chart_data()['stats'], 'sections': chart_sections(plots),
+    })
 
 
-    # 3. Top 15 Locations
-    fig, ax = plt.subplots(figsize=(10, 6))
-    top_loc = df.groupby('location')['price'].mean().sort_values(ascending=False).head(15)
-    ax.barh(range(len(top_loc)), top_loc.values, color='#8B5CF6')
-    ax.set_yticks(range(len(top_loc)))
-    ax.set_yticklabels(top_loc.index, fontsize=9)
-    ax.set_xlabel('Average Price (Lakhs)', fontsize=11)
-    ax.set_title('Top 15 Locations by Price', fontsize=13, fontweight='bold')
-    plots['top_locations'] = get_plot(fig)
-    
+def chart_sections(plots=None):
+    """SECTIONS as the statistics templates read them, with each chart's PNG from `plots` on the export page"""
+    return [
+        {'title': title, 'description': description, 'border': border, 'charts': [
+            {'key': key, 'title': chart_title, 'plot': (plots or {}).get(key)} for key, chart_title in charts
+        ]}
+        for title, description, border, charts in SECTIONS
+    ]
 
 
-    # 4. Property Size (BHK) Distribution
-    fig, ax = plt.subplots(figsize=(10, 5))
-    size_counts = df['size'].value_counts().head(6)
-    ax.bar(range(len(size_counts)), size_counts.values, color='#F59E0B', edgecolor='black')
-    ax.set_xticks(range(len(size_counts)))
-    ax.set_xticklabels(size_counts.index, rotation=45)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Property Size Distribution', fontsize=13, fontweight='bold')
-    plots['size_dist'] = get_plot(fig)
-    
-    # 5. Price by Size (BHK)
-    fig, ax = plt.subplots(figsize=(10, 5))
-    size_price = df.groupby('size')['price'].mean().sort_values().head(8)
-    ax.barh(range(len(size_price)), size_price.values, color='#EF4444')
-    ax.set_yticks(range(len(size_price)))
-    ax.set_yticklabels(size_price.index)
-    ax.set_xlabel('Average Price (Lakhs)', fontsize=11)
-    ax.set_title('Average Price by Property Size', fontsize=13, fontweight='bold')
-    plots['price_by_size'] = get_plot(fig)
-    
-    # 6. Availability Status
-    fig, ax = plt.subplots(figsize=(10, 5))
-    avail = df['availability'].value_counts().head(8)
-    ax.bar(range(len(avail)), avail.values, color='#06B6D4', edgecolor='black')
-    ax.set_xticks(range(len(avail)))
-    ax.set_xticklabels(avail.index, rotation=45, ha='right', fontsize=9)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Property Availability', fontsize=13, fontweight='bold')
-    plots['availability'] = get_plot(fig)
-    
-    # 7. Area Type Distribution
-    fig, ax = plt.subplots(figsize=(10, 5))
-    area_counts = df['area_type'].value_counts()
-    colors = ['#3B82F6', '#10B981', '#F59E0B', '#EF4444']
-    ax.pie(area_counts.values, labels=area_counts.index, autopct='%1.1f%%', 
-           colors=colors, startangle=90)
-    ax.set_title('Area Type Distribution', fontsize=13, fontweight='bold')
-    plots['area_type'] = get_plot(fig)
-    
-    # 8. Bathrooms Analysis
-    fig, ax = plt.subplots(figsize=(10, 5))
-    bath_counts = df['bath'].value_counts().sort_index().head(6)
-    ax.bar(bath_counts.index, bath_counts.values, color='#8B5CF6', edgecolor='black')
-    ax.set_xlabel('Number of Bathrooms', fontsize=11)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Bathroom Distribution', fontsize=13, fontweight='bold')
-    plots['bathrooms'] = get_plot(fig)
-    
-    # 9. Balcony Analysis
-    fig, ax = plt.subplots(figsize=(10, 5))
-    balcony_counts = df['balcony'].value_counts().sort_index().head(6)
-    ax.bar(balcony_counts.index, balcony_counts.values, color='#EC4899', edgecolor='black')
-    ax.set_xlabel('Number of Balconies', fontsize=11)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Balcony Distribution', fontsize=13, fontweight='bold')
-    plots['balconies'] = get_plot(fig)
-    
-    # 10. Price per Square Foot Distribution
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.hist(df['price_per_sqft'], bins=40, color='#14B8A6', edgecolor='black', alpha=0.7)
-    ax.set_xlabel('Price per Sq Ft (₹)', fontsize=11)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Price per Square Foot Distribution', fontsize=13, fontweight='bold')
-    plots['price_per_sqft'] = get_plot(fig)
-    
-    # 11. Price vs Sqft Scatter
-    fig, ax = plt.subplots(figsize=(10, 5))
-    sample = df.sample(min(1000, len(df)))
-    ax.scatter(sample['sqft'], sample['price'], alpha=0.5, s=30, color='#3B82F6')
-    ax.set_xlabel('Square Feet', fontsize=11)
-    ax.set_ylabel('Price (Lakhs)', fontsize=11)
-    ax.set_title('Price vs Square Feet', fontsize=13, fontweight='bold')
-    plots['scatter'] = get_plot(fig)
-    
-    # 12. Bath vs Price
-    fig, ax = plt.subplots(figsize=(10, 5))
-    bath_price = df.groupby('bath')['price'].mean().dropna().head(7)
-    ax.plot(bath_price.index, bath_price.values, marker='o', linewidth=2, 
-            markersize=8, color='#8B5CF6')
-    ax.set_xlabel('Bathrooms', fontsize=11)
-    ax.set_ylabel('Average Price (Lakhs)', fontsize=11)
-    ax.set_title('Price by Number of Bathrooms', fontsize=13, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    plots['bath_price'] = get_plot(fig)
-    
-    
-    # 13. Balcony vs Price
-    fig, ax = plt.subplots(figsize=(10, 5))
-    balcony_price = df.groupby('balcony')['price'].mean().dropna().head(7)
-    ax.plot(balcony_price.index, balcony_price.values, marker='s', linewidth=2,
-            markersize=8, color='#EC4899')
-    ax.set_xlabel('Balconies', fontsize=11)
-    ax.set_ylabel('Average Price (Lakhs)', fontsize=11)
-    ax.set_title('Price by Number of Balconies', fontsize=13, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    plots['balcony_price'] = get_plot(fig)
-    
+def chart_fingerprint(chart):
+    """Row-based charts only read house_data.csv; grouped charts also count the housing units"""
+    return (data_fingerprint if chart.groups else csv_fingerprint)(HOUSE_DATA_PATH)
 
-    # 14. Properties by Location (Top 15)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    loc_counts = df['location'].value_counts().head(15)
-    ax.barh(range(len(loc_counts)), loc_counts.values, color='#F59E0B')
-    ax.set_yticks(range(len(loc_counts)))
-    ax.set_yticklabels(loc_counts.index, fontsize=9)
-    ax.set_xlabel('Number of Properties', fontsize=11)
-    ax.set_title('Top 15 Locations by Property Count', fontsize=13, fontweight='bold')
-    plots['location_counts'] = get_plot(fig)
-    
-    # 15. Price Range Categories
-    fig, ax = plt.subplots(figsize=(10, 5))
-    bins = [0, 50, 100, 150, 200, df['price'].max()]
-    labels = ['0-50L', '50-100L', '100-150L', '150-200L', '200L+']
-    df['price_range'] = pd.cut(df['price'], bins=bins, labels=labels)
-    range_counts = df['price_range'].value_counts().sort_index()
-    colors = ['#10B981', '#3B82F6', '#F59E0B', '#EF4444', '#8B5CF6']
-    ax.bar(range(len(range_counts)), range_counts.values, color=colors, edgecolor='black')
-    ax.set_xticks(range(len(range_counts)))
-    ax.set_xticklabels(range_counts.index)
-    ax.set_ylabel('Count', fontsize=11)
-    ax.set_title('Properties by Price Range', fontsize=13, fontweight='bold')
-    plots['price_ranges'] = get_plot(fig)
-    
-    # 16. Size vs Square Feet
-    fig, ax = plt.subplots(figsize=(10, 5))
-    size_sqft = df.groupby('size')['sqft'].mean().sort_values().head(8)
-    ax.barh(range(len(size_sqft)), size_sqft.values, color='#06B6D4')
-    ax.set_yticks(range(len(size_sqft)))
-    ax.set_yticklabels(size_sqft.index)
-    ax.set_xlabel('Average Square Feet', fontsize=11)
-    ax.set_title('Average Square Feet by Property Size', fontsize=13, fontweight='bold')
-    plots['size_sqft'] = get_plot(fig)
-    
-    # Stats
-    stats = {
-        'total': len(df),
-        'avg_price': round(df['price'].mean(), 1),
-        'avg_sqft': round(df['sqft'].mean(), 0),
-        'avg_price_per_sqft': round(df['price_per_sqft'].mean(), 0),
+
+def chart_etag(request, key):
+    if key not in CHARTS_BY_KEY:
+        return None
+    return _etag(chart_fingerprint(CHARTS_BY_KEY[key]), key)
+
+
+def _etag(fingerprint, key):
+    return '"%s"' % hashlib.md5(f'{fingerprint}:{key}'.encode()).hexdigest()
+
+
+@condition(etag_func=chart_etag)
+def chart_data(request, key):
+    """One chart's series as JSON; revalidated by ETag, so unchanged data costs a 304"""
+    if key not in CHARTS_BY_KEY:
+        raise Http404('Unknown chart')
+    data = get_chart_data()
+    series = data['series'][key]
+    if series is None:
+        raise Http404('Chart unavailable')
+    response = JsonResponse(series)
+    # While another worker rebuilds, the stale series is served under its own ETag
+    response['ETag'] = _etag(data['fingerprints'][key], key)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'STATISTICS_CHART_MAX_AGE', 300))
+    return response
+
+
+def get_chart_data():
+    """
+    Every chart's series and the summary stats. The row-based series are
+    rebuilt only after house_data.csv changes; a housing unit change only
+    rebuilds the grouped series and the stats, from group_stats() and sums.
+    """
+    rows = cached_render(
+        csv_fingerprint(HOUSE_DATA_PATH), build_row_data, key=ROW_SERIES_KEY,
+        is_complete=lambda result: all(result['series'].values()),
+    )
+    # Grouped data is rebuilt along with the row data it was built with
+    fingerprint = f"{rows['fingerprint']}:{get_inventory_version()}"
+    groups = cached_render(
+        fingerprint, lambda: build_group_data(fingerprint, rows['sums']), key=GROUP_SERIES_KEY,
+        is_complete=lambda result: all(result['series'].values()),
+    )
+    series = {**rows['series'], **groups['series']}
+    return {
+        'fingerprints': {chart.key: (groups if chart.groups else rows)['fingerprint'] for chart in CHARTS},
+        'series': {chart.key: series[chart.key] for chart in CHARTS},
+        'stats': groups['stats'],
     }
-    
-    return render(request, 'statistics.html', {'plots': plots, 'stats': stats})
 
 
+def build_row_data():
+    """The series of the charts drawn from house_data rows, and the sums of those rows"""
+    fingerprint = csv_fingerprint(HOUSE_DATA_PATH)
+    df = load_statistics_frame()
+    return {'fingerprint': fingerprint, 'series': chart_series(df, {}, ROW_CHARTS), 'sums': summary_sums(df)}
+
+
+def build_group_data(fingerprint, house_sums):
+    """The series of the grouped charts and the summary stats, for the data identified by `fingerprint`"""
+    return {
+        'fingerprint': fingerprint,
+        'series': chart_series(None, group_stats(), GROUP_CHARTS),
+        'stats': summary_stats(house_sums, unit_summary_sums()),
+    }
+
+
+def build_statistics():
+    """Render every chart of the statistics page (see charts.CHARTS) as PNG"""
+    return render_charts(load_statistics_frame(), group_stats())
+
+
+def load_statistics_frame():
+    # house_data comes pre-parsed from the column file; housing units only enter the grouped charts and the stats
+    df = load_house_data().dropna(subset=['price', 'sqft'])
+    df['price_per_sqft'] = df['price'] * 100000 / df['sqft']
+    return df
+
+
+def summary_stats(*sums):
+    """Stat cards of the rows summed up in `sums` (see aggregates.summary_sums)"""
+    count = sum(part['count'] for part in sums)
+
+    def mean(name):
+        return sum(part[name] for part in sums) / count if count else float('nan')
+
+    return {
+        'total': count,
+        'avg_price': round(mean('price'), 1),
+        'avg_sqft': round(mean('sqft'), 0),
+        'avg_price_per_sqft': round(mean('price_per_sqft'), 0),
+    }
+
+
+def queue_dashboard(request):
+    # Counted by the database in `manage.py compute_queue_analytics`; only read here
+    data = queue_analytics()
+    if data is None:
+        return render(request, 'queue_analytics.html', {'series': None, 'stats': None})
+    return render(request, 'queue_analytics.html', {**data, 'stale': is_stale(data)})
+
 
 def dataframe_info(request):
-    df = pd.read_csv('house_data.csv')
-    
+    # Served from the stored profile; only a changed house_data.csv is profiled again
+    profile = house_data_profile()
     info = {
-        'shape': df.shape,
-        'columns': list(df.columns),
-        'dtypes': df.dtypes.to_dict(),
-        'memory': f"{df.memory_usage(deep=True).sum() / 1024:.2f} KB",
+        'shape': (profile['rows'], len(profile['columns'])),
+        'columns': profile['columns'],
+        'dtypes': profile['dtypes'],
+        'memory': f"{profile['memory'] / 1024:.2f} KB",
+        'sampled_rows': profile['sampled_rows'],
     }
-    
-    # Describe for numeric columns
-    describe_raw = df.describe().to_dict()
-    describe = {}
-    for col, stats in describe_raw.items():
-        describe[col] = {
-            'count': stats.get('count'),
-            'mean': stats.get('mean'),
-            'std': stats.get('std'),
-            'min': stats.get('min'),
-            'q25': stats.get('25%'),
-            'q50': stats.get('50%'),
-            'q75': stats.get('75%'),
-            'max': stats.get('max'),
-        }
-    
-    missing = df.isnull().sum().to_dict()
-    
     value_counts = {
-        'location': df['location'].value_counts().head(5).to_dict(),
-        'size': df['size'].value_counts().to_dict(),
-        'area_type': df['area_type'].value_counts().to_dict(),
+        'location': dict(list(profile['value_counts']['location'].items())[:5]),
+        'size': profile['value_counts']['size'],
+        'area_type': profile['value_counts']['area_type'],
     }
-    
     context = {
         'info': info,
-        'describe': describe,
-        'missing': missing,
+        'describe': profile['describe'],
+        'missing': profile['missing'],
         'value_counts': value_counts,
     }
     
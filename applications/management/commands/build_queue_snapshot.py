@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import Application
+from applications.snapshot import snapshot_path, write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Freeze the ranked IN_QUEUE list into the memory-mapped snapshot read by the public queue pages. '
+        'Run periodically (e.g. from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Snapshot file to write (defaults to settings.QUEUE_SNAPSHOT_PATH)')
+
+    def handle(self, *args, **options):
+        path = options['path'] or snapshot_path()
+        rows = (
+            Application.objects.filter(queue_rank__isnull=False)
+            .order_by('queue_rank')
+            .values_list('id', 'application_number', 'priority_score', 'queue_rank')
+            .iterator(chunk_size=10000)
+        )
+        version, count = write_snapshot(rows, path)
+        self.stdout.write(f'Wrote queue snapshot v{version} with {count} applications to {path}.')
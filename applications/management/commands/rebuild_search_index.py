@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import Application
+from applications.search import index_applications
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram search index for all applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        applications = Application.objects.select_related('applicant').order_by('id').iterator(chunk_size=chunk_size)
+        chunk = []
+        total = 0
+        for application in applications:
+            chunk.append(application)
+            if len(chunk) >= chunk_size:
+                index_applications(chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            index_applications(chunk)
+            total += len(chunk)
+        self.stdout.write(f'Indexed {total} applications.')
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from applications.models import Application
+from applications.queue_cache import bump_queue_version
+from applications.ranking import RANKED_STATUS, lock_ranking, rebuild_queue_ranks
+from applications.scoring import DECIMAL_FIELDS, SCORING_FIELDS, priority_score_expression, priority_scores, to_cents
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class Command(BaseCommand):
+    help = 'Recalculate priority scores and queue ranks for all applications in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='Number of applications read and written per batch')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report how many scores and ranks would change without writing')
+        parser.add_argument('--in-database', action='store_true',
+                            help='Rescore with a single SQL UPDATE instead of the NumPy engine')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if options['in_database']:
+            return self.rescore_in_database(options['dry_run'], chunk_size)
+
+        if options['dry_run']:
+            self.rescore(chunk_size, dry_run=True)
+            return
+        # Read, rank and write in one transaction under the rank lock, so a rank move
+        # made by a concurrent save can't land in between and be overwritten
+        with transaction.atomic():
+            lock_ranking()
+            self.rescore(chunk_size, dry_run=False)
+
+    def rescore(self, chunk_size, dry_run):
+        """Score and rank every application with NumPy; unless `dry_run`, write the scores and ranks that changed"""
+        fields = ('id', 'status', 'submission_date', 'queue_rank', 'priority_score') + SCORING_FIELDS
+        rows = Application.objects.order_by('id').values_list(*fields).iterator(chunk_size=chunk_size)
+
+        chunks = []
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                chunks.append(self.score_chunk(chunk))
+                chunk = []
+        if chunk:
+            chunks.append(self.score_chunk(chunk))
+
+        if not chunks:
+            self.stdout.write('No applications to rescore.')
+            return
+
+        ids, queued, submitted, old_ranks, old_scores, new_scores = (
+            np.concatenate(column) for column in zip(*chunks)
+        )
+        new_ranks = self.rank(ids, queued, submitted, new_scores)
+
+        score_changed = new_scores != old_scores
+        rank_changed = new_ranks != old_ranks
+        self.stdout.write(
+            f'{score_changed.sum()} of {len(ids)} scores and {rank_changed.sum()} ranks '
+            f'{"would change" if dry_run else "changed"}.'
+        )
+        if dry_run:
+            return
+
+        self.write(ids[score_changed], new_scores[score_changed], 'priority_score', chunk_size)
+        self.write(ids[rank_changed], new_ranks[rank_changed], 'queue_rank', chunk_size)
+        bump_queue_version()
+
+    def rescore_in_database(self, dry_run, chunk_size):
+        """Let the database evaluate the compiled scoring expression for every row"""
+        expression = priority_score_expression()
+        if dry_run:
+            changed = Application.objects.alias(new_score=expression).exclude(
+                priority_score=F('new_score')
+            ).count()
+            self.stdout.write(f'{changed} scores would change.')
+            return
+
+        with transaction.atomic():
+            lock_ranking()
+            changed = Application.objects.alias(new_score=expression).exclude(
+                priority_score=F('new_score')
+            ).update(priority_score=expression)
+            moved = rebuild_queue_ranks(batch_size=chunk_size)
+        self.stdout.write(f'{changed} scores and {moved} ranks changed.')
+
+    def score_chunk(self, chunk):
+        """Turn a list of value rows into column arrays and score them"""
+        columns = list(zip(*chunk))
+        ids, statuses, submission_dates, queue_ranks, scores = columns[:5]
+        scoring = dict(zip(SCORING_FIELDS, columns[5:]))
+
+        arrays = {
+            name: to_cents(values) if name in DECIMAL_FIELDS else np.asarray(values, dtype=np.int64)
+            for name, values in scoring.items()
+        }
+
+        return (
+            np.asarray(ids, dtype=np.int64),
+            np.asarray(statuses, dtype=object) == RANKED_STATUS,
+            np.fromiter(((d - EPOCH) // MICROSECOND for d in submission_dates), dtype=np.int64, count=len(chunk)),
+            np.fromiter((0 if r is None else r for r in queue_ranks), dtype=np.int64, count=len(chunk)),
+            np.asarray(scores, dtype=np.int64),
+            priority_scores(arrays),
+        )
+
+    def rank(self, ids, queued, submitted, scores):
+        """Dense 1-based ranks in canonical queue order; 0 for applications outside the queue"""
+        ranks = np.zeros_like(ids)
+        queued_idx = np.flatnonzero(queued)
+        # lexsort uses the last key as the primary one
+        order = np.lexsort((ids[queued_idx], submitted[queued_idx], -scores[queued_idx]))
+        ranks[queued_idx[order]] = np.arange(1, len(order) + 1)
+        return ranks
+
+    def write(self, ids, values, field, batch_size):
+        objs = []
+        for pk, value in zip(ids.tolist(), values.tolist()):
+            if field == 'queue_rank' and value == 0:
+                value = None
+            objs.append(Application(id=pk, **{field: value}))
+        Application.objects.bulk_update(objs, [field], batch_size=batch_size)
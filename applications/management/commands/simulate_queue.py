@@ -0,0 +1,30 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from applications.simulation import HISTORY_MONTHS, estimates_path, simulate_queue, write_estimates
+
+
+class Command(BaseCommand):
+    help = (
+        'Project when each application in the queue is likely to receive a housing offer and store the '
+        'estimates shown on the queue check page. Run periodically (e.g. nightly from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=10, help='Simulation horizon in years')
+        parser.add_argument('--history-months', type=int, default=HISTORY_MONTHS,
+                            help='Months of past offers used for the baseline inflow rate')
+        parser.add_argument('--path', help='Estimates file to write (defaults to settings.QUEUE_ESTIMATES_PATH)')
+        parser.add_argument('--dry-run', action='store_true', help='Report the projection without storing it')
+
+    def handle(self, *args, **options):
+        ids, offer_months = simulate_queue(years=options['years'], history_months=options['history_months'])
+        offered = ~np.isnat(offer_months)
+        summary = f'{offered.sum()} of {len(ids)} applications projected to receive an offer within {options["years"]} years'
+        if offered.any():
+            summary += f', the last in {np.max(offer_months[offered]).item():%B %Y}'
+        self.stdout.write(summary + '.')
+        if not options['dry_run']:
+            path = options['path'] or estimates_path()
+            write_estimates(ids, offer_months, path)
+            self.stdout.write(f'Wrote estimates to {path}.')
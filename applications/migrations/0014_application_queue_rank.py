@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_queue_ranks(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    queued = Application.objects.filter(status='IN_QUEUE').order_by('-priority_score', 'submission_date', 'id')
+    batch = []
+    for rank, application in enumerate(queued.only('id').iterator(), start=1):
+        application.queue_rank = rank
+        batch.append(application)
+    Application.objects.bulk_update(batch, ['queue_rank'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0013_alter_application_category_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='queue_rank',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['queue_rank'], name='application_queue_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['-priority_score', 'submission_date', 'id'], name='application_rank_key_idx'),
+        ),
+        migrations.RunPython(populate_queue_ranks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:02
+
+from django.db import migrations, models
+
+
+def seed_application_number_sequence(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    ApplicationNumberSequence = apps.get_model('applications', 'ApplicationNumberSequence')
+    last_value = 0
+    for number in Application.objects.values_list('application_number', flat=True).iterator():
+        suffix = number[3:]
+        if suffix.isdigit():
+            last_value = max(last_value, int(suffix))
+    ApplicationNumberSequence.objects.update_or_create(
+        name='application_number', defaults={'last_value': last_value}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0014_application_queue_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationNumberSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_application_number_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_search_grams(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    ApplicationSearchGram = apps.get_model('applications', 'ApplicationSearchGram')
+
+    def grams(text):
+        text = (text or '').lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    batch = []
+    for application in Application.objects.select_related('applicant').iterator():
+        applicant = application.applicant
+        values = {
+            'iin': applicant.iin,
+            'number': application.application_number,
+            'name': f"{applicant.first_name} {applicant.last_name}",
+        }
+        for field, text in values.items():
+            batch.extend(
+                ApplicationSearchGram(application_id=application.id, field=field, gram=gram)
+                for gram in grams(text)
+            )
+        if len(batch) >= 5000:
+            ApplicationSearchGram.objects.bulk_create(batch)
+            batch = []
+    ApplicationSearchGram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0015_applicationnumbersequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationSearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('iin', 'IIN'), ('number', 'Application Number'), ('name', 'Applicant Name')], max_length=10)),
+                ('gram', models.CharField(max_length=3)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_grams', to='applications.application')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['field', 'gram', 'application'], name='application_search_gram_idx')],
+            },
+        ),
+        migrations.RunPython(populate_search_grams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def reindex_numbers(apps, schema_editor):
+    """Index application numbers without their shared APP prefix (see search.strip_number_prefix)"""
+    Application = apps.get_model('applications', 'Application')
+    ApplicationSearchGram = apps.get_model('applications', 'ApplicationSearchGram')
+
+    def grams(text):
+        text = (text or '').lower()
+        if text.startswith('app'):
+            text = text[3:]
+        elif text.startswith('pp'):
+            text = text[2:]
+        elif text.startswith('p'):
+            text = text[1:]
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    ApplicationSearchGram.objects.filter(field='number').delete()
+    batch = []
+    for application_id, number in Application.objects.values_list('id', 'application_number').iterator():
+        batch.extend(
+            ApplicationSearchGram(application_id=application_id, field='number', gram=gram)
+            for gram in grams(number)
+        )
+        if len(batch) >= 5000:
+            ApplicationSearchGram.objects.bulk_create(batch)
+            batch = []
+    ApplicationSearchGram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0018_application_category_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_numbers, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
 from users.models import User
 import os, uuid
+from .ranking import sync_queue_rank
+from . import scoring
+from .numbering import allocator
 
 class Application(models.Model):
     # Category choices based on eligibility groups
@@ -70,6 +73,8 @@ class Application(models.Model):
     elderly_count = models.PositiveSmallIntegerField(default=0)
     
     priority_score = models.IntegerField(default=0)
+    # 1-based position in the IN_QUEUE ranking, kept up to date by applications.ranking
+    queue_rank = models.PositiveIntegerField(null=True, blank=True, editable=False)
     
     document_verified = models.BooleanField(default=False)
     
@@ -82,38 +87,31 @@ class Application(models.Model):
     has_emergency_housing = models.BooleanField(default=False)  # For emergency housing status
     # emergency_housing_document = models.FileField(upload_to='documents/', null=True, blank=True)  # Proof of emergency housing
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['queue_rank'], name='application_queue_rank_idx'),
+            models.Index(fields=['-priority_score', 'submission_date', 'id'], name='application_rank_key_idx'),
+            # Status filters ordered by the queue key (dashboard, rank rebuilds)
+            models.Index(fields=['status', '-priority_score', 'submission_date', 'id'], name='application_status_rank_idx'),
+            models.Index(fields=['status', 'submission_date'], name='application_status_date_idx'),
+            # Category and status counts of the queue analytics page
+            models.Index(fields=['category', 'status'], name='application_category_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the ranking and search inputs as loaded so saves can tell if they changed
+        instance._loaded_rank_key = (instance.__dict__.get('priority_score'), instance.__dict__.get('status'))
+        instance._loaded_search_key = (instance.__dict__.get('application_number'), instance.__dict__.get('applicant_id'))
+        return instance
+
     def __str__(self):
         return f"Application {self.application_number} - {self.applicant}"
     
     def calculate_priority(self):
-        """Calculate priority score based on various criteria"""
-        score = 0
-        reference_income = 100000
-        
-        if self.monthly_income < reference_income:
-            income_factor = (reference_income - self.monthly_income) / reference_income
-            score += int(income_factor * 20)  # Max 20 points for income
-        
-        score += self.children_count * 10
-        if self.has_disability:
-            score += 15
-        
-        if (self.adults_count + self.children_count + self.elderly_count) > 0 and self.current_living_area:
-            space_per_person = self.current_living_area / (self.adults_count + self.children_count + self.elderly_count)
-            if space_per_person < 6:
-                score += 15
-            elif space_per_person < 10:
-                score += 10
-            elif space_per_person < 15:
-                score += 5
-
-        if self.is_veteran:
-            score += 10
-        
-        if self.is_single_parent:
-            score += 10
-        
-        score += self.waiting_years * 5
+        """Calculate priority score based on various criteria (see scoring.PRIORITY_RULES)"""
+        score = scoring.score_application(self)
         
         self.priority_score = score
         self.save(update_fields=['priority_score'])
@@ -121,15 +119,43 @@ class Application(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.application_number:
-            last_application = Application.objects.order_by('-id').first()
-            if last_application:
-                last_id = int(last_application.application_number[3:])
-                self.application_number = f"APP{last_id + 1:06d}"
-            else:
-                self.application_number = "APP000001"
+            self.application_number = allocator.next_number()
 
         super().save(*args, **kwargs)
 
+        rank_key = (self.priority_score, self.status)
+        if getattr(self, '_loaded_rank_key', None) != rank_key:
+            sync_queue_rank(self)
+            self._loaded_rank_key = rank_key
+
+class ApplicationNumberSequence(models.Model):
+    """Counter row behind applications.numbering.ApplicationNumberAllocator"""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+class ApplicationSearchGram(models.Model):
+    """Trigram index behind substring searches on IIN, application number and applicant name"""
+    FIELD_CHOICES = [
+        ('iin', 'IIN'),
+        ('number', 'Application Number'),
+        ('name', 'Applicant Name'),
+    ]
+
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='search_grams')
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['field', 'gram', 'application'], name='application_search_gram_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id} {self.field}: {self.gram}"
+
 class ApplicationHistory(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='history')
     previous_status = models.CharField(max_length=30, choices=Application.STATUS_CHOICES)
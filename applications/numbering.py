@@ -0,0 +1,67 @@
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+
+SEQUENCE_NAME = 'application_number'
+DEFAULT_BLOCK_SIZE = 100
+# Every application number starts with this, followed by the zero-padded counter value
+NUMBER_PREFIX = 'APP'
+
+
+def format_application_number(value):
+    return f"{NUMBER_PREFIX}{value:06d}"
+
+
+class ApplicationNumberAllocator:
+    """
+    Hands out application numbers from a counter row in ApplicationNumberSequence.
+
+    The counter row is locked and advanced by a whole block at a time, and the
+    rest of the block is kept in process memory, so most inserts need no query
+    and concurrent workers can never receive the same number. Numbers left over
+    when a worker exits are skipped, so the sequence may have gaps.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size or getattr(settings, 'APPLICATION_NUMBER_BLOCK_SIZE', DEFAULT_BLOCK_SIZE)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0  # exclusive
+
+    def next_number(self):
+        """Return the next formatted application number"""
+        return self.reserve(1)[0]
+
+    def reserve(self, count):
+        """Return `count` formatted application numbers, e.g. for bulk_create"""
+        with self._lock:
+            values = []
+            cached = min(count, self._end - self._next)
+            values.extend(range(self._next, self._next + cached))
+            self._next += cached
+
+            missing = count - cached
+            if missing:
+                # A block fetched inside an outer transaction may be rolled back
+                # together with it, so it must not outlive that transaction.
+                keep_rest = not connection.in_atomic_block
+                size = max(missing, self.block_size) if keep_rest else missing
+                start = self._fetch_block(size)
+                values.extend(range(start, start + missing))
+                if keep_rest:
+                    self._next, self._end = start + missing, start + size
+        return [format_application_number(value) for value in values]
+
+    def _fetch_block(self, size):
+        """Advance the shared counter by `size` and return the first value of the block"""
+        from .models import ApplicationNumberSequence
+
+        with transaction.atomic():
+            sequence, _ = ApplicationNumberSequence.objects.select_for_update().get_or_create(name=SEQUENCE_NAME)
+            start = sequence.last_value + 1
+            sequence.last_value += size
+            sequence.save(update_fields=['last_value'])
+        return start
+
+
+allocator = ApplicationNumberAllocator()
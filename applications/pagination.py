@@ -0,0 +1,151 @@
+import base64
+import binascii
+import datetime
+import json
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator; iterates like a Django Page"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor (seek) pagination over a unique ordering such as
+    ('-priority_score', 'submission_date', 'id').
+
+    Instead of COUNT + OFFSET, every page is fetched with a WHERE clause that
+    starts right after (or before) the boundary row, so deep pages cost the same
+    as the first one when the ordering is backed by an index. Cursors are opaque
+    base64 strings holding the boundary key and the direction.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.per_page = per_page
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def encode_cursor(self, obj, direction):
+        # isoformat() keeps microseconds, which DjangoJSONEncoder would truncate
+        key = [
+            value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value
+            for value in (getattr(obj, name) for name, _ in self.fields)
+        ]
+        raw = json.dumps({'k': key, 'd': direction}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return (key, direction), or (None, 'next') for a missing or malformed cursor"""
+        if not cursor:
+            return None, 'next'
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            data = json.loads(raw)
+            opts = self.queryset.model._meta
+            key = [
+                opts.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, data['k'], strict=True)
+            ]
+            direction = 'prev' if data['d'] == 'prev' else 'next'
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            return None, 'next'
+        return key, direction
+
+    def seek(self, key, forward):
+        """Q selecting rows strictly after (forward) or before the key in the ordering"""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, key):
+            lookup = 'gt' if descending != forward else 'lt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def page(self, cursor=None):
+        key, direction = self.decode_cursor(cursor)
+        forward = direction == 'next'
+
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self.seek(key, forward))
+        ordering = self.ordering if forward else [
+            name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering
+        ]
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or not forward:
+                next_cursor = self.encode_cursor(rows[-1], 'next')
+            if (has_more or forward) and key is not None:
+                previous_cursor = self.encode_cursor(rows[0], 'prev')
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class SnapshotPaginator:
+    """
+    Pages over the records of a QueueSnapshot between two ranks.
+
+    Ranks are dense array positions in the snapshot, so any page is an O(1)
+    slice; cursors hold the first rank of the page.
+    """
+
+    def __init__(self, snapshot, first_rank, last_rank, per_page):
+        self.snapshot = snapshot
+        self.first_rank = max(first_rank, 1)
+        self.last_rank = min(last_rank, snapshot.count)
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(rank):
+        raw = json.dumps({'r': rank})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return self.first_rank
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            rank = int(json.loads(raw)['r'])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            return self.first_rank
+        return min(max(rank, self.first_rank), max(self.last_rank, self.first_rank))
+
+    def page(self, cursor=None):
+        start = self.decode_cursor(cursor)
+        end = min(start + self.per_page - 1, self.last_rank)
+        records = self.snapshot.slice(start, end)
+        next_cursor = self.encode_cursor(end + 1) if end < self.last_rank else None
+        previous_cursor = (
+            self.encode_cursor(max(start - self.per_page, self.first_rank)) if start > self.first_rank else None
+        )
+        return KeysetPage(records, next_cursor, previous_cursor)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+QUEUE_VERSION_KEY = 'queue:version'
+# What changed in the queue at one version (see bump_queue_version)
+CHANGE_KEY = 'queue:change:{version}'
+POSITION_KEY = 'queue:position:{iin}'
+TOTAL_KEY = 'queue:total'
+# Logged changes looked through to revalidate a cached position; further behind, it is recomputed
+MAX_CHANGES = 200
+# Change of unknown extent, e.g. a rebuild: every cached position is dropped
+EVERYTHING = 'all'
+
+
+def _timeout():
+    return getattr(settings, 'QUEUE_POSITION_CACHE_TIMEOUT', 300)
+
+
+def get_queue_version():
+    version = cache.get(QUEUE_VERSION_KEY)
+    if version is None:
+        # Seed with a timestamp so a version lost to eviction never reuses old entries
+        cache.add(QUEUE_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(QUEUE_VERSION_KEY)
+    return version
+
+
+def bump_queue_version(ranks=None, applicants=()):
+    """
+    Log a queue change once the current transaction commits: the ranks from
+    ranks[0] to ranks[1] (None for the end of the queue) moved, and the
+    applications of the `applicants` (user ids) changed. Only the cached
+    positions these touch are dropped; with no arguments, all of them are.
+    """
+    if ranks is None and not applicants:
+        change = EVERYTHING
+    else:
+        change = (tuple(ranks) if ranks else None, tuple(applicants))
+    transaction.on_commit(lambda: _bump_now(change))
+
+
+def _bump_now(change):
+    try:
+        version = cache.incr(QUEUE_VERSION_KEY)
+    except ValueError:
+        # Without a version to follow on from, no logged change is missing, so old entries can't be revalidated
+        cache.set(QUEUE_VERSION_KEY, time.time_ns(), None)
+        return
+    cache.set(CHANGE_KEY.format(version=version), change, _timeout())
+
+
+def _still_valid(entry, version):
+    """Whether no change logged since the entry's version touches its rank or its applicant"""
+    if entry['version'] == version:
+        return True
+    if not 0 < version - entry['version'] <= MAX_CHANGES:
+        return False
+    keys = [CHANGE_KEY.format(version=v) for v in range(entry['version'] + 1, version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return False
+    rank = entry['position']['queue_position']
+    for change in changes.values():
+        if change == EVERYTHING:
+            return False
+        ranks, applicants = change
+        if entry['applicant_id'] in applicants:
+            return False
+        if ranks and rank is not None and ranks[0] <= rank and (ranks[1] is None or rank <= ranks[1]):
+            return False
+    return True
+
+
+def compute_queue_position(iin):
+    """
+    (Queue details for the best-placed active application of the user with
+    this IIN, the user's id), or (None, None) without one; the details leave
+    out total_queued, which is shared by every applicant (see queue_total).
+    """
+    from .models import Application
+
+    applications = Application.objects.filter(
+        applicant__iin=iin, status__in=['SUBMITTED', 'IN_QUEUE']
+    )
+    application = applications.order_by(F('queue_rank').asc(nulls_last=True), 'submission_date').values(
+        'applicant_id', 'application_number', 'status', 'priority_score', 'queue_rank'
+    ).first()
+    if application is None:
+        return None, None
+    return {
+        'application_number': application['application_number'],
+        'status': application['status'],
+        'priority_score': application['priority_score'],
+        'queue_position': application['queue_rank'],
+    }, application['applicant_id']
+
+
+def queue_total(version):
+    """Number of ranked applications, counted once per queue version"""
+    from .ranking import total_ranked
+
+    entry = cache.get(TOTAL_KEY)
+    if entry is None or entry[0] != version:
+        entry = (version, total_ranked())
+        cache.set(TOTAL_KEY, entry, _timeout())
+    return entry[1]
+
+
+def get_queue_position(iin):
+    """
+    Cached compute_queue_position, with total_queued.
+
+    An entry stays valid until a logged change moves its rank or touches its
+    applicant's applications, so submissions and moves elsewhere in the
+    queue keep it cached. A hit needs no query on the Application table,
+    except once per queue version to count the queue. Lookups finding no
+    active application are not cached, so a new application shows at once.
+    Returns (payload, etag); payload is None when no active application exists.
+    """
+    version = get_queue_version()
+    key = POSITION_KEY.format(iin=iin)
+    entry = cache.get(key)
+    if entry is None or not _still_valid(entry, version):
+        position, applicant_id = compute_queue_position(iin)
+        if position is None:
+            return None, '"%s"' % hashlib.md5(f'none:{iin}'.encode()).hexdigest()
+        entry = {'version': version, 'position': position, 'applicant_id': applicant_id}
+        cache.set(key, entry, _timeout())
+    elif entry['version'] != version:
+        entry = {**entry, 'version': version}
+        cache.set(key, entry, _timeout())
+
+    payload = {**entry['position'], 'total_queued': queue_total(version)}
+    body = json.dumps(payload, sort_keys=True)
+    return payload, '"%s"' % hashlib.md5(body.encode()).hexdigest()
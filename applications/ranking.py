@@ -0,0 +1,212 @@
+from django.db import transaction
+from django.db.models import Case, F, Max, Q, Value, When
+from .queue_cache import bump_queue_version
+
+# Canonical queue order: higher score first, then earlier submission, then id
+RANK_ORDERING = ('-priority_score', 'submission_date', 'id')
+RANKED_STATUS = 'IN_QUEUE'
+# Key of the PostgreSQL advisory lock held while ranks move
+RANK_LOCK_ID = 0x51554555
+
+
+def _ranked_queryset():
+    from .models import Application
+    return Application.objects.filter(queue_rank__isnull=False)
+
+
+def _after_key(priority_score, submission_date, pk):
+    """Q matching applications that come after the given key in queue order"""
+    return (
+        Q(priority_score__lt=priority_score)
+        | Q(priority_score=priority_score, submission_date__gt=submission_date)
+        | Q(priority_score=priority_score, submission_date=submission_date, id__gt=pk)
+    )
+
+
+def total_ranked():
+    """Number of applications currently holding a queue rank"""
+    return _ranked_queryset().aggregate(total=Max('queue_rank'))['total'] or 0
+
+
+def lock_ranking():
+    """
+    Serialize rank moves until the current transaction ends.
+
+    Every move reads neighbouring ranks before shifting them, so two moves must
+    not interleave. PostgreSQL takes a transaction-level advisory lock; SQLite
+    already admits one writer at a time and fails a transaction whose reads went
+    stale with "database is locked" rather than writing inconsistent ranks.
+    """
+    connection = transaction.get_connection()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [RANK_LOCK_ID])
+
+
+def close_rank_gap(rank, applicants=()):
+    """Shift everyone behind a vacated rank one place forward"""
+    close_rank_gaps([rank], applicants)
+
+
+def close_rank_gaps(ranks, applicants=()):
+    """
+    Close the gaps left by applications that gave up the given ranks, in one
+    UPDATE of the ranks behind the first gap: each moves forward by the number
+    of gaps before it. `applicants` are the users whose applications changed,
+    for the queue position cache.
+    """
+    ranks = sorted(rank for rank in ranks if rank is not None)
+    if not ranks:
+        if applicants:
+            bump_queue_version(applicants=applicants)
+        return
+    with transaction.atomic():
+        lock_ranking()
+        _ranked_queryset().filter(queue_rank__gt=ranks[0]).update(queue_rank=F('queue_rank') - Case(
+            *[When(queue_rank__gt=rank, then=Value(i)) for i, rank in reversed(list(enumerate(ranks, start=1)))],
+            default=Value(0),
+        ))
+        bump_queue_version(ranks=(ranks[0], None), applicants=applicants)
+
+
+def insert_queue_ranks(application_ids):
+    """
+    Give ranks to IN_QUEUE applications that have none, e.g. after a queryset
+    update put them back in the queue. Each is placed right before the first
+    ranked application that sorts after it, and the ranks behind every
+    insertion point move back, in one UPDATE: no rebuild of the queue.
+    """
+    from .models import Application
+
+    with transaction.atomic():
+        lock_ranking()
+        entering = list(
+            Application.objects.filter(id__in=application_ids, status=RANKED_STATUS, queue_rank__isnull=True)
+            .order_by(*RANK_ORDERING).values_list('id', 'priority_score', 'submission_date', 'applicant_id')
+        )
+        if not entering:
+            return
+        total = total_ranked()
+        # Rank of the first current member after each entering application, total + 1 for the end
+        successors = [
+            _ranked_queryset().filter(_after_key(score, submitted, pk))
+            .order_by('queue_rank').values_list('queue_rank', flat=True).first() or total + 1
+            for pk, score, submitted, _ in entering
+        ]
+        _ranked_queryset().filter(queue_rank__gte=successors[0]).update(queue_rank=F('queue_rank') + Case(
+            *[When(queue_rank__gte=rank, then=Value(i)) for i, rank in reversed(list(enumerate(successors, start=1)))],
+            default=Value(0),
+        ))
+        # Entering applications are in queue order, so the i-th lands i places behind its successor's old rank
+        Application.objects.bulk_update([
+            Application(id=pk, queue_rank=successor + i)
+            for i, ((pk, _, _, _), successor) in enumerate(zip(entering, successors))
+        ], ['queue_rank'])
+        bump_queue_version(ranks=(successors[0], None), applicants=[row[3] for row in entering])
+
+
+def _target_rank(application, priority_score, submission_date, old_rank):
+    """
+    Rank the application belongs at, counted as if it had left its old rank:
+    right before the first other ranked application that sorts after it.
+    """
+    others = _ranked_queryset().exclude(pk=application.pk)
+    successor_rank = (
+        others.filter(_after_key(priority_score, submission_date, application.pk))
+        .order_by('queue_rank')
+        .values_list('queue_rank', flat=True)
+        .first()
+    )
+    if successor_rank is None:
+        return total_ranked() - (old_rank is not None) + 1
+    # Ranks behind the old one close up once the application has left it
+    return successor_rank - (old_rank is not None and successor_rank > old_rank)
+
+
+def sync_queue_rank(application):
+    """
+    Incrementally move a single application to its correct queue rank.
+
+    Only the ranks between the old and new positions shift, by one place, in a
+    single UPDATE: back when the application moves up (or enters the queue),
+    forward when it moves down (or leaves).
+    """
+    from .models import Application
+
+    with transaction.atomic():
+        lock_ranking()
+        current = (
+            Application.objects.select_for_update()
+            .filter(pk=application.pk)
+            .values('queue_rank', 'priority_score', 'submission_date', 'status')
+            .first()
+        )
+        if current is None:
+            return None
+
+        old_rank = current['queue_rank']
+        new_rank = None
+        if current['status'] == RANKED_STATUS:
+            new_rank = _target_rank(application, current['priority_score'], current['submission_date'], old_rank)
+
+        if new_rank != old_rank:
+            others = _ranked_queryset().exclude(pk=application.pk)
+            if old_rank is None:
+                others.filter(queue_rank__gte=new_rank).update(queue_rank=F('queue_rank') + 1)
+            elif new_rank is None:
+                others.filter(queue_rank__gt=old_rank).update(queue_rank=F('queue_rank') - 1)
+            elif new_rank < old_rank:
+                others.filter(queue_rank__gte=new_rank, queue_rank__lt=old_rank).update(queue_rank=F('queue_rank') + 1)
+            else:
+                others.filter(queue_rank__gt=old_rank, queue_rank__lte=new_rank).update(queue_rank=F('queue_rank') - 1)
+            Application.objects.filter(pk=application.pk).update(queue_rank=new_rank)
+
+        # Its score or status changed even when its rank did not
+        if new_rank == old_rank:
+            moved = None
+        elif old_rank is None or new_rank is None:
+            moved = (old_rank or new_rank, None)
+        else:
+            moved = (min(old_rank, new_rank), max(old_rank, new_rank))
+        bump_queue_version(ranks=moved, applicants=[application.applicant_id])
+
+    application.queue_rank = new_rank
+    return new_rank
+
+
+def rebuild_queue_ranks(batch_size=1000):
+    """
+    Recompute every queue rank from scratch.
+
+    Used after bulk operations that bypass Application.save (queryset updates,
+    bulk_update) and as a repair tool. Only rows whose rank actually changes are
+    written. Returns the number of rows updated.
+    """
+    from .models import Application
+
+    updated = 0
+    with transaction.atomic():
+        lock_ranking()
+        updated += Application.objects.exclude(status=RANKED_STATUS).filter(
+            queue_rank__isnull=False
+        ).update(queue_rank=None)
+
+        changed = []
+        rows = (
+            Application.objects.filter(status=RANKED_STATUS)
+            .order_by(*RANK_ORDERING)
+            .values_list('id', 'queue_rank')
+            .iterator(chunk_size=batch_size)
+        )
+        for rank, (pk, old_rank) in enumerate(rows, start=1):
+            if old_rank != rank:
+                changed.append(Application(id=pk, queue_rank=rank))
+            if len(changed) >= batch_size:
+                Application.objects.bulk_update(changed, ['queue_rank'])
+                updated += len(changed)
+                changed = []
+        if changed:
+            Application.objects.bulk_update(changed, ['queue_rank'])
+            updated += len(changed)
+        bump_queue_version()
+    return updated
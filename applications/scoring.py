@@ -0,0 +1,135 @@
+import numpy as np
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Floor
+from django.db.models.lookups import GreaterThan
+
+# Household members counted for the space-per-person rule
+HOUSEHOLD_FIELDS = ('adults_count', 'children_count', 'elderly_count')
+
+# Priority scoring rules, evaluated in order and summed. Every scoring path
+# (Application.calculate_priority, the NumPy bulk engine and the SQL
+# expression) is compiled from this table.
+#   income_band      - up to max_points, proportional to how far income is below reference
+#   per_unit         - points for every unit of an integer field
+#   flag             - points when a boolean field is set
+#   space_per_person - points of the first band whose limit (m² per person) is not reached
+PRIORITY_RULES = [
+    {'kind': 'income_band', 'field': 'monthly_income', 'reference': 100000, 'max_points': 20},
+    {'kind': 'per_unit', 'field': 'children_count', 'points': 10},
+    {'kind': 'flag', 'field': 'has_disability', 'points': 15},
+    {'kind': 'space_per_person', 'field': 'current_living_area', 'bands': [(6, 15), (10, 10), (15, 5)]},
+    {'kind': 'flag', 'field': 'is_veteran', 'points': 10},
+    {'kind': 'flag', 'field': 'is_single_parent', 'points': 10},
+    {'kind': 'per_unit', 'field': 'waiting_years', 'points': 5},
+]
+
+# Decimal columns, handled as int64 cents by the NumPy engine
+DECIMAL_FIELDS = ('monthly_income', 'current_living_area')
+
+SCORING_FIELDS = tuple(dict.fromkeys(
+    [rule['field'] for rule in PRIORITY_RULES] + list(HOUSEHOLD_FIELDS)
+))
+
+
+def score_application(application):
+    """Score a single Application instance"""
+    score = 0
+    persons = sum(getattr(application, name) for name in HOUSEHOLD_FIELDS)
+    for rule in PRIORITY_RULES:
+        value = getattr(application, rule['field'])
+        kind = rule['kind']
+        if kind == 'income_band':
+            reference = rule['reference']
+            if value < reference:
+                income_factor = (reference - value) / reference
+                score += int(income_factor * rule['max_points'])
+        elif kind == 'per_unit':
+            score += value * rule['points']
+        elif kind == 'flag':
+            if value:
+                score += rule['points']
+        elif kind == 'space_per_person':
+            if persons > 0 and value:
+                space_per_person = value / persons
+                for max_space, points in rule['bands']:
+                    if space_per_person < max_space:
+                        score += points
+                        break
+    return score
+
+
+def to_cents(values):
+    """Convert an iterable of Decimals (or None) to an int64 array of cents, None -> 0"""
+    floats = np.fromiter((0.0 if v is None else float(v) for v in values), dtype=np.float64)
+    return np.rint(floats * 100).astype(np.int64)
+
+
+def priority_scores(columns):
+    """
+    Vectorized equivalent of score_application.
+
+    `columns` maps every name in SCORING_FIELDS to a NumPy array; DECIMAL_FIELDS
+    are int64 cents (see to_cents) so that the band thresholds are compared
+    exactly, like the Decimal arithmetic in the model.
+    """
+    persons = sum(columns[name].astype(np.int64) for name in HOUSEHOLD_FIELDS)
+    scores = np.zeros(len(persons), dtype=np.int64)
+    for rule in PRIORITY_RULES:
+        values = columns[rule['field']].astype(np.int64)
+        kind = rule['kind']
+        if kind == 'income_band':
+            reference = rule['reference'] * 100
+            scores += np.where(values < reference, (reference - values) * rule['max_points'] // reference, 0)
+        elif kind in ('per_unit', 'flag'):
+            scores += values * rule['points']
+        elif kind == 'space_per_person':
+            unscored = (persons > 0) & (values != 0)
+            for max_space, points in rule['bands']:
+                in_band = unscored & (values < max_space * 100 * persons)
+                scores[in_band] += points
+                unscored &= ~in_band
+    return scores
+
+
+def priority_score_expression():
+    """
+    Compile PRIORITY_RULES into a database expression.
+
+    Usable with annotate() for ad-hoc queries or with
+    Application.objects.update(priority_score=priority_score_expression())
+    to rescore the whole table in a single statement.
+    """
+    persons = sum((F(name) for name in HOUSEHOLD_FIELDS[1:]), F(HOUSEHOLD_FIELDS[0]))
+    parts = []
+    for rule in PRIORITY_RULES:
+        field = rule['field']
+        kind = rule['kind']
+        if kind == 'income_band':
+            reference = rule['reference']
+            parts.append(Case(
+                When(**{f'{field}__lt': reference}, then=Cast(
+                    Floor((Value(reference) - F(field)) * rule['max_points'] / reference),
+                    IntegerField(),
+                )),
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+        elif kind == 'per_unit':
+            parts.append(F(field) * rule['points'])
+        elif kind == 'flag':
+            parts.append(Case(
+                When(**{field: True}, then=Value(rule['points'])),
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+        elif kind == 'space_per_person':
+            has_space = Q(GreaterThan(persons, 0), **{f'{field}__isnull': False}) & ~Q(**{field: 0})
+            parts.append(Case(
+                *[
+                    When(has_space & Q(**{f'{field}__lt': persons * max_space}), then=Value(points))
+                    for max_space, points in rule['bands']
+                ],
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+    return sum(parts[1:], parts[0])
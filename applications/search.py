@@ -0,0 +1,112 @@
+from django.db.models import Count, Value
+from django.db.models.functions import Concat
+from .numbering import NUMBER_PREFIX
+
+GRAM_SIZE = 3
+# Postings read per query gram when looking for the rarest one
+RARE_GRAM_LIMIT = 5000
+
+# Exact substring lookup per indexed field, used to drop trigram false positives
+SEARCH_LOOKUPS = {
+    'iin': 'applicant__iin__icontains',
+    'number': 'application_number__icontains',
+    'name': 'applicant_full_name__icontains',
+}
+
+
+def grams(text):
+    """Distinct lowercase trigrams of a string"""
+    text = (text or '').lower()
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def strip_number_prefix(text):
+    """
+    An application number without the NUMBER_PREFIX every number shares,
+    whose trigrams would match nearly every application. For a search query,
+    any leading part of the prefix is removed, so 'pp0123' searches '0123'.
+    """
+    text = text or ''
+    prefix = NUMBER_PREFIX.lower()
+    for start in range(len(prefix)):
+        if text.lower().startswith(prefix[start:]):
+            return text[len(prefix) - start:]
+    return text
+
+
+def searchable_values(application):
+    """Field name -> text indexed for an application"""
+    applicant = application.applicant
+    return {
+        'iin': applicant.iin,
+        'number': strip_number_prefix(application.application_number),
+        'name': applicant.get_full_name(),
+    }
+
+
+def index_applications(applications):
+    """(Re)build the search grams of the given applications"""
+    from .models import ApplicationSearchGram
+
+    applications = list(applications)
+    ApplicationSearchGram.objects.filter(application__in=applications).delete()
+    ApplicationSearchGram.objects.bulk_create([
+        ApplicationSearchGram(application=application, field=field, gram=gram)
+        for application in applications
+        for field, text in searchable_values(application).items()
+        for gram in grams(text)
+    ], batch_size=1000)
+
+
+def matching_applications(field, query_grams):
+    """
+    Applications whose `field` has every one of `query_grams`, starting from
+    the postings of the rarest gram. Returns a list of ids, or a subquery when
+    even the rarest gram is too common to fetch.
+    """
+    from .models import ApplicationSearchGram
+
+    postings = ApplicationSearchGram.objects.filter(field=field)
+    # Up to RARE_GRAM_LIMIT postings per gram, read from the (field, gram, application) index
+    fetched = {
+        gram: list(postings.filter(gram=gram).values_list('application', flat=True)[:RARE_GRAM_LIMIT])
+        for gram in sorted(query_grams)
+    }
+    rarest = min(fetched, key=lambda gram: len(fetched[gram]))
+    if len(fetched[rarest]) >= RARE_GRAM_LIMIT:
+        return postings.filter(gram=rarest).values('application')
+    # Grams fetched in full narrow the candidates here, the rest in one query over them
+    ids = set(fetched[rarest])
+    truncated = []
+    for gram, applications in fetched.items():
+        if len(applications) < RARE_GRAM_LIMIT:
+            ids.intersection_update(applications)
+        else:
+            truncated.append(gram)
+    if not ids or not truncated:
+        return list(ids)
+    return list(
+        postings.filter(gram__in=truncated, application__in=ids)
+        .values('application')
+        .annotate(matched=Count('gram', distinct=True))
+        .filter(matched=len(truncated))
+        .values_list('application', flat=True)
+    )
+
+
+def filter_applications(queryset, field, query):
+    """
+    Case-insensitive substring filter on an indexed field ('iin', 'number' or 'name').
+
+    The trigram index narrows the candidates and the SEARCH_LOOKUPS filter
+    removes false positives. Queries shorter than a trigram fall back to the
+    plain lookup.
+    """
+    query_grams = grams(strip_number_prefix(query) if field == 'number' else query)
+    if query_grams:
+        queryset = queryset.filter(id__in=matching_applications(field, query_grams))
+    if field == 'name':
+        queryset = queryset.alias(
+            applicant_full_name=Concat('applicant__first_name', Value(' '), 'applicant__last_name')
+        )
+    return queryset.filter(**{SEARCH_LOOKUPS[field]: query})
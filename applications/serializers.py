@@ -26,6 +26,10 @@ from rest_framework import serializers
 class QueueSerializer(serializers.Serializer):
     iin = serializers.CharField(max_length=12)  # Adjust max_length as needed
 
-# Serializer for response (just queue_position)
+# Serializer for response
 class QueueCheckResponseSerializer(serializers.Serializer):
-    queue_position = serializers.IntegerField()
\ No newline at end of file
+    application_number = serializers.CharField()
+    status = serializers.CharField()
+    priority_score = serializers.IntegerField()
+    queue_position = serializers.IntegerField(allow_null=True)  # None until the application is in the queue
+    total_queued = serializers.IntegerField()
\ No newline at end of file
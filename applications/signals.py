@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.models import User
+from .models import Application
+from .ranking import close_rank_gap
+from .search import index_applications
+
+
+@receiver(post_delete, sender=Application)
+def release_queue_rank(sender, instance, **kwargs):
+    """Close the gap left in the queue when a ranked application is deleted"""
+    close_rank_gap(instance.queue_rank, applicants=[instance.applicant_id])
+
+
+@receiver(post_save, sender=Application)
+def index_application(sender, instance, raw=False, **kwargs):
+    """Keep the search grams in sync when an application is created or changes hands or number"""
+    search_key = (instance.application_number, instance.applicant_id)
+    if not raw and getattr(instance, '_loaded_search_key', None) != search_key:
+        index_applications([instance])
+        instance._loaded_search_key = search_key
+
+
+@receiver(post_save, sender=User)
+def reindex_applicant(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """IIN and name are indexed per application, so reindex the user's applications"""
+    if raw or created:
+        return
+    if update_fields is not None and not {'iin', 'first_name', 'last_name'} & set(update_fields):
+        return
+    index_applications(instance.applications.select_related('applicant'))
@@ -0,0 +1,208 @@
+import datetime
+import os
+import tempfile
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .ranking import RANKED_STATUS
+from .scoring import PRIORITY_RULES
+
+# Months of past offers used for the baseline inflow rate
+HISTORY_MONTHS = 24
+ESTIMATE_DTYPE = np.dtype([('id', '<i8'), ('offer_month', '<M8[M]')])
+
+
+def waiting_year_points():
+    """Points PRIORITY_RULES award per year of waiting_years"""
+    return sum(
+        rule['points'] for rule in PRIORITY_RULES
+        if rule['kind'] == 'per_unit' and rule['field'] == 'waiting_years'
+    )
+
+
+def month_index(dates, start):
+    """Whole months from the month of `start` to the month of each date"""
+    return np.fromiter(((d.year - start.year) * 12 + d.month - start.month for d in dates), dtype=np.int64)
+
+
+def project_offers(scores, first_anniversary, inflow, points_per_year=None):
+    """
+    Core of the simulation, on plain arrays.
+
+    `scores` are the current priority scores of the queue in tie-break order
+    (submission date, then id), `first_anniversary` the number of months
+    (1-12) until each applicant's waiting_years next grows and `inflow` the
+    number of units becoming available in each month. Every month, the
+    applicants with the best projected score at that point receive the
+    month's units; scores grow by `points_per_year` on each anniversary, so
+    the order can change over time. Returns, per applicant, the month of the projected offer, or -1
+    when nobody offers them a unit within the horizon.
+
+    Each month is a partial sort of the remaining queue, so a 10-year run over
+    500k applicants takes about a second.
+    """
+    if points_per_year is None:
+        points_per_year = waiting_year_points()
+    scores = np.asarray(scores, dtype=np.int64)
+    first_anniversary = np.asarray(first_anniversary, dtype=np.int64)
+    n = len(scores)
+    offer_month = np.full(n, -1, dtype=np.int64)
+
+    remaining = np.arange(n)
+    for month, units in enumerate(np.asarray(inflow, dtype=np.int64).tolist()):
+        if not len(remaining):
+            break
+        if units <= 0:
+            continue
+        if units >= len(remaining):
+            offer_month[remaining] = month
+            break
+        anniversary = first_anniversary[remaining]
+        years = np.where(month >= anniversary, 1 + (month - anniversary) // 12, 0)
+        # Best score first, ties in submission order (the position in the arrays)
+        key = -(scores[remaining] + points_per_year * years) * n + remaining
+        chosen = np.argpartition(key, units - 1)[:units]
+        offer_month[remaining[chosen]] = month
+        keep = np.ones(len(remaining), dtype=bool)
+        keep[chosen] = False
+        remaining = remaining[keep]
+    return offer_month
+
+
+def forecast_inflow(months, today=None, history_months=HISTORY_MONTHS):
+    """
+    Units expected to become available in each of the next `months` months.
+
+    Known events are the AVAILABLE units (month 0), the next_available_date
+    of the other units and the tenancy_end_date of active tenancies, one date
+    per unit. The historical rate is the number of offers that did not expire
+    per month over the last `history_months`. Each month gets the larger of
+    the two, since the known events are part of the usual flow.
+    """
+    from housing_units.models import HousingAllocation, HousingUnit
+
+    today = today or timezone.localdate()
+    dates = {}
+    for unit_id, status, next_available in HousingUnit.objects.values_list('id', 'status', 'next_available_date'):
+        if status == 'AVAILABLE':
+            dates[unit_id] = today
+        elif next_available is not None and status != 'RESERVED':
+            dates[unit_id] = max(next_available, today)
+    tenancies = HousingAllocation.objects.filter(
+        status='ACTIVE', tenancy_end_date__isnull=False
+    ).exclude(housing_unit_id__in=list(dates)).values_list('housing_unit_id', 'tenancy_end_date')
+    for unit_id, end in tenancies:
+        end = max(end, today)
+        dates[unit_id] = min(dates.get(unit_id, end), end)
+
+    offsets = month_index(dates.values(), today)
+    known = np.bincount(offsets[offsets < months], minlength=months)
+
+    since = today - datetime.timedelta(days=round(history_months * 365.25 / 12))
+    offers = HousingAllocation.objects.filter(offer_date__gte=since).exclude(status='EXPIRED').count()
+    rate = offers / history_months
+
+    # Fractional rates become whole units by rounding the running total down
+    expected = np.cumsum(np.maximum(known, rate))
+    return np.diff(np.floor(expected + 1e-9), prepend=0).astype(np.int64)
+
+
+def simulate_queue(years=10, today=None, history_months=HISTORY_MONTHS):
+    """
+    Project the offer month of every application in the ranked queue.
+    Returns (application ids, offer months as datetime64[M], NaT beyond the
+    horizon).
+    """
+    from .models import Application
+
+    today = today or timezone.localdate()
+    rows = list(
+        Application.objects.filter(status=RANKED_STATUS, queue_rank__isnull=False)
+        .order_by('submission_date', 'id')
+        .values_list('id', 'priority_score', 'submission_date')
+        .iterator(chunk_size=10000)
+    )
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    scores = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+    submitted_months = np.fromiter((row[2].month for row in rows), dtype=np.int64, count=len(rows))
+    # Months until the next anniversary; this month's counts as a year away
+    first_anniversary = (submitted_months - today.month) % 12
+    first_anniversary[first_anniversary == 0] = 12
+
+    inflow = forecast_inflow(years * 12, today, history_months)
+    months = project_offers(scores, first_anniversary, inflow)
+    offer_month = np.datetime64(today, 'M') + months.astype('m8[M]')
+    offer_month[months < 0] = np.datetime64('NaT')
+    return ids, offer_month
+
+
+def estimates_path():
+    return str(getattr(settings, 'QUEUE_ESTIMATES_PATH', settings.BASE_DIR / 'snapshots' / 'wait_estimates.npy'))
+
+
+def write_estimates(ids, offer_months, path=None):
+    """Store a simulation result, replacing the previous one atomically"""
+    path = path or estimates_path()
+    records = np.empty(len(ids), dtype=ESTIMATE_DTYPE)
+    records['id'] = ids
+    records['offer_month'] = offer_months
+    records.sort(order='id')
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.wait-estimates-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, records)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(records)
+
+
+class WaitEstimates:
+    """Read-only, memory-mapped view of the latest simulation"""
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        self.file_id = (stat.st_ino, stat.st_mtime_ns)
+        self.created_at = datetime.datetime.fromtimestamp(stat.st_mtime, tz=datetime.timezone.utc)
+        self.records = np.load(path, mmap_mode='r')
+        self.count = len(self.records)
+
+    def offer_months(self, application_ids):
+        """
+        Map each given application id to its projected offer month as a date
+        (first of the month), or None when it falls beyond the horizon.
+        Applications that were not simulated are left out.
+        """
+        ids = np.asarray(list(application_ids), dtype=np.int64)
+        if not self.count or not len(ids):
+            return {}
+        positions = np.minimum(np.searchsorted(self.records['id'], ids), self.count - 1)
+        found = self.records['id'][positions] == ids
+        months = self.records['offer_month'][positions[found]].astype('M8[D]')
+        return {pk: None if np.isnat(month) else month.item() for pk, month in zip(ids[found].tolist(), months)}
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def load_estimates(path=None):
+    """The latest stored simulation for this process, or None if none has been run"""
+    path = path or estimates_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    with _lock:
+        estimates = _loaded.get(path)
+        if estimates is None or estimates.file_id != (stat.st_ino, stat.st_mtime_ns):
+            estimates = _loaded[path] = WaitEstimates(path)
+        return estimates
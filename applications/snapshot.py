@@ -0,0 +1,148 @@
+import datetime
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import numpy as np
+from django.conf import settings
+
+# File layout (little endian):
+#   header   magic, snapshot version, created_at (unix seconds), record count
+#   records  RECORD_DTYPE x count, in rank order
+#   index    ids sorted ascending (int64) x count, then the matching ranks (int32) x count
+MAGIC = b'QSNAP001'
+HEADER = struct.Struct('<8sQdQ')
+RECORD_DTYPE = np.dtype([('id', '<i8'), ('number', 'S20'), ('score', '<i4'), ('rank', '<i4')])
+
+
+def snapshot_path():
+    return str(getattr(settings, 'QUEUE_SNAPSHOT_PATH', settings.BASE_DIR / 'snapshots' / 'queue.snapshot'))
+
+
+def previous_snapshot_path(path=None):
+    """Where write_snapshot keeps the snapshot it replaced"""
+    return f'{path or snapshot_path()}.previous'
+
+
+class QueueSnapshot:
+    """Read-only, memory-mapped view of a frozen queue ranking"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+        self.file_id = (stat.st_ino, stat.st_mtime_ns)
+
+        magic, self.version, created_at, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a queue snapshot')
+        self.created_at = datetime.datetime.fromtimestamp(created_at, tz=datetime.timezone.utc)
+        self.count = count
+
+        offset = HEADER.size
+        self.records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=count, offset=offset)
+        offset += RECORD_DTYPE.itemsize * count
+        self._ids = np.frombuffer(self._mmap, dtype='<i8', count=count, offset=offset)
+        offset += 8 * count
+        self._ranks = np.frombuffer(self._mmap, dtype='<i4', count=count, offset=offset)
+
+    def rank_of(self, application_id):
+        """Rank of an application in this snapshot, or None if it was not queued"""
+        i = int(np.searchsorted(self._ids, application_id))
+        if i < self.count and self._ids[i] == application_id:
+            return int(self._ranks[i])
+        return None
+
+    def ranks_of(self, application_ids):
+        """Map each given application id to its snapshot rank, leaving out unranked ones"""
+        ids = np.asarray(list(application_ids), dtype=np.int64)
+        if not self.count or not len(ids):
+            return {}
+        positions = np.minimum(np.searchsorted(self._ids, ids), self.count - 1)
+        found = self._ids[positions] == ids
+        return dict(zip(ids[found].tolist(), self._ranks[positions[found]].tolist()))
+
+    def ranks_by_id(self):
+        """(ids ascending, matching ranks) arrays of the id index"""
+        return self._ids, self._ranks
+
+    def slice(self, first_rank, last_rank):
+        """Records with first_rank <= rank <= last_rank, in rank order"""
+        return self.records[max(first_rank, 1) - 1:max(last_rank, 0)]
+
+
+def write_snapshot(rows, path=None):
+    """
+    Write (id, application_number, priority_score, queue_rank) rows, given in
+    rank order, as a new snapshot. The file is replaced atomically, so readers
+    still mapping the previous snapshot keep a consistent view.
+    """
+    path = path or snapshot_path()
+    records = np.array(
+        [(pk, number.encode(), score, rank) for pk, number, score, rank in rows],
+        dtype=RECORD_DTYPE,
+    )
+    by_id = np.argsort(records['id'], kind='stable')
+
+    previous = load_snapshot(path)
+    version = previous.version + 1 if previous else 1
+    created_at = datetime.datetime.now(datetime.timezone.utc)
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.queue-snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, version, created_at.timestamp(), len(records)))
+            f.write(records.tobytes())
+            f.write(records['id'][by_id].astype('<i8').tobytes())
+            f.write(records['rank'][by_id].astype('<i4').tobytes())
+        os.chmod(tmp_path, 0o644)
+        if previous:
+            # Keep the replaced ranking so consecutive snapshots can be diffed
+            previous_tmp = f'{tmp_path}.previous'
+            shutil.copy2(path, previous_tmp)
+            os.replace(previous_tmp, previous_snapshot_path(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return version, len(records)
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def load_snapshot(path=None):
+    """
+    The current snapshot for this process, or None if none has been built.
+
+    The mapping is reused until the file on disk is replaced, which costs a
+    single stat() per call and no database queries.
+    """
+    path = path or snapshot_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    with _lock:
+        snapshot = _loaded.get(path)
+        if snapshot is None or snapshot.file_id != (stat.st_ino, stat.st_mtime_ns):
+            snapshot = _loaded[path] = QueueSnapshot(path)
+        return snapshot
+
+
+def rank_deltas(previous, current):
+    """
+    Compare two snapshots. Returns (ids, previous_ranks, current_ranks) arrays
+    for the applications present in both, in id order.
+    """
+    previous_ids, previous_ranks = previous.ranks_by_id()
+    current_ids, current_ranks = current.ranks_by_id()
+    ids, previous_idx, current_idx = np.intersect1d(
+        previous_ids, current_ids, assume_unique=True, return_indices=True
+    )
+    return ids, previous_ranks[previous_idx], current_ranks[current_idx]
@@ -17,5 +17,5 @@ urlpatterns = [
     path('application/update-status/<int:application_id>/<str:new_status>', views.update_application_status, name='update-application-status'),
     
     ## api
-    # path('api/check-queue/', views.QueueCheckAPIView.as_view(), name='api_check_queue'),    
+    path('api/check-queue/', views.QueueCheckAPIView.as_view(), name='api_check_queue'),
 ]
\ No newline at end of file
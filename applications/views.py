@@ -1,20 +1,38 @@
+import uuid
 from django.shortcuts import render, redirect, get_object_or_404
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.core.paginator import Paginator
 from .forms import ApplicantDataForm, FamilyDataForm
 from django.shortcuts import render
 from .models import Application, ApplicationHistory
 from housing_units.models import HousingUnit, HousingAllocation
+from housing_units.inventory import get_inventory
 from django.contrib.auth.decorators import login_required
 from django.http import Http404
+from django.utils.http import parse_etags
 from django.contrib import messages
 from users.models import User
 from notifications.models import Notification
 from .forms import ApplicantDataForm, FamilyDataForm, ApplicationSubmissionForm, QueueCheckForm, QueueSearchForm,save_application_with_documents
-from django.db.models import Window, F
-from django.db.models.functions import RowNumber
+from django.db.models import F
+from .ranking import RANK_ORDERING, total_ranked
+from .pagination import KeysetPage, KeysetPaginator, SnapshotPaginator
+from .snapshot import load_snapshot
+from .simulation import load_estimates
+from .search import filter_applications
+from .queue_cache import get_queue_position
+from .serializers import QueueSerializer, QueueCheckResponseSerializer
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from django.utils import timezone
 from django.db.models import Q
 
+# Available units listed in an application's offer form, smallest first
+OFFER_UNIT_CHOICES = 200
+
 # Create your views here.
 def home(request):
     return render(request, 'info.html')
@@ -33,23 +51,37 @@ def check_queue_number(request):
                 # Find all applications for this user
                 applications = Application.objects.filter(
                     applicant=user, 
-                    status__in=['SUBMITTED', 'UNDER_REVIEW', 'IN_QUEUE']
+                    status__in=['SUBMITTED', 'IN_QUEUE']
                 ).order_by('submission_date')
                 
                 if applications.exists():
-                    # Get all applications in the same statuses, ordered by priority score
-                    all_queued_applications = Application.objects.filter(
-                        status__in=['SUBMITTED', 'UNDER_REVIEW', 'IN_QUEUE']
-                    ).order_by('-priority_score', 'submission_date')
-                    
-                    # Calculate queue position
-                    queue_position = list(all_queued_applications).index(applications.first()) + 1
+                    snapshot = load_snapshot()
+                    if snapshot:
+                        # Ranks as of the latest snapshot, read without touching the queue
+                        ranks = snapshot.ranks_of(application.id for application in applications)
+                        queue_position = min(ranks.values(), default=None)
+                        total_queued_applications = snapshot.count
+                    else:
+                        # Queue position is the stored rank of the user's best-placed application
+                        ranked_application = applications.filter(
+                            queue_rank__isnull=False
+                        ).order_by('queue_rank').first()
+                        queue_position = ranked_application.queue_rank if ranked_application else None
+                        total_queued_applications = total_ranked()
+
+                    # Projected by `manage.py simulate_queue`; None means beyond its horizon
+                    estimates = load_estimates()
+                    offer_months = estimates.offer_months(application.id for application in applications) if estimates else {}
+                    estimated_offer = min(filter(None, offer_months.values()), default=None)
                     
                     context = {
                         'form': form,
                         'applications': applications,
                         'queue_position': queue_position,
-                        'total_queued_applications': all_queued_applications.count()
+                        'total_queued_applications': total_queued_applications,
+                        'snapshot': snapshot,
+                        'estimates': estimates if offer_months else None,
+                        'estimated_offer': estimated_offer,
                     }
                     return render(request, 'queue_check_result.html', context)
                 else:
@@ -169,7 +201,7 @@ def edit_application(request, application_id):
 @login_required
 def get_application_data(request):
     """View to display application details"""
-    application = Application.objects.filter(applicant=request.user)
+    application = Application.objects.filter(applicant=request.user).first()
     
     if not application:
         messages.info(request, 'You have not submitted an application yet.')
@@ -179,13 +211,7 @@ def get_application_data(request):
     history = application.history.all().order_by('-change_date')
     
     # Get queue position if in queue
-    queue_position = None
-    if application.status == 'IN_QUEUE':
-        higher_priority_count = Application.objects.filter(
-            status='IN_QUEUE',
-            priority_score__gt=application.priority_score
-        ).count()
-        queue_position = higher_priority_count + 1
+    queue_position = application.queue_rank
     
     context = {
         'application': application,
@@ -216,27 +242,29 @@ def view_application(request, application_id):
             'notes': history.notes,
         })
     
+    inventory = get_inventory()
+    available = inventory.query({'status': ['AVAILABLE']}, with_facets=False, limit=OFFER_UNIT_CHOICES)
     return render(request, 'view_application.html', {
         'success': True,
         'application': application,
         'documents': application.documents.all(),
-        'available_housing_units': HousingUnit.objects.filter(status='AVAILABLE'),
+        'available_housing_units': inventory.rows(available['indices']),
         'history': history_data,
         'housing_allocation': housing_allocation,
+        # Identifies this offer form, so a resubmitted form cannot offer twice
+        'offer_key': uuid.uuid4().hex,
     })
 
 def queue_members(request):
     # Initialize the search form
     form = QueueSearchForm(request.GET or None)
     
-    # Annotate queue number based on priority score ranking
-    queryset = Application.objects.filter(status='IN_QUEUE').annotate(
-        queue_number=Window(
-            expression=RowNumber(),
-            order_by=F('priority_score').desc()
-        )
-    ).order_by('-priority_score')
+    # Queue number is the stored rank, so filtering never renumbers the queue
+    queryset = Application.objects.filter(queue_rank__isnull=False).select_related('applicant').annotate(
+        queue_number=F('queue_rank')
+    ).order_by('queue_rank')
     
+    iin = queue_number_from = queue_number_to = None
     # Apply form filters if the form is valid
     if form.is_valid():
         iin = form.cleaned_data.get('iin')
@@ -245,29 +273,39 @@ def queue_members(request):
         
         # Filter by IIN if provided
         if iin:
-            queryset = queryset.filter(applicant__iin__icontains=iin)
+            queryset = filter_applications(queryset, 'iin', iin)
         
-        # Filter by queue number range if both from and to are provided
-        if queue_number_from is not None and queue_number_to is not None:
-            queryset = queryset.filter(
-                queue_number__gte=queue_number_from,
-                queue_number__lte=queue_number_to
-            )
+        # Queue number range is a seek on the indexed rank column
+        if queue_number_from is not None:
+            queryset = queryset.filter(queue_rank__gte=queue_number_from)
+        if queue_number_to is not None:
+            queryset = queryset.filter(queue_rank__lte=queue_number_to)
     
-    # Pagination
-    page = request.GET.get('page', 1)
-    paginator = Paginator(queryset, 10)  # 10 items per page
-    
-    try:
-        queue_members = paginator.page(page)
-    except PageNotAnInteger:
-        queue_members = paginator.page(1)
-    except EmptyPage:
-        queue_members = paginator.page(paginator.num_pages)
+    snapshot = None if iin else load_snapshot()
+    if snapshot:
+        # Ranks come from the memory-mapped snapshot; only the displayed rows are loaded
+        paginator = SnapshotPaginator(snapshot, queue_number_from or 1, queue_number_to or snapshot.count, 10)
+        records = paginator.page(request.GET.get('cursor'))
+        applications = Application.objects.select_related('applicant').in_bulk(records.object_list['id'].tolist())
+        queue_members = KeysetPage([], records.next_cursor, records.previous_cursor)
+        for record in records:
+            application = applications.get(int(record['id']))
+            if application is not None:
+                application.queue_number = int(record['rank'])
+                application.priority_score = int(record['score'])
+                queue_members.object_list.append(application)
+        total_queued_applications = snapshot.count
+    else:
+        # Keyset pagination: page cost does not grow with depth
+        paginator = KeysetPaginator(queryset, RANK_ORDERING, 10)  # 10 items per page
+        queue_members = paginator.page(request.GET.get('cursor'))
+        total_queued_applications = total_ranked()
     
     context = {
         'form': form,
         'queue_members': queue_members,
+        'total_queued_applications': total_queued_applications,
+        'snapshot': snapshot,
     }
     
     return render(request, 'queue_members.html', context)
@@ -350,3 +388,47 @@ def reject_application(request, application_id):
     
     
 
+
+
+
+## api
+def _etag_matches(etag, if_none_match):
+    """Weak comparison of an ETag against the ETags listed in an If-None-Match header"""
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag.removeprefix('W/') in (tag.removeprefix('W/') for tag in etags)
+
+
+class QueueCheckAPIView(APIView):
+    """Queue position lookup by IIN for the Telegram bot and web clients, served from cache"""
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        manual_parameters=[openapi.Parameter('iin', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True)],
+        responses={200: QueueCheckResponseSerializer, 304: "Not Modified", 400: "Bad Request", 404: "Not Found"},
+        operation_description="Get queue position by IIN (supports If-None-Match)"
+    )
+    def get(self, request):
+        return self.check_queue(request, QueueSerializer(data=request.query_params))
+
+    @swagger_auto_schema(
+        request_body=QueueSerializer,
+        responses={200: QueueCheckResponseSerializer, 400: "Bad Request", 404: "Not Found"},
+        operation_description="Get queue position by IIN"
+    )
+    def post(self, request):
+        return self.check_queue(request, QueueSerializer(data=request.data))
+
+    def check_queue(self, request, serializer):
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        payload, etag = get_queue_position(serializer.validated_data['iin'])
+        if _etag_matches(etag, request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif payload is None:
+            response = Response({'message': 'No user or application found.'}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            response = Response(QueueCheckResponseSerializer(payload).data, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -126,6 +126,44 @@ DATABASES = {
     }
 }
 
+# Cache
+# Queue position lookups are cached and invalidated through a shared version key,
+# so multi-process deployments need a shared backend (Redis, Memcached).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+QUEUE_POSITION_CACHE_TIMEOUT = 300
+# Seconds the admin dashboard reuses a filtered record count
+DASHBOARD_COUNT_CACHE_TIMEOUT = 60
+
+# Memory-mapped queue ranking written by `manage.py build_queue_snapshot`
+QUEUE_SNAPSHOT_PATH = BASE_DIR / 'snapshots' / 'queue.snapshot'
+
+# Projected offer months written by `manage.py simulate_queue`
+QUEUE_ESTIMATES_PATH = BASE_DIR / 'snapshots' / 'wait_estimates.npy'
+
+# Queue analytics page data written by `manage.py compute_queue_analytics`
+QUEUE_ANALYTICS_PATH = BASE_DIR / 'snapshots' / 'queue_analytics.json'
+
+# Seconds between scheduled `manage.py compute_queue_analytics` runs; the page flags older data as stale
+QUEUE_ANALYTICS_REFRESH_INTERVAL = 3600
+
+# Typed column file of house_data.csv written by `manage.py ingest_house_data`
+HOUSE_DATA_CACHE_PATH = BASE_DIR / 'snapshots' / 'house_data.columns'
+
+# Rows above which the dataframe info profile is estimated from a sample of this many rows; None to read them all
+HOUSE_DATA_PROFILE_SAMPLE_ROWS = 1_000_000
+
+# Places an applicant must move between snapshots to get a QUEUE_UPDATE notification
+QUEUE_UPDATE_THRESHOLD = 10
+
+# Days an applicant has to answer a housing offer before `manage.py expire_housing_offers` expires it
+HOUSING_OFFER_RESPONSE_DAYS = 7
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
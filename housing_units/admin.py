@@ -1,7 +1,57 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from .importing import ImportFormatError, import_housing_units
 from .models import HousingUnit, HousingAllocation
 
 # Register your models here.
 
-admin.site.register(HousingUnit)
-admin.site.register(HousingAllocation)
\ No newline at end of file
+class HousingUnitImportForm(forms.Form):
+    file = forms.FileField(help_text='CSV, XLSX or XLS with the columns unit_number, address, floor, total_area, rooms_count '
+                                     'and optionally status, has_elevator, has_heating, last_inspection_date, next_available_date.')
+    dry_run = forms.BooleanField(required=False, help_text='Validate only; write nothing.')
+
+
+@admin.register(HousingUnit)
+class HousingUnitAdmin(admin.ModelAdmin):
+    change_list_template = 'admin/housing_units/housingunit/change_list.html'
+    # Rows listed on the page after an import; the count covers the rest
+    shown_errors = 200
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='housing_units_housingunit_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = HousingUnitImportForm(request.POST or None, request.FILES or None)
+        result = None
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                result = import_housing_units(upload.file, upload.name, dry_run=form.cleaned_data['dry_run'])
+            except ImportFormatError as e:
+                messages.error(request, str(e))
+            else:
+                verb = 'Would import' if form.cleaned_data['dry_run'] else 'Imported'
+                level = messages.WARNING if result.error_count else messages.SUCCESS
+                messages.add_message(request, level, (
+                    f'{verb} {result.created + result.updated} of {result.rows} rows '
+                    f'({result.created} new, {result.updated} updated, {result.error_count} rejected).'
+                ))
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import housing units',
+            'form': form,
+            'errors': result.errors[:self.shown_errors] if result else [],
+            'more_errors': max(result.error_count - self.shown_errors, 0) if result else 0,
+        }
+        return TemplateResponse(request, 'admin/housing_units/housingunit/import.html', context)
+
+
+admin.site.register(HousingAllocation)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HousingUnitsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'housing_units'
+
+    def ready(self):
+        from . import signals  # noqa: F401
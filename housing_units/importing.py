@@ -0,0 +1,256 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from .inventory import bump_inventory_version
+from .models import HousingUnit
+from .signals import units_updated
+
+REQUIRED_COLUMNS = ('unit_number', 'address', 'floor', 'total_area', 'rooms_count')
+OPTIONAL_COLUMNS = ('status', 'has_elevator', 'has_heating', 'last_inspection_date', 'next_available_date')
+COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+UPDATE_FIELDS = [name for name in COLUMNS if name != 'unit_number']
+
+TRUE_VALUES = {'true', 'yes', 'y', '1', 'on'}
+FALSE_VALUES = {'false', 'no', 'n', '0', 'off'}
+MAX_SMALL_INT = 32767
+MAX_AREA = 9999.99  # total_area is DecimalField(max_digits=6, decimal_places=2)
+# Statuses backed by a HousingAllocation, which only the offer workflow may change
+ALLOCATED_STATUSES = ('RESERVED', 'OCCUPIED')
+# Errors kept on an ImportResult; the full report is streamed to its report file
+MAX_KEPT_ERRORS = 1000
+
+
+class ImportFormatError(Exception):
+    """The file cannot be read as a housing unit table"""
+
+
+class ImportResult:
+    """
+    Counts and the per-row error report of an import. Errors are written to
+    `report` as they are found, if given, and only the first `max_errors` are
+    kept in memory.
+    """
+
+    def __init__(self, report=None, max_errors=None):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []  # (row number in the file, unit_number, message)
+        self.max_errors = MAX_KEPT_ERRORS if max_errors is None else max_errors
+        self._writer = csv.writer(report) if report is not None else None
+        if self._writer:
+            self._writer.writerow(['row', 'unit_number', 'error'])
+
+    def add_errors(self, errors):
+        self.error_count += len(errors)
+        self.errors.extend(errors[:max(self.max_errors - len(self.errors), 0)])
+        if self._writer:
+            self._writer.writerows(errors)
+
+
+def _is_text(f):
+    """Legacy .xls exports are sometimes plain CSV (e.g. house_data.xls)"""
+    head = f.read(2048)
+    f.seek(0)
+    if isinstance(head, str):
+        return True
+    return not head.startswith((b'\xd0\xcf\x11\xe0', b'PK\x03\x04')) and b'\x00' not in head
+
+
+def read_chunks(f, name, chunk_size=5000):
+    """
+    Yield DataFrames of at most chunk_size rows, all values as stripped
+    strings. CSV and .xlsx files are streamed; a binary .xls workbook has to be
+    loaded whole by xlrd.
+    """
+    extension = os.path.splitext(name)[1].lower()
+    if extension in ('.xlsx', '.xls') and not _is_text(f):
+        chunks = _excel_chunks(f, extension, chunk_size)
+    else:
+        try:
+            chunks = pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=chunk_size, encoding='utf-8-sig')
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise ImportFormatError(f'Cannot read {name}: {e}')
+    try:
+        for chunk in chunks:
+            chunk.columns = [str(column).strip().lower() for column in chunk.columns]
+            missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+            if missing:
+                raise ImportFormatError(f'Missing columns: {", ".join(missing)}')
+            yield chunk.apply(lambda column: column.str.strip())
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise ImportFormatError(f'Cannot read {name}: {e}')
+
+
+def _excel_chunks(f, extension, chunk_size):
+    if extension == '.xlsx':
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFormatError('Reading .xlsx files requires openpyxl')
+        rows = load_workbook(f, read_only=True, data_only=True).active.iter_rows(values_only=True)
+        header = [str(value or '') for value in next(rows, ())]
+        chunk = []
+        for row in rows:
+            chunk.append(['' if value is None else str(value) for value in row])
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=header, dtype=str)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header, dtype=str)
+    else:
+        try:
+            sheet = pd.read_excel(f, dtype=str, keep_default_na=False, engine='xlrd')
+        except ImportError:
+            raise ImportFormatError('Reading .xls workbooks requires xlrd')
+        for start in range(0, len(sheet), chunk_size):
+            yield sheet.iloc[start:start + chunk_size]
+
+
+def validate_chunk(chunk, first_row):
+    """
+    Validate and convert a chunk in one vectorized pass per column.
+
+    Returns (records, errors): model-ready column values for the valid rows,
+    and (row, unit_number, message) for every invalid one. `first_row` is the
+    file row number of the chunk's first line.
+    """
+    n = len(chunk)
+    rows = np.arange(first_row, first_row + n)
+    problems = pd.Series([''] * n, index=chunk.index)
+
+    def column(name):
+        return chunk[name] if name in chunk.columns else pd.Series([''] * n, index=chunk.index)
+
+    def flag(mask, message):
+        mask = np.asarray(mask, dtype=bool)
+        problems[mask] = problems[mask] + message + '; '
+
+    for name in REQUIRED_COLUMNS:
+        flag(column(name) == '', f'{name} is required')
+    flag(column('unit_number').str.len() > 20, 'unit_number is longer than 20 characters')
+
+    values = {'row': rows, 'unit_number': column('unit_number'), 'address': column('address')}
+    for name in ('floor', 'rooms_count'):
+        raw = column(name)
+        number = pd.to_numeric(raw, errors='coerce')
+        flag((raw != '') & ~((number % 1 == 0) & (number >= 1) & (number <= MAX_SMALL_INT)),
+             f'{name} must be a whole number of at least 1')
+        values[name] = number
+    raw = column('total_area')
+    area = pd.to_numeric(raw, errors='coerce').round(2)
+    flag((raw != '') & ~((area > 0) & (area <= MAX_AREA)), f'total_area must be between 0 and {MAX_AREA}')
+    values['total_area'] = area
+
+    # Blank keeps an existing unit's status; new units default to AVAILABLE (see import_housing_units)
+    status = column('status').str.upper()
+    flag(~status.isin([value for value, _ in HousingUnit.UNIT_STATUS] + ['']), 'unknown status')
+    values['status'] = status
+
+    for name, default in (('has_elevator', False), ('has_heating', True)):
+        raw = column(name).str.lower()
+        flag(~raw.isin(TRUE_VALUES | FALSE_VALUES | {''}), f'{name} must be yes or no')
+        values[name] = raw.isin(TRUE_VALUES) | ((raw == '') & default)
+
+    for name in ('last_inspection_date', 'next_available_date'):
+        raw = column(name)
+        date = pd.to_datetime(raw, errors='coerce', format='ISO8601')
+        flag((raw != '') & date.isna(), f'{name} must be a YYYY-MM-DD date')
+        values[name] = date
+
+    valid = (problems == '').to_numpy()
+    errors = [
+        (int(row), unit_number, message.rstrip('; '))
+        for row, unit_number, message in zip(rows[~valid], column('unit_number')[~valid], problems[~valid])
+    ]
+    records = pd.DataFrame(values)[valid]
+    # The last occurrence of a unit number in the chunk wins, as it would across chunks
+    records = records.drop_duplicates('unit_number', keep='last')
+    return records, errors
+
+
+def _to_units(records):
+    units = []
+    for row in records.itertuples(index=False):
+        units.append(HousingUnit(
+            unit_number=row.unit_number,
+            address=row.address,
+            floor=int(row.floor),
+            total_area=f'{row.total_area:.2f}',
+            rooms_count=int(row.rooms_count),
+            status=row.status,
+            has_elevator=bool(row.has_elevator),
+            has_heating=bool(row.has_heating),
+            last_inspection_date=None if pd.isna(row.last_inspection_date) else row.last_inspection_date.date(),
+            next_available_date=None if pd.isna(row.next_available_date) else row.next_available_date.date(),
+        ))
+    return units
+
+
+def import_housing_units(f, name, chunk_size=5000, batch_size=1000, dry_run=False, report=None):
+    """
+    Stream a CSV/XLS(X) file of housing units into the database, upserting on
+    unit_number. Each chunk is validated, then written with bulk_create in its
+    own transaction; invalid rows are skipped and reported, to `report` as
+    they are found if given. Memory use depends on chunk_size, not on the size
+    of the file. Returns an ImportResult.
+
+    The status of a RESERVED or OCCUPIED unit belongs to its allocation: rows
+    that would change it are rejected, so a unit on offer can never be made
+    AVAILABLE and offered again.
+    """
+    result = ImportResult(report)
+    first_row = 2  # row 1 is the header
+    written = False
+    try:
+        for chunk in read_chunks(f, name, chunk_size):
+            records, errors = validate_chunk(chunk, first_row)
+            first_row += len(chunk)
+            result.rows += len(chunk)
+            result.add_errors(errors)
+            if records.empty:
+                continue
+
+            # Existing units only get the columns present in the file
+            update_fields = [name for name in UPDATE_FIELDS if name in chunk.columns]
+            with transaction.atomic():
+                existing = HousingUnit.objects.filter(unit_number__in=records['unit_number'].tolist())
+                if not dry_run:
+                    # Offers can't move these units' statuses until the chunk is written
+                    existing = existing.select_for_update()
+                current = records['unit_number'].map(dict(existing.values_list('unit_number', 'status')))
+                status = records['status']
+                allocated = current.isin(ALLOCATED_STATUSES) & (status != '') & (status != current)
+                result.add_errors([
+                    (int(row), unit_number, f'{previous} units only change status through their allocation')
+                    for row, unit_number, previous in zip(
+                        records['row'][allocated], records['unit_number'][allocated], current[allocated]
+                    )
+                ])
+                records = records[~allocated].assign(
+                    status=status[~allocated].where(status[~allocated] != '', current[~allocated].fillna('AVAILABLE'))
+                )
+                result.updated += int(current[~allocated].notna().sum())
+                result.created += int(current[~allocated].isna().sum())
+                if dry_run or records.empty:
+                    continue
+                HousingUnit.objects.bulk_create(
+                    _to_units(records),
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=['unit_number'],
+                    update_fields=update_fields,
+                )
+                # bulk_create sends no post_save signals
+                bump_inventory_version()
+            written = True
+    finally:
+        # Once for the whole file, including the chunks written before an error
+        if written:
+            units_updated.send(HousingUnit, unit_ids=None)
+    return result
@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+INVENTORY_VERSION_KEY = 'housing:inventory:version'
+# Width of the total_area facet buckets, in m²
+AREA_BUCKET = 10
+
+InventoryUnit = namedtuple('InventoryUnit', [
+    'id', 'unit_number', 'address', 'floor', 'total_area', 'rooms_count', 'status',
+    'has_elevator', 'has_heating', 'last_inspection_date', 'next_available_date',
+])
+FIELDS = InventoryUnit._fields
+
+
+def get_inventory_version():
+    version = cache.get(INVENTORY_VERSION_KEY)
+    if version is None:
+        cache.add(INVENTORY_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(INVENTORY_VERSION_KEY)
+    return version
+
+
+def bump_inventory_version():
+    """Invalidate the inventory of every process once the current transaction commits"""
+    transaction.on_commit(_bump_now)
+
+
+def _bump_now():
+    try:
+        cache.incr(INVENTORY_VERSION_KEY)
+    except ValueError:
+        cache.set(INVENTORY_VERSION_KEY, time.time_ns(), None)
+
+
+class Inventory:
+    """
+    Column arrays of every housing unit, ordered by rooms, area and id, with
+    faceted filtering. Queries return row indices; rows(), which the
+    templates use like HousingUnit instances, builds InventoryUnit records
+    for just the rows shown.
+    """
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        columns = dict(zip(FIELDS, zip(*rows))) or dict.fromkeys(FIELDS, ())
+        order = np.lexsort((
+            np.array(columns['id'], dtype=np.int64),
+            np.array(columns['total_area'], dtype=np.float64),
+            np.array(columns['rooms_count'], dtype=np.int16),
+        ))
+        self.id = np.array(columns['id'], dtype=np.int64)[order]
+        self.unit_number = np.array(columns['unit_number'], dtype=str)[order]
+        self.rooms_count = np.array(columns['rooms_count'], dtype=np.int16)[order]
+        self.floor = np.array(columns['floor'], dtype=np.int16)[order]
+        self.total_area = np.array(columns['total_area'], dtype=np.float64)[order]
+        self.has_elevator = np.array(columns['has_elevator'], dtype=bool)[order]
+        self.has_heating = np.array(columns['has_heating'], dtype=bool)[order]
+        self.last_inspection_date = np.array(columns['last_inspection_date'], dtype='datetime64[D]')[order]
+        self.next_available_date = np.array(columns['next_available_date'], dtype='datetime64[D]')[order]
+        # Addresses repeat across a building's units, so they are stored once each like statuses
+        self.addresses, address_codes = np.unique(np.array(columns['address'], dtype=str), return_inverse=True)
+        self.address = address_codes.astype(np.int32)[order]
+        self.statuses, status_codes = np.unique(np.array(columns['status'], dtype=str), return_inverse=True)
+        self.status = status_codes.astype(np.int8)[order]
+
+    def __len__(self):
+        return len(self.id)
+
+    def rows(self, indices):
+        """InventoryUnit records of the rows at `indices`"""
+        return [
+            InventoryUnit(
+                id=int(self.id[i]),
+                unit_number=str(self.unit_number[i]),
+                address=str(self.addresses[self.address[i]]),
+                floor=int(self.floor[i]),
+                total_area=Decimal(f'{self.total_area[i]:.2f}'),
+                rooms_count=int(self.rooms_count[i]),
+                status=str(self.statuses[self.status[i]]),
+                has_elevator=bool(self.has_elevator[i]),
+                has_heating=bool(self.has_heating[i]),
+                last_inspection_date=self.last_inspection_date[i].item(),
+                next_available_date=self.next_available_date[i].item(),
+            )
+            for i in indices
+        ]
+
+    def masks(self, filters):
+        """One boolean mask per facet for the given filters"""
+        masks = {}
+        if filters.get('status'):
+            masks['status'] = np.isin(self.status, np.flatnonzero(np.isin(self.statuses, filters['status'])))
+        if filters.get('rooms_count'):
+            masks['rooms_count'] = np.isin(self.rooms_count, filters['rooms_count'])
+        for facet, low, high in (('floor', 'floor_min', 'floor_max'), ('total_area', 'area_min', 'area_max')):
+            values = getattr(self, facet)
+            mask = np.ones(len(values), dtype=bool)
+            if filters.get(low) is not None:
+                mask &= values >= filters[low]
+            if filters.get(high) is not None:
+                mask &= values <= filters[high]
+            if filters.get(low) is not None or filters.get(high) is not None:
+                masks[facet] = mask
+        for flag in ('has_elevator', 'has_heating'):
+            if filters.get(flag) is not None:
+                masks[flag] = getattr(self, flag) == filters[flag]
+        return masks
+
+    def query(self, filters=None, with_facets=True, limit=None):
+        """
+        Row indices of the units matching `filters` (see filters_from_query),
+        the first `limit` of them if given, their total count and, per facet,
+        the counts of its values among units matching every other filter.
+        """
+        masks = self.masks(filters or {})
+        everything = np.ones(len(self), dtype=bool)
+
+        def combined(skip=None):
+            mask = everything
+            for name, facet_mask in masks.items():
+                if name != skip:
+                    mask = mask & facet_mask
+            return mask
+
+        selected = np.flatnonzero(combined())
+        result = {'count': len(selected), 'indices': selected[:limit]}
+        if with_facets:
+            result['facets'] = self.facets(combined)
+        return result
+
+    def facets(self, combined):
+        def value_counts(values, mask):
+            values, counts = np.unique(values[mask], return_counts=True)
+            return {value.item(): count.item() for value, count in zip(values, counts)}
+
+        def flag_counts(values, mask):
+            yes = int(np.count_nonzero(values[mask]))
+            return {True: yes, False: int(np.count_nonzero(mask)) - yes}
+
+        status_mask = combined('status')
+        status_counts = np.bincount(self.status[status_mask], minlength=len(self.statuses))
+        area_mask = combined('total_area')
+        return {
+            'status': {status: int(count) for status, count in zip(self.statuses.tolist(), status_counts)},
+            'rooms_count': value_counts(self.rooms_count, combined('rooms_count')),
+            'floor': value_counts(self.floor, combined('floor')),
+            'total_area': {
+                int(bucket) * AREA_BUCKET: count
+                for bucket, count in value_counts(self.total_area // AREA_BUCKET, area_mask).items()
+            },
+            'has_elevator': flag_counts(self.has_elevator, combined('has_elevator')),
+            'has_heating': flag_counts(self.has_heating, combined('has_heating')),
+        }
+
+
+_lock = threading.Lock()
+_inventory = None
+
+
+def get_inventory():
+    """
+    This process's inventory, reloaded from the database only after a unit
+    changed (one cache lookup per call otherwise).
+    """
+    global _inventory
+    from .models import HousingUnit
+
+    version = get_inventory_version()
+    inventory = _inventory
+    if inventory is None or inventory.version != version:
+        with _lock:
+            if _inventory is None or _inventory.version != version:
+                _inventory = Inventory(HousingUnit.objects.values_list(*FIELDS), version)
+            inventory = _inventory
+    return inventory
+
+
+def _number(value, cast):
+    try:
+        return cast(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _flag(value):
+    return {'true': True, '1': True, 'on': True, 'false': False, '0': False}.get(str(value).lower())
+
+
+def filters_from_query(params):
+    """Inventory filters from request GET parameters; malformed values are ignored"""
+    return {
+        'status': [value for value in params.getlist('status') if value],
+        'rooms_count': [room for room in (_number(value, int) for value in params.getlist('rooms_count')) if room],
+        'floor_min': _number(params.get('floor_min'), int),
+        'floor_max': _number(params.get('floor_max'), int),
+        'area_min': _number(params.get('area_min'), float),
+        'area_max': _number(params.get('area_max'), float),
+        'has_elevator': _flag(params.get('has_elevator')),
+        'has_heating': _flag(params.get('has_heating')),
+    }
@@ -0,0 +1,66 @@
+import csv
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from housing_units.matching import AllocationConflict, Proposal, commit_allocations, propose_allocations
+
+
+class Command(BaseCommand):
+    help = (
+        'Run an allocation round: match AVAILABLE housing units against the ranked queue. '
+        'Without --commit only the proposal is shown (and written with --output); '
+        'a reviewed proposal file can be committed later with --from-proposal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int,
+                            help='Only consider the first K applications of the queue')
+        parser.add_argument('--output', help='Write the proposal to this CSV file for review')
+        parser.add_argument('--from-proposal', help='Commit a previously written (and reviewed) proposal file')
+        parser.add_argument('--commit', action='store_true',
+                            help='Create the OFFERED housing allocations')
+
+    def handle(self, *args, **options):
+        if options['from_proposal']:
+            proposals = self.read_proposal(options['from_proposal'])
+        else:
+            proposals = propose_allocations(top_k=options['top_k'])
+
+        for proposal in proposals:
+            self.stdout.write(
+                f'#{proposal.queue_rank} {proposal.application_number} '
+                f'({proposal.household_size} persons) → unit {proposal.unit_number} '
+                f'({proposal.rooms_count} rooms, {proposal.total_area} m²)'
+            )
+        if options['output']:
+            self.write_proposal(options['output'], proposals)
+
+        if not options['commit']:
+            self.stdout.write(f'{len(proposals)} allocations proposed; nothing committed.')
+            return
+        try:
+            created = commit_allocations(proposals)
+        except AllocationConflict as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'Created {created} housing allocations.'))
+
+    def write_proposal(self, path, proposals):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(Proposal._fields)
+            writer.writerows(proposals)
+
+    def read_proposal(self, path):
+        converters = {
+            'application_id': int, 'queue_rank': int, 'household_size': int,
+            'unit_id': int, 'rooms_count': int, 'total_area': Decimal, 'cost': float,
+        }
+        try:
+            with open(path, newline='') as f:
+                return [
+                    Proposal(**{name: converters.get(name, str)(row[name]) for name in Proposal._fields})
+                    for row in csv.DictReader(f)
+                ]
+        except (OSError, KeyError, ValueError, ArithmeticError) as e:
+            raise CommandError(f'Cannot read proposal {path}: {e}')
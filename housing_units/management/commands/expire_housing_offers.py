@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from housing_units.offers import expire_offers
+
+
+class Command(BaseCommand):
+    help = (
+        'Expire housing offers past their response deadline and offer the freed units '
+        'to the next applications in the queue. Run periodically (e.g. daily from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of offers expired per transaction')
+
+    def handle(self, *args, **options):
+        expired, offered = expire_offers(batch_size=options['batch_size'])
+        self.stdout.write(f'Expired {expired} offers; made {offered} new offers.')
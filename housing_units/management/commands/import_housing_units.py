@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from housing_units.importing import ImportFormatError, import_housing_units
+
+
+class Command(BaseCommand):
+    help = (
+        'Import housing units from a CSV, XLSX or XLS file with the columns unit_number, address, floor, '
+        'total_area, rooms_count and optionally status, has_elevator, has_heating, last_inspection_date, '
+        'next_available_date. Existing units are updated by unit_number.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Rows read, validated and written per chunk')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per INSERT statement')
+        parser.add_argument('--errors', help='Write the per-row error report to this CSV file ("-" for stdout)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        report = None
+        try:
+            # The report is written as the rows are validated, however many are rejected
+            if options['errors'] == '-':
+                report = self.stdout
+            elif options['errors']:
+                report = open(options['errors'], 'w', newline='')
+            with open(path, 'rb') as f:
+                result = import_housing_units(
+                    f, path, chunk_size=options['chunk_size'], batch_size=options['batch_size'],
+                    dry_run=options['dry_run'], report=report,
+                )
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+        finally:
+            if report is not None and report is not self.stdout:
+                report.close()
+
+        if report is None:
+            for row, unit_number, message in result.errors[:20]:
+                self.stderr.write(f'Row {row} ({unit_number or "no unit number"}): {message}')
+            if result.error_count > 20:
+                self.stderr.write(f'... {result.error_count - 20} more; use --errors to get the full report')
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(
+            f'{verb} {result.created + result.updated} of {result.rows} rows '
+            f'({result.created} new, {result.updated} updated, {result.error_count} rejected).'
+        )
@@ -0,0 +1,259 @@
+from collections import namedtuple
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from applications.models import Application
+from applications.ranking import RANKED_STATUS, close_rank_gaps
+from applications.scoring import HOUSEHOLD_FIELDS
+from notifications.models import Notification
+from .inventory import bump_inventory_version
+from .models import HousingAllocation, HousingUnit
+from .signals import units_updated
+
+# Household fit rules for an allocation round
+AREA_PER_PERSON = 15      # minimum m² of total area per household member
+PERSONS_PER_ROOM = 2      # rooms needed = ceil(household size / PERSONS_PER_ROOM)
+MAX_EXTRA_ROOMS = 1       # a unit may have at most this many rooms above the need
+# Cost of an assignment: RANK_WEIGHT per queue position, plus one per spare room
+# and the spare area as a fraction of the household's minimum area
+RANK_WEIGHT = 1.0
+
+Proposal = namedtuple('Proposal', [
+    'application_id', 'application_number', 'queue_rank', 'household_size',
+    'unit_id', 'unit_number', 'rooms_count', 'total_area', 'cost',
+])
+
+
+class AllocationConflict(Exception):
+    """A proposal no longer matches the queue or the housing stock"""
+
+
+def rooms_needed(household_sizes):
+    return np.maximum(-(-household_sizes // PERSONS_PER_ROOM), 1)
+
+
+def fit_costs(household_sizes, rooms, areas):
+    """
+    Fit cost of every (unit, household size) pair as a units x sizes matrix,
+    with inf where the unit does not fit the household.
+    """
+    sizes = np.asarray(household_sizes, dtype=np.int64)[np.newaxis, :]
+    rooms = np.asarray(rooms, dtype=np.int64)[:, np.newaxis]
+    areas = np.asarray(areas, dtype=np.float64)[:, np.newaxis]
+
+    extra_rooms = rooms - rooms_needed(sizes)
+    min_area = AREA_PER_PERSON * sizes
+    fits = (extra_rooms >= 0) & (extra_rooms <= MAX_EXTRA_ROOMS) & (areas >= min_area)
+    cost = extra_rooms + (areas - min_area) / min_area
+    return np.where(fits, cost, np.inf)
+
+
+def match_units(rooms, areas, ranks, household_sizes):
+    """
+    Core of an allocation round, on plain arrays: units are given by rooms and
+    areas, candidates by queue rank and household size. Returns (unit indices,
+    candidate indices, costs) of the chosen pairs.
+
+    This is a min-cost assignment of units to candidates, where a pair costs
+    RANK_WEIGHT per queue position plus the fit cost, and only units that fit
+    the household may be paired. As many households as possible are housed,
+    at the lowest total cost.
+
+    Fit only depends on household size, so candidates of the same size are
+    interchangeable apart from rank and a size class taking n units always
+    takes its n best ranked members. The assignment is therefore solved as a
+    transportation problem from units to size classes, whose n-th unit costs
+    the rank of the n-th member, by successive shortest paths. Each step adds
+    one unit, possibly moving already placed units between classes, and costs
+    a few vectorized passes over the units, so thousands of units against tens
+    of thousands of candidates take seconds.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    household_sizes = np.asarray(household_sizes, dtype=np.int64)
+    n_units = len(rooms)
+    if not n_units or not len(ranks):
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([])
+
+    sizes, size_index = np.unique(household_sizes, return_inverse=True)
+    n_classes = len(sizes)
+    fit = fit_costs(sizes, rooms, areas)
+    # Members of each size class in rank order; no class can take more than n_units
+    members = []
+    for s in range(n_classes):
+        in_class = np.flatnonzero(size_index == s)
+        members.append(in_class[np.argsort(ranks[in_class], kind='stable')][:n_units])
+    slot_costs = [RANK_WEIGHT * (ranks[m] - 1) for m in members]
+
+    class_of = np.full(n_units, -1)
+    counts = np.zeros(n_classes, dtype=np.int64)
+    placeable = np.isfinite(fit).any(axis=1)
+    while True:
+        free = np.flatnonzero(placeable & (class_of < 0))
+        if not len(free):
+            break
+        next_slot = np.array([
+            slot_costs[s][counts[s]] if counts[s] < len(slot_costs[s]) else np.inf
+            for s in range(n_classes)
+        ])
+        if not np.isfinite(next_slot).any():
+            break
+
+        # Cheapest free unit to bring into each class
+        entry = free[fit[free].argmin(axis=0)]
+        dist = fit[entry, np.arange(n_classes)]
+        # Cheapest unit to move from class s to class t
+        move_cost = np.full((n_classes, n_classes), np.inf)
+        move_unit = np.full((n_classes, n_classes), -1)
+        for s in range(n_classes):
+            in_s = np.flatnonzero(class_of == s)
+            if len(in_s):
+                delta = fit[in_s] - fit[in_s, s][:, np.newaxis]
+                best = delta.argmin(axis=0)
+                move_cost[s] = delta[best, np.arange(n_classes)]
+                move_unit[s] = in_s[best]
+        # Bellman-Ford over the classes; the residual graph has no negative cycles
+        previous = np.full(n_classes, -1)
+        for _ in range(n_classes - 1):
+            via = dist[:, np.newaxis] + move_cost
+            best = via.argmin(axis=0)
+            best_dist = via[best, np.arange(n_classes)]
+            improved = best_dist < dist - 1e-9
+            if not improved.any():
+                break
+            dist[improved] = best_dist[improved]
+            previous[improved] = best[improved]
+
+        total = dist + next_slot
+        target = int(total.argmin())
+        if not np.isfinite(total[target]):
+            break
+        # Apply the path backwards: each hop moves one unit into the next class
+        s = target
+        while previous[s] >= 0:
+            class_of[move_unit[previous[s], s]] = s
+            s = previous[s]
+        class_of[entry[s]] = s
+        counts[target] += 1
+
+    unit_idx, candidate_idx, costs = [], [], []
+    for s in range(n_classes):
+        units_in_class = np.flatnonzero(class_of == s)
+        chosen = members[s][:counts[s]]
+        unit_idx.append(units_in_class)
+        candidate_idx.append(chosen)
+        costs.append(fit[units_in_class, s] + slot_costs[s][:counts[s]])
+    return np.concatenate(unit_idx), np.concatenate(candidate_idx), np.concatenate(costs)
+
+
+def propose_allocations(top_k=None, unit_ids=None, exclude_applications=()):
+    """
+    Match the AVAILABLE housing units against the ranked queue (see match_units).
+    `top_k` limits the candidates to the first K applications of the queue,
+    `unit_ids` the units to the given ones, and `exclude_applications` are
+    never offered anything. Returns a list of Proposal, in rank order.
+    """
+    units = HousingUnit.objects.filter(status='AVAILABLE')
+    if unit_ids is not None:
+        units = units.filter(id__in=unit_ids)
+    units = list(units.order_by('id').values_list('id', 'unit_number', 'rooms_count', 'total_area'))
+    candidates = Application.objects.filter(
+        status=RANKED_STATUS, queue_rank__isnull=False
+    ).exclude(id__in=exclude_applications).order_by('queue_rank').values_list(
+        'id', 'application_number', 'queue_rank', *HOUSEHOLD_FIELDS
+    )
+    if top_k is not None:
+        candidates = candidates[:top_k]
+    candidates = list(candidates)
+    if not units or not candidates:
+        return []
+
+    ranks = np.array([row[2] for row in candidates], dtype=np.int64)
+    household_sizes = np.maximum(np.array([row[3:] for row in candidates], dtype=np.int64).sum(axis=1), 1)
+    unit_idx, candidate_idx, costs = match_units(
+        np.array([row[2] for row in units], dtype=np.int64),
+        np.array([row[3] for row in units], dtype=np.float64),
+        ranks,
+        household_sizes,
+    )
+
+    proposals = []
+    for u, c, cost in zip(unit_idx.tolist(), candidate_idx.tolist(), costs.tolist()):
+        unit_id, unit_number, rooms_count, total_area = units[u]
+        proposals.append(Proposal(
+            application_id=candidates[c][0],
+            application_number=candidates[c][1],
+            queue_rank=candidates[c][2],
+            household_size=int(household_sizes[c]),
+            unit_id=unit_id,
+            unit_number=unit_number,
+            rooms_count=rooms_count,
+            total_area=total_area,
+            cost=round(cost, 4),
+        ))
+    proposals.sort(key=lambda proposal: proposal.queue_rank)
+    return proposals
+
+
+def commit_allocations(proposals, changed_by=None):
+    """
+    Turn an allocation proposal into OFFERED HousingAllocation rows in one
+    transaction. Raises AllocationConflict, writing nothing, if any unit is no
+    longer AVAILABLE or any application no longer in the queue.
+    """
+    if not proposals:
+        return 0
+    unit_ids = [proposal.unit_id for proposal in proposals]
+    application_ids = [proposal.application_id for proposal in proposals]
+    if len(set(unit_ids)) != len(unit_ids) or len(set(application_ids)) != len(application_ids):
+        raise AllocationConflict('A unit or application appears more than once in the proposal')
+
+    with transaction.atomic():
+        units = set(
+            HousingUnit.objects.select_for_update()
+            .filter(id__in=unit_ids, status='AVAILABLE').values_list('id', flat=True)
+        )
+        ranks = dict(
+            Application.objects.select_for_update()
+            .filter(id__in=application_ids, status=RANKED_STATUS).values_list('id', 'queue_rank')
+        )
+        stale = [
+            proposal for proposal in proposals
+            if proposal.unit_id not in units or proposal.application_id not in ranks
+        ]
+        if stale:
+            raise AllocationConflict('Proposal is out of date for: ' + ', '.join(
+                f'{proposal.application_number} → {proposal.unit_number}' for proposal in stale
+            ))
+
+        now = timezone.now()
+        HousingAllocation.objects.bulk_create([
+            HousingAllocation(
+                application_id=proposal.application_id,
+                housing_unit_id=proposal.unit_id,
+                changed_by=changed_by,
+                status='OFFERED',
+            )
+            for proposal in proposals
+        ])
+        Notification.objects.bulk_create([
+            Notification(
+                application_id=proposal.application_id,
+                notification_type='STATUS_CHANGE',
+                title='Application Status Updated',
+                message='Your application status has changed to "Housing Offered".',
+                status='UNREAD',
+                sent_at=now,
+            )
+            for proposal in proposals
+        ])
+        HousingUnit.objects.filter(id__in=unit_ids).update(status='RESERVED')
+        bump_inventory_version()
+        units_updated.send(HousingUnit, unit_ids=unit_ids, previous_status='AVAILABLE', status='RESERVED')
+        Application.objects.filter(id__in=application_ids).update(
+            status='HOUSING_OFFERED', queue_rank=None, last_updated=now
+        )
+        # The queryset update bypasses Application.save, so close the rank gaps here
+        close_rank_gaps(ranks.values())
+    return len(proposals)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('housing_units', '0006_alter_housingunit_floor_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='housingunit',
+            index=models.Index(fields=['status'], name='housing_unit_status_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:24
+
+import housing_units.models
+from datetime import timedelta
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_response_deadlines(apps, schema_editor):
+    """Give open offers a deadline counted from their offer date; closed ones need none"""
+    HousingAllocation = apps.get_model('housing_units', 'HousingAllocation')
+    days = timedelta(days=getattr(settings, 'HOUSING_OFFER_RESPONSE_DAYS', 7))
+    HousingAllocation.objects.exclude(status='OFFERED').update(response_deadline=None)
+    offers = list(HousingAllocation.objects.filter(status='OFFERED').only('id', 'offer_date'))
+    for allocation in offers:
+        allocation.response_deadline = allocation.offer_date + days
+    HousingAllocation.objects.bulk_update(offers, ['response_deadline'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0017_application_status_indexes'),
+        ('housing_units', '0007_housingunit_status_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='housingallocation',
+            name='response_deadline',
+            field=models.DateField(blank=True, default=housing_units.models.default_response_deadline, null=True),
+        ),
+        migrations.RunPython(set_response_deadlines, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='housingallocation',
+            index=models.Index(condition=models.Q(('status', 'OFFERED')), fields=['response_deadline'], name='allocation_offer_due_idx'),
+        ),
+    ]
@@ -1,7 +1,16 @@
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from users.models import User
 from django.core.validators import MinValueValidator
 
+
+def default_response_deadline():
+    """Last day to answer a housing offer made today"""
+    return timezone.localdate() + timedelta(days=getattr(settings, 'HOUSING_OFFER_RESPONSE_DAYS', 7))
+
+
 class HousingUnit(models.Model):
     UNIT_STATUS = [
         ('AVAILABLE', 'Available'),
@@ -23,6 +32,11 @@ class HousingUnit(models.Model):
     has_heating = models.BooleanField(default=True)
     last_inspection_date = models.DateField(null=True, blank=True)
     next_available_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='housing_unit_status_idx'),
+        ]
     
     def __str__(self):
         return f"Unit {self.unit_number} - {self.rooms_count} rooms"
@@ -40,7 +54,8 @@ class HousingAllocation(models.Model):
     housing_unit = models.ForeignKey(HousingUnit, on_delete=models.CASCADE)
     changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     offer_date = models.DateField(auto_now_add=True)
-    # response_deadline = models.DateField()
+    # OFFERED allocations past this date are expired by the expire_housing_offers command
+    response_deadline = models.DateField(default=default_response_deadline, null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='OFFERED')
     # rejection_reason = models.TextField(null=True, blank=True)
 
@@ -49,6 +64,17 @@ class HousingAllocation(models.Model):
     tenancy_end_date = models.DateField(null=True, blank=True)
     
     notes = models.TextField(blank=True)
+    # Client-supplied key that makes a retried offer request a no-op
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['response_deadline'],
+                condition=models.Q(status='OFFERED'),
+                name='allocation_offer_due_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"Allocation: {self.application.application_number} → {self.housing_unit.unit_number}"
\ No newline at end of file
@@ -0,0 +1,158 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from applications.models import Application, ApplicationHistory
+from applications.ranking import RANKED_STATUS, close_rank_gap, insert_queue_ranks
+from notifications.models import Notification
+from .inventory import bump_inventory_version
+from .matching import commit_allocations, propose_allocations
+from .models import HousingAllocation, HousingUnit
+from .signals import units_updated
+
+# Candidates considered per freed unit when an expiry sweep offers it again
+CANDIDATES_PER_UNIT = 20
+
+
+class OfferUnavailable(Exception):
+    """The unit or the application can no longer take the offer"""
+
+
+def offer_unit(application_id, unit_id, changed_by=None, idempotency_key=None):
+    """
+    Offer a housing unit to an application, atomically.
+
+    The unit is claimed with a conditional UPDATE (AVAILABLE -> RESERVED),
+    which locks the row and checks its status in one statement, so two
+    managers can never reserve the same unit. Everything else is written in
+    the same transaction. A request repeated with the same `idempotency_key`
+    returns the allocation it created the first time.
+
+    Only applications in the queue (IN_QUEUE) can take an offer.
+    Returns (allocation, created); raises OfferUnavailable.
+    """
+    if idempotency_key:
+        existing = HousingAllocation.objects.filter(idempotency_key=idempotency_key).first()
+        if existing:
+            return _replayed(existing, application_id, unit_id)
+    try:
+        with transaction.atomic():
+            if not HousingUnit.objects.filter(pk=unit_id, status='AVAILABLE').update(status='RESERVED'):
+                raise OfferUnavailable('This housing unit is no longer available.')
+            bump_inventory_version()
+            units_updated.send(HousingUnit, unit_ids=[unit_id], previous_status='AVAILABLE', status='RESERVED')
+            application = (
+                Application.objects.select_for_update()
+                .filter(pk=application_id).values('status', 'queue_rank').first()
+            )
+            if application is None or application['status'] != RANKED_STATUS:
+                if application is not None and application['status'] == 'HOUSING_OFFERED':
+                    raise OfferUnavailable('This application already has a housing offer.')
+                raise OfferUnavailable('Only applications in the queue can be offered housing.')
+
+            now = timezone.now()
+            Application.objects.filter(pk=application_id).update(
+                status='HOUSING_OFFERED', queue_rank=None, last_updated=now
+            )
+            close_rank_gap(application['queue_rank'])
+            allocation = HousingAllocation.objects.create(
+                application_id=application_id,
+                housing_unit_id=unit_id,
+                changed_by=changed_by,
+                status='OFFERED',
+                idempotency_key=idempotency_key or None,
+            )
+            Notification.objects.create(
+                application_id=application_id,
+                notification_type='STATUS_CHANGE',
+                title='Application Status Updated',
+                message='Your application status has changed to "Housing Offered".',
+                status='UNREAD',
+                sent_at=now,
+            )
+    except (IntegrityError, OfferUnavailable):
+        # A concurrent request with the same key may have won the race
+        existing = idempotency_key and HousingAllocation.objects.filter(idempotency_key=idempotency_key).first()
+        if not existing:
+            raise
+        return _replayed(existing, application_id, unit_id)
+    return allocation, True
+
+
+def _replayed(allocation, application_id, unit_id):
+    if (allocation.application_id, allocation.housing_unit_id) != (int(application_id), int(unit_id)):
+        raise OfferUnavailable('This request key was already used for a different offer.')
+    return allocation, False
+
+
+def expire_offers(batch_size=500, today=None):
+    """
+    Expire OFFERED allocations whose response deadline has passed, in batches
+    of `batch_size`, each in its own transaction. The applicants go back to
+    the queue, the units become AVAILABLE and are offered straight away to the
+    next fitting applications (see propose_allocations), skipping applicants
+    whose offer for one of those units already expired.
+
+    Returns (offers expired, offers made).
+    """
+    today = today or timezone.localdate()
+    # Offers made by this sweep are left for the next one
+    last_id = HousingAllocation.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    expired = offered = 0
+    while True:
+        with transaction.atomic():
+            allocations = list(
+                HousingAllocation.objects.select_for_update()
+                .filter(status='OFFERED', response_deadline__lt=today, id__lte=last_id)
+                .order_by('response_deadline', 'id')
+                .values_list('id', 'application_id', 'housing_unit_id')[:batch_size]
+            )
+            if not allocations:
+                break
+            allocation_ids, application_ids, unit_ids = (list(column) for column in zip(*allocations))
+
+            HousingAllocation.objects.filter(id__in=allocation_ids).update(status='EXPIRED')
+            freed_units = list(
+                HousingUnit.objects.filter(id__in=unit_ids, status='RESERVED').values_list('id', flat=True)
+            )
+            HousingUnit.objects.filter(id__in=freed_units).update(status='AVAILABLE')
+            bump_inventory_version()
+            units_updated.send(HousingUnit, unit_ids=freed_units, previous_status='RESERVED', status='AVAILABLE')
+            returning = list(
+                Application.objects.filter(id__in=application_ids, status='HOUSING_OFFERED')
+                .values_list('id', flat=True)
+            )
+            now = timezone.now()
+            Application.objects.filter(id__in=returning).update(status=RANKED_STATUS, last_updated=now)
+            ApplicationHistory.objects.bulk_create([
+                ApplicationHistory(
+                    application_id=application_id,
+                    previous_status='HOUSING_OFFERED',
+                    new_status=RANKED_STATUS,
+                    notes='Housing offer expired without a response',
+                )
+                for application_id in returning
+            ])
+            Notification.objects.bulk_create([
+                Notification(
+                    application_id=application_id,
+                    notification_type='HOUSING_OFFER',
+                    title='Housing Offer Expired',
+                    message='Your housing offer expired without a response. Your application is back in the queue.',
+                    status='UNREAD',
+                    sent_at=now,
+                )
+                for application_id in returning
+            ])
+            insert_queue_ranks(returning)
+
+            # Cascade: offer the freed units to the next applications in line, among the
+            # first few per unit; enough to find a fitting household without reading the queue
+            declined = HousingAllocation.objects.filter(
+                housing_unit_id__in=freed_units, status='EXPIRED'
+            ).values_list('application_id', flat=True)
+            proposals = propose_allocations(
+                top_k=CANDIDATES_PER_UNIT * len(freed_units), unit_ids=freed_units, exclude_applications=declined,
+            )
+            offered += commit_allocations(proposals)
+            expired += len(allocations)
+    return expired, offered
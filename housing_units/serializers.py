@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+
+class InventoryUnitSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    unit_number = serializers.CharField()
+    address = serializers.CharField()
+    floor = serializers.IntegerField()
+    total_area = serializers.DecimalField(max_digits=6, decimal_places=2)
+    rooms_count = serializers.IntegerField()
+    status = serializers.CharField()
+    has_elevator = serializers.BooleanField()
+    has_heating = serializers.BooleanField()
+    next_available_date = serializers.DateField(allow_null=True)
+
+
+class InventoryResponseSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    results = InventoryUnitSerializer(many=True)
+    facets = serializers.DictField()
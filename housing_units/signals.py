@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from .inventory import bump_inventory_version
+from .models import HousingUnit
+
+# Sent after queryset updates and bulk_create, which bypass post_save: with
+# the unit_ids and their previous and new status for status changes, or with
+# unit_ids=None when any unit may have changed in any way
+units_updated = Signal()
+
+
+@receiver(post_save, sender=HousingUnit)
+@receiver(post_delete, sender=HousingUnit)
+def invalidate_inventory(sender, **kwargs):
+    """Any unit change invalidates the in-memory inventory"""
+    bump_inventory_version()
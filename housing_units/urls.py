@@ -9,4 +9,7 @@ urlpatterns = [
     path('<int:unit_id>/', views.view_housing_unit, name='view-unit'),
     path('<int:unit_id>/edit/', views.edit_housing_unit, name='edit-unit'),
     path('offer-unit/<int:application_id>/', views.offer_housing, name='offer-housing'),
+
+    ## api
+    path('api/inventory/', views.InventoryAPIView.as_view(), name='api_inventory'),
 ]
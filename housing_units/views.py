@@ -8,19 +8,37 @@ from .models import HousingUnit, HousingAllocation
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth.decorators import login_required
-from notifications.models import Notification
+from .offers import OfferUnavailable, offer_unit
+from .inventory import filters_from_query, get_inventory
+from .serializers import InventoryResponseSerializer, InventoryUnitSerializer
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 
 # Create your views here.
 
 def housing_units_list(request):
-    units = HousingUnit.objects.all()
-    paginator = Paginator(units, 10)  # 10 units per page
+    # Filtered and counted in memory from the housing inventory
+    filters = filters_from_query(request.GET)
+    inventory = get_inventory()
+    result = inventory.query(filters)
+    facets = result['facets']
+    paginator = Paginator(result['indices'], 10)  # 10 units per page
     page_number = request.GET.get('page')
     housing_units = paginator.get_page(page_number)
+    housing_units.object_list = inventory.rows(housing_units.object_list)
     
     context = {
         'housing_units': housing_units,
-        'housing_units_count': units.count()
+        'housing_units_count': paginator.count,
+        'filters': filters,
+        'facets': facets,
+        'status_options': [(value, label, facets['status'].get(value, 0)) for value, label in HousingUnit.UNIT_STATUS],
+        'flag_counts': {
+            flag: (facets[flag][True], facets[flag][False]) for flag in ('has_elevator', 'has_heating')
+        },
     }
     return render(request, 'housing_units.html', context)
 
@@ -88,34 +106,58 @@ def offer_housing(request, application_id):
     application = get_object_or_404(Application, id=application_id)
     
     if request.method == 'POST':
-        housing_unit_id = request.POST.get('housing_unit')
-        housing_unit = get_object_or_404(HousingUnit, id=housing_unit_id)
+        housing_unit = get_object_or_404(HousingUnit, id=request.POST.get('housing_unit'))
+        # Retried submissions carry the same key and do not offer twice
+        idempotency_key = request.POST.get('idempotency_key') or request.headers.get('Idempotency-Key')
         
-        # Create housing allocation
-        HousingAllocation.objects.create(
-            application=application,
-            housing_unit=housing_unit,
-            changed_by=request.user,
-            # response_deadline=timezone.now() + timedelta(days=7),
-            status='OFFERED'
-        )
+        try:
+            offer_unit(application.id, housing_unit.id, changed_by=request.user, idempotency_key=idempotency_key)
+        except OfferUnavailable as e:
+            messages.error(request, str(e))
+        
+        return redirect('applications:view-application', application_id=application.id)
 
-        # Create notification
-        Notification.objects.create(
-            application=application,
-            notification_type='STATUS_CHANGE',
-            title='Application Status Updated',
-            message=f'Your application status has changed to "Housing Offered".',
-            status='UNREAD',
-            sent_at=timezone.now()
-        )
 
-        # Update application status
-        application.status = 'HOUSING_OFFERED'
-        application.save()
-        
-        # Update housing unit status
-        housing_unit.status = 'RESERVED'
-        housing_unit.save()
-        
-        return redirect('applications:view-application', application_id=application.id)
\ No newline at end of file
+class InventoryAPIView(APIView):
+    """Faceted search over the housing inventory, answered from memory"""
+    permission_classes = [AllowAny]
+    max_limit = 500
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_ARRAY,
+                              items=openapi.Items(type=openapi.TYPE_STRING), collection_format='multi'),
+            openapi.Parameter('rooms_count', openapi.IN_QUERY, type=openapi.TYPE_ARRAY,
+                              items=openapi.Items(type=openapi.TYPE_INTEGER), collection_format='multi'),
+            openapi.Parameter('floor_min', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('floor_max', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('area_min', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('area_max', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('has_elevator', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('has_heating', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('offset', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: InventoryResponseSerializer},
+        operation_description="Housing units matching the filters, with per-facet counts (status defaults to AVAILABLE)"
+    )
+    def get(self, request):
+        filters = filters_from_query(request.query_params)
+        filters['status'] = filters['status'] or ['AVAILABLE']
+        inventory = get_inventory()
+        result = inventory.query(filters)
+        limit = min(self.int_param(request, 'limit', 50), self.max_limit)
+        offset = self.int_param(request, 'offset', 0)
+        units = inventory.rows(result['indices'][offset:offset + limit])
+        return Response({
+            'count': result['count'],
+            'results': InventoryUnitSerializer(units, many=True).data,
+            'facets': result['facets'],
+        })
+
+    @staticmethod
+    def int_param(request, name, default):
+        try:
+            return max(int(request.query_params.get(name, default)), 0)
+        except ValueError:
+            return default
@@ -0,0 +1,84 @@
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from applications.models import Application
+from applications.snapshot import load_snapshot, previous_snapshot_path, rank_deltas, snapshot_path
+from notifications.models import Notification
+
+
+class Command(BaseCommand):
+    help = (
+        'Notify applicants whose queue position moved between the two latest queue snapshots. '
+        'Run after build_queue_snapshot.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=int,
+                            default=getattr(settings, 'QUEUE_UPDATE_THRESHOLD', 10),
+                            help='Minimum number of places moved before an applicant is notified')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--force', action='store_true',
+                            help='Notify even if this snapshot version was already processed')
+
+    def handle(self, *args, **options):
+        path = snapshot_path()
+        current = load_snapshot(path)
+        previous = load_snapshot(previous_snapshot_path(path))
+        if current is None or previous is None:
+            self.stdout.write('Need two consecutive queue snapshots; nothing to do.')
+            return
+
+        marker = f'{path}.notified'
+        if not options['force'] and self.last_notified(marker) >= current.version:
+            self.stdout.write(f'Snapshot v{current.version} was already processed.')
+            return
+
+        ids, old_ranks, new_ranks = rank_deltas(previous, current)
+        moved = np.abs(old_ranks.astype(np.int64) - new_ranks) >= options['threshold']
+
+        # Applicants who have not read their last queue update are not notified again
+        unread = np.fromiter(
+            Notification.objects.filter(notification_type='QUEUE_UPDATE', status='UNREAD')
+            .values_list('application_id', flat=True).distinct().iterator(),
+            dtype=np.int64,
+        )
+        moved &= ~np.isin(ids, unread)
+
+        # Skip applications that left the queue (or were deleted) since the snapshot
+        still_queued = np.fromiter(
+            Application.objects.filter(queue_rank__isnull=False).values_list('id', flat=True).iterator(),
+            dtype=np.int64,
+        )
+        moved &= np.isin(ids, still_queued, assume_unique=True)
+
+        now = timezone.now()
+        notifications = (
+            Notification(
+                application_id=pk,
+                notification_type='QUEUE_UPDATE',
+                title='Queue Position Updated',
+                message=f'Your queue position has changed from {old} to {new}.',
+                status='UNREAD',
+                sent_at=now,
+            )
+            for pk, old, new in zip(ids[moved].tolist(), old_ranks[moved].tolist(), new_ranks[moved].tolist())
+        )
+        with transaction.atomic():
+            created = len(Notification.objects.bulk_create(notifications, batch_size=options['batch_size']))
+
+        with open(marker, 'w') as f:
+            f.write(str(current.version))
+        self.stdout.write(
+            f'Created {created} queue update notifications '
+            f'(snapshot v{previous.version} -> v{current.version}).'
+        )
+
+    def last_notified(self, marker):
+        try:
+            with open(marker) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0017_application_status_indexes'),
+        ('notifications', '0002_alter_notification_notification_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['application', '-created_at'], name='notification_app_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('notification_type', 'QUEUE_UPDATE'), ('status', 'UNREAD')), fields=['application'], name='notification_unread_queue_idx'),
+        ),
+    ]
@@ -24,6 +24,17 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='UNREAD')
     sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['application', '-created_at'], name='notification_app_created_idx'),
+            # Only unread queue updates are looked up by notify_queue_updates
+            models.Index(
+                fields=['application'],
+                condition=models.Q(notification_type='QUEUE_UPDATE', status='UNREAD'),
+                name='notification_unread_queue_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.notification_type} for {self.application.application_number}"
\ No newline at end of file
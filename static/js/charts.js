@@ -0,0 +1,84 @@
+// charts.js
+// Draws chart series (see app_statistics/charts.py) with Chart.js, which the page loads first.
+function axis(title, extra) {
+    return Object.assign({title: {display: Boolean(title), text: title || ''}}, extra);
+}
+
+function chartConfig(series) {
+    const options = {responsive: true, maintainAspectRatio: false, plugins: {legend: {display: false}}};
+    const ticks = series.fontsize ? {font: {size: series.fontsize}} : {};
+    if (series.rotation) {
+        ticks.maxRotation = series.rotation;
+        ticks.minRotation = series.rotation;
+    }
+
+    if (series.kind === 'hist') {
+        const labels = series.values.map((_, i) => `${series.edges[i].toLocaleString()} – ${series.edges[i + 1].toLocaleString()}`);
+        options.scales = {x: axis(series.xlabel), y: axis(series.ylabel, {beginAtZero: true})};
+        return {type: 'bar', options: options, data: {labels: labels, datasets: [{
+            data: series.values, backgroundColor: series.color + 'B3', borderColor: '#000', borderWidth: 1,
+            barPercentage: 1, categoryPercentage: 1,
+        }]}};
+    }
+    if (series.kind === 'bar' || series.kind === 'barh') {
+        const horizontal = series.kind === 'barh';
+        options.indexAxis = horizontal ? 'y' : 'x';
+        options.scales = horizontal
+            ? {x: axis(series.xlabel, {beginAtZero: true}), y: axis(series.ylabel, {ticks: ticks})}
+            : {x: axis(series.xlabel, {ticks: ticks}), y: axis(series.ylabel, {beginAtZero: true})};
+        return {type: 'bar', options: options, data: {labels: series.labels, datasets: [{
+            data: series.values, backgroundColor: series.color, borderColor: horizontal ? series.color : '#000',
+            borderWidth: horizontal ? 0 : 1,
+        }]}};
+    }
+    if (series.kind === 'pie') {
+        options.plugins.legend = {display: true, position: 'right'};
+        return {type: 'pie', options: options, data: {labels: series.labels, datasets: [{
+            data: series.values, backgroundColor: series.color,
+        }]}};
+    }
+    if (series.kind === 'line') {
+        options.scales = {x: axis(series.xlabel), y: axis(series.ylabel)};
+        return {type: 'line', options: options, data: {labels: series.x, datasets: [{
+            data: series.y, borderColor: series.color, backgroundColor: series.color, borderWidth: 2,
+            pointRadius: 5, pointStyle: series.marker === 's' ? 'rect' : 'circle',
+        }]}};
+    }
+    options.scales = {x: axis(series.xlabel, {type: 'linear'}), y: axis(series.ylabel)};
+    return {type: 'scatter', options: options, data: {datasets: [{
+        data: series.x.map((x, i) => ({x: x, y: series.y[i]})), backgroundColor: series.color + '80', pointRadius: 3,
+    }]}};
+}
+
+function drawChart(canvas, series) {
+    new Chart(canvas, chartConfig(series));
+}
+
+function chartUnavailable(canvas) {
+    canvas.parentElement.outerHTML = '<p class="text-gray-500 text-center py-16">Chart unavailable</p>';
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    // <canvas data-chart="url"> fetches its series as JSON
+    document.querySelectorAll('canvas[data-chart]').forEach(async function(canvas) {
+        try {
+            const response = await fetch(canvas.dataset.chart);
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            drawChart(canvas, await response.json());
+        } catch (error) {
+            chartUnavailable(canvas);
+        }
+    });
+    // <canvas data-series="id"> reads it from the json_script element with that id
+    document.querySelectorAll('canvas[data-series]').forEach(function(canvas) {
+        const element = document.getElementById(canvas.dataset.series);
+        const series = element && JSON.parse(element.textContent);
+        if (series) {
+            drawChart(canvas, series);
+        } else {
+            chartUnavailable(canvas);
+        }
+    });
+});
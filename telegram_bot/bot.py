@@ -45,7 +45,10 @@ async def check_queue_position(update: Update, context: ContextTypes.DEFAULT_TYP
         if response.status_code == 200:
             data = response.json()
             queue_position = data.get("queue_position")
-            await update.message.reply_text(f"Your queue position is: {queue_position}")
+            if queue_position is None:
+                await update.message.reply_text("Your application is awaiting review and is not in the queue yet.")
+            else:
+                await update.message.reply_text(f"Your queue position is: {queue_position} of {data.get('total_queued')}")
         elif response.status_code == 404:
             data = response.json()
             await update.message.reply_text(data.get("message", "No user or application found."))
@@ -0,0 +1,59 @@
+from django.test import TestCase, TransactionTestCase
+from decimal import Decimal
+from applications.models import Application, ApplicationNumberSequence
+from applications.numbering import ApplicationNumberAllocator
+from users.models import User
+
+
+class ApplicationNumberTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='applicant@example.com',
+            password='testpass123',
+            first_name='John',
+            last_name='Doe',
+            phone_number='+1234567890'
+        )
+
+    def create_application(self):
+        return Application.objects.create(
+            applicant=self.user,
+            current_address='123 Main St',
+            current_residence_condition='POOR',
+            monthly_income=Decimal('50000.00'),
+        )
+
+    def test_numbers_are_sequential(self):
+        """Test that consecutive saves receive consecutive numbers"""
+        first = self.create_application()
+        second = self.create_application()
+        self.assertEqual(int(second.application_number[3:]), int(first.application_number[3:]) + 1)
+
+    def test_continues_from_counter(self):
+        """Test that numbering continues from the stored counter value"""
+        ApplicationNumberSequence.objects.update_or_create(name='application_number', defaults={'last_value': 41})
+        self.assertEqual(self.create_application().application_number, 'APP000042')
+
+    def test_reserve_inside_transaction_does_not_cache(self):
+        """Test that a block fetched inside a transaction only consumes what was asked for"""
+        allocator = ApplicationNumberAllocator(block_size=50)
+        numbers = allocator.reserve(3)
+        self.assertEqual(len(set(numbers)), 3)
+        self.assertEqual(ApplicationNumberSequence.objects.get().last_value, int(numbers[-1][3:]))
+
+
+class ApplicationNumberBlockTests(TransactionTestCase):
+    def test_block_served_from_memory(self):
+        """Test that numbers after the first come from the preallocated block without queries"""
+        allocator = ApplicationNumberAllocator(block_size=10)
+        first = allocator.next_number()
+        with self.assertNumQueries(0):
+            rest = allocator.reserve(9)
+        self.assertEqual(ApplicationNumberSequence.objects.get().last_value, 10)
+        self.assertEqual([first] + rest, [f'APP{i:06d}' for i in range(1, 11)])
+
+    def test_workers_never_overlap(self):
+        """Test that separate allocators draw disjoint blocks from the counter"""
+        workers = [ApplicationNumberAllocator(block_size=5) for _ in range(3)]
+        numbers = [worker.next_number() for _ in range(7) for worker in workers]
+        self.assertEqual(len(numbers), len(set(numbers)))
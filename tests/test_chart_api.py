@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from app_statistics.charts import CHARTS, CHARTS_BY_KEY
+from app_statistics.views import SECTIONS
+from housing_units.models import HousingUnit
+
+
+class ChartDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        override = override_settings(HOUSE_DATA_CACHE_PATH=os.path.join(tmpdir, 'house_data.columns'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_series(self):
+        """Test that every chart is served as a JSON series"""
+        for chart in CHARTS:
+            response = self.client.get(reverse('app_statistics:chart_data', args=[chart.key]))
+            self.assertEqual(response.status_code, 200)
+            series = response.json()
+            self.assertIn(series['kind'], ('hist', 'bar', 'barh', 'pie', 'line', 'scatter'))
+            self.assertTrue(series['title'])
+        self.assertEqual(self.client.get(reverse('app_statistics:chart_data', args=['missing'])).status_code, 404)
+
+    @override_settings(STATISTICS_CHART_MAX_AGE=60)
+    def test_http_caching(self):
+        """Test that chart data is revalidated by ETag until the data the chart reads changes"""
+        url = reverse('app_statistics:chart_data', args=['price_hist'])
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        other = self.client.get(reverse('app_statistics:chart_data', args=['sqft_hist']))
+        self.assertNotEqual(other['ETag'], etag)
+
+        grouped_url = reverse('app_statistics:chart_data', args=['size_dist'])
+        grouped = self.client.get(grouped_url)
+        stats = self.client.get(reverse('app_statistics:statistics')).context['stats']
+        with self.captureOnCommitCallbacks(execute=True):
+            HousingUnit.objects.create(unit_number='U-1', address='1 Housing Ave', floor=1,
+                                       total_area=Decimal('40.00'), rooms_count=1)
+        # Row-based charts only read house_data.csv
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get(grouped_url, HTTP_IF_NONE_MATCH=grouped['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], grouped['ETag'])
+        self.assertEqual(self.client.get(reverse('app_statistics:statistics')).context['stats']['total'],
+                         stats['total'] + 1)
+
+    def test_unit_change_keeps_row_series(self):
+        """Test that a housing unit change rebuilds the grouped series without reloading house_data"""
+        self.client.get(reverse('app_statistics:chart_data', args=['price_hist']))
+        with self.captureOnCommitCallbacks(execute=True):
+            HousingUnit.objects.create(unit_number='U-1', address='1 Housing Ave', floor=1,
+                                       total_area=Decimal('40.00'), rooms_count=1)
+        with mock.patch('app_statistics.views.load_statistics_frame') as load:
+            response = self.client.get(reverse('app_statistics:chart_data', args=['size_dist']))
+        load.assert_not_called()
+        self.assertIn('1 BHK', response.json()['labels'])
+
+    def test_page_weight(self):
+        """Test that the statistics page carries chart URLs instead of images"""
+        response = self.client.get(reverse('app_statistics:statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'data:image/png')
+        for chart in CHARTS:
+            self.assertContains(response, reverse('app_statistics:chart_data', args=[chart.key]))
+
+        export = self.client.get(reverse('app_statistics:statistics_export'))
+        self.assertContains(export, 'data:image/png', count=len(CHARTS))
+        self.assertEqual(response.context['stats'], export.context['stats'])
+        self.assertLess(len(response.content), len(export.content) / 10)
+
+    def test_sections_cover_charts(self):
+        """Test that the page sections list every chart exactly once"""
+        keys = [key for *_, charts in SECTIONS for key, _ in charts]
+        self.assertCountEqual(keys, CHARTS_BY_KEY)
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+from app_statistics.charts import CHARTS, Chart
+from app_statistics.rendering import chart_series, get_pool, render_charts
+
+
+def series_ok(df):
+    return {'kind': 'line', 'x': list(range(len(df))), 'y': df['price'].tolist(), 'title': 'Price'}
+
+
+def series_error(df):
+    raise ValueError('bad data')
+
+
+def series_crash(df):
+    os._exit(1)
+
+
+def series_slow(df):
+    time.sleep(3)
+
+
+class ChartRenderingTests(SimpleTestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'price': [40.0, 60.0, 120.0, 250.0], 'sqft': [600.0, 900.0, 1500.0, 2400.0],
+            'price_per_sqft': [6666.0, 6666.0, 8000.0, 10416.0], 'bath': [1.0, 2.0, 2.0, 3.0],
+            'balcony': [0.0, 1.0, 1.0, 2.0], 'location': ['A', 'B', 'A', 'C'], 'size': ['1 BHK', '2 BHK', '2 BHK', '3 BHK'],
+            'availability': ['Ready To Move'] * 4, 'area_type': ['Plot  Area'] * 4,
+        })
+
+    def test_in_process(self):
+        """Test that every chart spec renders without a pool"""
+        with override_settings(STATISTICS_RENDER_WORKERS=0):
+            plots = render_charts(self.df)
+        self.assertEqual(list(plots), [chart.key for chart in CHARTS])
+        self.assertTrue(all(plots.values()))
+
+    @override_settings(STATISTICS_RENDER_WORKERS=2)
+    def test_pool(self):
+        """Test that charts render in the worker pool"""
+        plots = render_charts(self.df)
+        self.assertEqual(list(plots), [chart.key for chart in CHARTS])
+        self.assertTrue(all(plots.values()))
+
+    @override_settings(STATISTICS_RENDER_WORKERS=2)
+    def test_failures_degrade_single_charts(self):
+        """Test that a raising, crashing or hanging chart only loses itself"""
+        charts = [
+            Chart('first', (4, 3), ('price',), series_ok),
+            Chart('error', (4, 3), ('price',), series_error),
+            Chart('crash', (4, 3), ('price',), series_crash),
+            Chart('last', (4, 3), ('price',), series_ok),
+        ]
+        with self.assertLogs('app_statistics.rendering', 'ERROR'):
+            plots = render_charts(self.df, charts=charts)
+        self.assertEqual(list(plots), ['first', 'error', 'crash', 'last'])
+        self.assertTrue(plots['first'])
+        self.assertTrue(plots['last'])
+        self.assertIsNone(plots['error'])
+        self.assertIsNone(plots['crash'])
+
+        charts = [Chart('slow', (4, 3), ('price',), series_slow), Chart('ok', (4, 3), ('price',), series_ok)]
+        # Filled in as the pool starts its workers
+        workers = get_pool()._processes
+        with self.assertLogs('app_statistics.rendering', 'ERROR'):
+            plots = render_charts(self.df, charts=charts, timeout=1)
+        self.assertIsNone(plots['slow'])
+        self.assertTrue(plots['ok'])
+        # The worker stuck on the slow chart is terminated with its pool
+        self.assertTrue(workers)
+        self.assertFalse(any(worker.is_alive() for worker in workers.values()))
+        # The pool is replaced after a timeout
+        self.assertTrue(all(render_charts(self.df, charts=CHARTS[:2]).values()))
+
+    def test_series(self):
+        """Test that chart series are small and JSON-serializable"""
+        series = chart_series(self.df)
+        self.assertEqual(list(series), [chart.key for chart in CHARTS])
+        self.assertEqual(sum(series['price_hist']['values']), 4)
+        self.assertEqual(series['bathrooms']['labels'], ['1', '2', '3'])
+        self.assertEqual(series['top_locations']['labels'][0], 'C')
+        json.dumps(series, allow_nan=False)
+
+        with self.assertLogs('app_statistics.rendering', 'ERROR'):
+            series = chart_series(self.df, charts=[Chart('error', (4, 3), ('price',), series_error)])
+        self.assertEqual(series, {'error': None})
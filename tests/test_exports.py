@@ -0,0 +1,110 @@
+import csv
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from admin_dashboard import exports
+from admin_dashboard.exports import stream_xlsx
+from applications.models import Application, ApplicationHistory
+from users.models import User
+
+SHEET_NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def read_xlsx(content):
+    """{sheet part name: rows of cell texts} of an XLSX file"""
+    sheets = {}
+    with zipfile.ZipFile(io.BytesIO(content)) as package:
+        ET.fromstring(package.read('xl/workbook.xml'))
+        for name in package.namelist():
+            if name.startswith('xl/worksheets/'):
+                root = ET.fromstring(package.read(name))
+                sheets[name] = [
+                    [''.join(cell.itertext()) for cell in row.findall('s:c', SHEET_NS)]
+                    for row in root.iterfind('.//s:row', SHEET_NS)
+                ]
+    return sheets
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class ExportTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(email='staff@example.com', password='testpass123', is_staff=True,
+                                              first_name='Staff', last_name='Member', phone_number='+1234567890')
+        self.applications = []
+        for i, (first_name, score, status) in enumerate([
+            ('Aigerim', 40, 'IN_QUEUE'), ('=Nurlan', 70, 'IN_QUEUE'), ('Aliya', 90, 'SUBMITTED'),
+        ]):
+            user = User.objects.create_user(email=f'applicant{i}@example.com', password=None, first_name=first_name,
+                                            last_name='Bekova', phone_number='+1234567890', iin=f'99010130012{i}')
+            self.applications.append(Application.objects.create(
+                applicant=user, current_address='123 Main St', current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'), status=status, priority_score=score, category='ORPHAN',
+            ))
+        ApplicationHistory.objects.create(application=self.applications[0], previous_status='SUBMITTED',
+                                          new_status='IN_QUEUE', changed_by=self.staff, notes='Documents <ok> & verified')
+        self.client.force_login(self.staff)
+
+    def download(self, name, file_format, params=None):
+        response = self.client.get(reverse(f'dashboard:export_{name}', args=[file_format]), params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(f'.{file_format}"', response['Content-Disposition'])
+        return b''.join(response.streaming_content)
+
+    def test_queue_csv(self):
+        """Test the ranked queue as CSV, in rank order with display labels"""
+        rows = list(csv.reader(io.StringIO(self.download('queue', 'csv').decode('utf-8-sig'))))
+        self.assertEqual(rows[0][:3], ['Queue Rank', 'Application #', 'IIN'])
+        self.assertEqual([row[0] for row in rows[1:]], ['1', '2'])
+        self.assertEqual(rows[1][1], self.applications[1].application_number)
+        # Text that a spreadsheet would run as a formula is quoted
+        self.assertEqual(rows[1][3], "'=Nurlan")
+        self.assertEqual(rows[1][5], 'Orphan or child without parental care')
+
+    def test_filtered_results_xlsx(self):
+        """Test that the applications export applies the dashboard filters"""
+        sheets = read_xlsx(self.download('applications', 'xlsx', {'status': 'IN_QUEUE'}))
+        rows = sheets['xl/worksheets/sheet1.xml']
+        self.assertEqual(rows[0][0], 'Application #')
+        self.assertEqual([row[0] for row in rows[1:]],
+                         [self.applications[1].application_number, self.applications[0].application_number])
+        self.assertEqual(rows[1][2], '=Nurlan')
+        self.assertEqual(rows[1][7], '70')
+
+    def test_history_xlsx(self):
+        """Test the history export with escaped text"""
+        rows = read_xlsx(self.download('history', 'xlsx'))['xl/worksheets/sheet1.xml']
+        self.assertEqual(rows[1][1:6], [self.applications[0].application_number, '990101300120', 'Submitted',
+                                        'In Queue', 'staff@example.com'])
+        self.assertEqual(rows[1][6], 'Documents <ok> & verified')
+
+    def test_streams_in_chunks(self):
+        """Test that the first bytes are produced before the rows are read and that long exports span sheets"""
+        read = []
+
+        def rows():
+            yield ['n']
+            for n in range(10):
+                read.append(n)
+                yield [n]
+
+        with mock.patch.object(exports, 'ROWS_PER_WRITE', 3), mock.patch.object(exports, 'MAX_SHEET_ROWS', 5):
+            chunks = stream_xlsx(rows(), title='Numbers')
+            first = next(chunks)
+            self.assertTrue(first.startswith(b'PK'))
+            self.assertEqual(read, [])
+            content = first + b''.join(chunks)
+        sheets = read_xlsx(content)
+        self.assertEqual(len(sheets), 3)
+        self.assertEqual(sheets['xl/worksheets/sheet2.xml'], [['n'], ['4'], ['5'], ['6'], ['7']])
+        self.assertEqual(sum(len(rows) - 1 for rows in sheets.values()), 10)
+
+    def test_staff_only(self):
+        """Test that exports are for staff and known formats only"""
+        self.assertEqual(self.client.get(reverse('dashboard:export_queue', args=['pdf'])).status_code, 404)
+        self.client.force_login(self.applications[0].applicant)
+        self.assertEqual(self.client.get(reverse('dashboard:export_queue', args=['csv'])).status_code, 302)
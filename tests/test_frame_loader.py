@@ -0,0 +1,76 @@
+import datetime
+import numpy as np
+import pandas as pd
+from django.test import TestCase, override_settings
+from decimal import Decimal
+from app_statistics.loading import (
+    load_application_history, load_applications, load_frame, load_housing_units,
+)
+from applications.models import Application, ApplicationHistory
+from housing_units.models import HousingUnit
+from users.models import User
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class FrameLoaderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Seed a few units, applications and history rows with some nulls"""
+        for i in range(5):
+            HousingUnit.objects.create(
+                unit_number=f'U-{i}', address=f'{i} Housing Ave', floor=1 + i, total_area=Decimal('40.25') + i,
+                rooms_count=1 + i % 3, status='AVAILABLE' if i % 2 else 'OCCUPIED',
+                next_available_date=datetime.date(2030, 1, 1 + i) if i % 2 else None,
+            )
+        cls.user = User.objects.create_user(
+            email='applicant@example.com', password=None, first_name='John', last_name='Doe',
+            phone_number='+1234567890', iin='123456789012'
+        )
+        for i, status in enumerate(['IN_QUEUE', 'SUBMITTED', 'IN_QUEUE']):
+            application = Application.objects.create(
+                applicant=cls.user, current_address='123 Main St', current_residence_condition='POOR',
+                monthly_income=Decimal('50000.50'), current_living_area=None if i else Decimal('30.00'),
+                priority_score=10 * i, status=status,
+            )
+            ApplicationHistory.objects.create(application=application, previous_status='SUBMITTED',
+                                              new_status=status, changed_by=cls.user if i else None)
+
+    def test_housing_units(self):
+        """Test that every column matches the ORM values and has a compact type"""
+        df = load_housing_units(chunk_size=2)
+        expected = list(HousingUnit.objects.order_by('id').values_list(*df.columns))
+        self.assertEqual(len(df), len(expected))
+        self.assertEqual(df['unit_number'].tolist(), [row[1] for row in expected])
+        self.assertEqual(df['floor'].dtype, np.int16)
+        self.assertEqual(df['total_area'].tolist(), [float(row[4]) for row in expected])
+        self.assertEqual(df['has_elevator'].dtype, bool)
+        self.assertIsInstance(df['status'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['status'].tolist(), [row[6] for row in expected])
+        self.assertEqual(df['next_available_date'].isna().tolist(), [row[10] is None for row in expected])
+        self.assertEqual(df['next_available_date'].iloc[1], pd.Timestamp(2030, 1, 2))
+
+    def test_applications_and_history(self):
+        """Test nullable columns, timestamps and foreign keys"""
+        applications = load_applications(chunk_size=2)
+        self.assertEqual(len(applications), 3)
+        self.assertEqual(str(applications['queue_rank'].dtype), 'Int32')
+        self.assertEqual(applications['queue_rank'].isna().tolist(), [False, True, False])
+        self.assertEqual(applications['current_living_area'].isna().tolist(), [False, True, True])
+        self.assertEqual(str(applications['submission_date'].dtype), 'datetime64[ns, UTC]')
+        first = Application.objects.order_by('id').first()
+        self.assertEqual(applications['submission_date'].iloc[0], pd.Timestamp(first.submission_date))
+
+        history = load_application_history()
+        self.assertEqual(history['changed_by_id'].isna().tolist(), [True, False, False])
+        self.assertEqual(history['new_status'].tolist(), ['IN_QUEUE', 'SUBMITTED', 'IN_QUEUE'])
+
+    def test_related_and_empty(self):
+        """Test lookups across relations and an empty queryset"""
+        df = load_frame(Application.objects.order_by('id'), ['applicant__iin', 'applicant__is_staff'])
+        self.assertEqual(df['applicant__iin'].tolist(), ['123456789012'] * 3)
+        self.assertEqual(df['applicant__is_staff'].dtype, bool)
+
+        empty = load_housing_units(queryset=HousingUnit.objects.none())
+        self.assertEqual(list(empty.columns), list(load_housing_units().columns))
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(empty['floor'].dtype, np.int16)
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from app_statistics.house_data import load_house_data, parse_sqft
+
+
+class HouseDataTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.source = os.path.join(self.tmpdir, 'house_data.csv')
+        self.path = os.path.join(self.tmpdir, 'house_data.columns')
+        self.write_source(
+            'area_type,availability,location,size,society,total_sqft,bath,balcony,price\n'
+            'Plot  Area,Ready To Move,Whitefield,2 BHK,Coomee ,1056,2,1,39.07\n'
+            'Plot  Area,19-Dec,Whitefield,,,1133 - 1384,,3,120\n'
+            'Built-up  Area,Ready To Move,Uttarahalli,3 BHK,,34.46Sq. Meter,2,,62\n'
+        )
+
+    def write_source(self, content):
+        with open(self.source, 'w') as f:
+            f.write(content)
+
+    def test_parse_sqft(self):
+        """Test plain numbers, ranges, unit suffixes and garbage"""
+        sqft = parse_sqft(['1056', '1133 - 1384', '547.34 - 827.31', '34.46Sq. Meter', '1100Sq. Yards',
+                           '5.31Acres', '2Furlongs', 'abc', None, 40.25])
+        expected = [1056, 1258.5, 687.325, 34.46 * 10.7639, 9900, 5.31 * 43560, np.nan, np.nan, np.nan, 40.25]
+        np.testing.assert_allclose(sqft, expected)
+
+    def test_typed_columns(self):
+        """Test that the column file loads with categorical and float dtypes"""
+        df = load_house_data(self.source, self.path)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(len(df), 3)
+        for name in ('area_type', 'availability', 'location', 'size', 'society'):
+            self.assertIsInstance(df[name].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['location'].tolist(), ['Whitefield', 'Whitefield', 'Uttarahalli'])
+        self.assertEqual(df['society'].isna().tolist(), [False, True, True])
+        self.assertEqual(df['price'].dtype, np.float64)
+        self.assertTrue(np.isnan(df['bath'][1]))
+        np.testing.assert_allclose(df['sqft'], [1056, 1258.5, 34.46 * 10.7639])
+
+    def test_reingest_on_change(self):
+        """Test that a changed CSV is picked up and callers cannot alter the shared frame"""
+        df = load_house_data(self.source, self.path)
+        df['extra'] = 1
+        self.assertNotIn('extra', load_house_data(self.source, self.path).columns)
+
+        self.write_source(
+            'area_type,availability,location,size,society,total_sqft,bath,balcony,price\n'
+            'Plot  Area,Ready To Move,Hebbal,4 BHK,,2600,5,3,300\n'
+        )
+        df = load_house_data(self.source, self.path)
+        self.assertEqual(df['location'].tolist(), ['Hebbal'])
+
+    def test_pages_use_column_file(self):
+        """Test that both statistics pages read the bundled dataset through the column file"""
+        cache.clear()
+        with override_settings(HOUSE_DATA_CACHE_PATH=self.path):
+            response = self.client.get(reverse('app_statistics:pd_info'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['info']['shape'], (13320, 10))
+            self.assertEqual(str(response.context['info']['dtypes']['location']), 'category')
+            self.assertTrue(os.path.exists(self.path))
+
+            response = self.client.get(reverse('app_statistics:statistics'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['stats']['total'], 13320)
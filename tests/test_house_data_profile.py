@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from app_statistics import profiling
+from app_statistics.house_data import ingest, load_columns, load_house_data
+from app_statistics.profiling import house_data_profile, profile_columns, profile_path
+
+
+class HouseDataProfileTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'house_data.columns')
+        override = override_settings(HOUSE_DATA_CACHE_PATH=self.path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_matches_pandas(self):
+        """Test that the chunked profile equals describe, isnull and value_counts of the full frame"""
+        with mock.patch.object(profiling, 'CHUNK_ROWS', 1000):
+            profile = house_data_profile()
+        df = load_house_data()
+
+        for name, stats in df.describe().to_dict().items():
+            expected = [stats[key] for key in ('count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max')]
+            actual = [profile['describe'][name][key] for key in ('count', 'mean', 'std', 'min', 'q25', 'q50', 'q75', 'max')]
+            np.testing.assert_allclose(actual, expected, err_msg=name)
+        self.assertEqual(profile['missing'], df.isnull().sum().to_dict())
+        self.assertEqual(profile['memory'], df.memory_usage(deep=True).sum())
+        self.assertEqual(profile['value_counts']['size'], df['size'].value_counts().to_dict())
+        self.assertEqual(list(profile['value_counts']['location'].values())[:5],
+                         df['location'].value_counts().head(5).tolist())
+        self.assertEqual(profile['distinct']['location'], df['location'].nunique())
+        self.assertIsNone(profile['sampled_rows'])
+
+    def test_stored_until_source_changes(self):
+        """Test that the profile is read back from its file and recomputed for a new CSV"""
+        source = os.path.join(self.tmpdir, 'house_data.csv')
+        with open(source, 'w') as f:
+            f.write('area_type,availability,location,size,society,total_sqft,bath,balcony,price\n'
+                    'Plot  Area,Ready To Move,Whitefield,2 BHK,,1056,2,1,39.07\n')
+        profile = house_data_profile(source, self.path)
+        self.assertTrue(os.path.exists(profile_path(self.path)))
+        self.assertEqual(profile['rows'], 1)
+
+        with mock.patch.object(profiling, 'profile_columns') as compute:
+            self.assertEqual(house_data_profile(source, self.path), profile)
+        compute.assert_not_called()
+
+        with open(source, 'a') as f:
+            f.write('Plot  Area,Ready To Move,Whitefield,3 BHK,,1200,,2,80\n')
+        profile = house_data_profile(source, self.path)
+        self.assertEqual(profile['rows'], 2)
+        self.assertEqual(profile['missing']['bath'], 1)
+        self.assertEqual(profile['value_counts']['location'], {'Whitefield': 2})
+
+    def test_sampled(self):
+        """Test that a sampled profile reads part of the chunks and scales its counts to all rows"""
+        ingest(path=self.path)
+        columns = load_columns()
+        with mock.patch.object(profiling, 'CHUNK_ROWS', 500):
+            profile = profile_columns(columns, max_rows=4000)
+        self.assertEqual(profile['sampled_rows'], 4000)
+        self.assertEqual(profile['rows'], 13320)
+        self.assertAlmostEqual(profile['describe']['price']['count'], 13320, delta=1)
+        self.assertAlmostEqual(profile['missing']['balcony'], 609, delta=200)
+        self.assertAlmostEqual(profile['describe']['price']['q50'], 72, delta=10)
+        self.assertAlmostEqual(sum(profile['value_counts']['area_type'].values()), 13320, delta=2)
+
+    def test_page(self):
+        """Test that the dataframe info page is served from the profile"""
+        response = self.client.get(reverse('app_statistics:pd_info'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['describe']['price']['count'], 13320)
+        self.assertEqual(len(response.context['value_counts']['location']), 5)
+        self.assertNotContains(response, 'estimated from a sample')
+
+        with override_settings(HOUSE_DATA_PROFILE_SAMPLE_ROWS=1000), \
+                mock.patch.object(profiling, 'CHUNK_ROWS', 500):
+            os.remove(profile_path(self.path))
+            response = self.client.get(reverse('app_statistics:pd_info'))
+        self.assertContains(response, 'estimated from a sample of 1,000 rows')
@@ -0,0 +1,128 @@
+import os
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from housing_units import importing
+from housing_units.importing import import_housing_units
+from housing_units.models import HousingUnit
+from users.models import User
+
+HEADER = 'unit_number,address,floor,total_area,rooms_count,status,has_elevator,has_heating,last_inspection_date\n'
+
+
+class HousingUnitImportTests(TestCase):
+    def write_file(self, content, suffix='.csv'):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.unlink, path)
+        return path
+
+    def run_import(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command('import_housing_units', path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_and_error_report(self):
+        """Test that valid rows are imported and invalid ones reported by file row"""
+        path = self.write_file(
+            HEADER
+            + 'A-1,"1 Abay Ave, Almaty",3,54.456,2,available,yes,no,2024-05-01\n'
+            + 'A-2,2 Abay Ave,0,40,1,,,,\n'
+            + 'A-3,3 Abay Ave,2,35.5,1,SOLD,maybe,,01/02/2024\n'
+            + ',4 Abay Ave,1,30,1,,,,\n'
+            + 'A-4,5 Abay Ave,4,80,3,,,,\n'
+        )
+        errors = self.write_file('', suffix='.errors.csv')
+        out, _ = self.run_import(path, chunk_size=2, errors=errors)
+        self.assertIn('Imported 2 of 5 rows (2 new, 0 updated, 3 rejected)', out)
+
+        unit = HousingUnit.objects.get(unit_number='A-1')
+        self.assertEqual((unit.address, unit.floor, unit.total_area, unit.rooms_count), ('1 Abay Ave, Almaty', 3, Decimal('54.46'), 2))
+        self.assertEqual((unit.status, unit.has_elevator, unit.has_heating), ('AVAILABLE', True, False))
+        self.assertEqual(str(unit.last_inspection_date), '2024-05-01')
+        defaults = HousingUnit.objects.get(unit_number='A-4')
+        self.assertEqual((defaults.status, defaults.has_elevator, defaults.has_heating), ('AVAILABLE', False, True))
+
+        with open(errors) as f:
+            report = f.read().splitlines()
+        self.assertEqual(report[0], 'row,unit_number,error')
+        self.assertEqual([line.split(',')[0] for line in report[1:]], ['3', '4', '5'])
+        self.assertIn('floor must be a whole number', report[1])
+        self.assertIn('unknown status', report[2])
+        self.assertIn('has_elevator must be yes or no', report[2])
+        self.assertIn('last_inspection_date must be a YYYY-MM-DD date', report[2])
+        self.assertIn('unit_number is required', report[3])
+
+    def test_upsert_on_unit_number(self):
+        """Test that re-importing updates existing units and keeps columns missing from the file"""
+        HousingUnit.objects.create(unit_number='A-1', address='Old', floor=1, total_area=Decimal('30.00'),
+                                   rooms_count=1, status='OCCUPIED')
+        path = self.write_file('unit_number,address,floor,total_area,rooms_count\nA-1,New,2,45,2\nA-1,Newer,2,45,2\n')
+        out, _ = self.run_import(path)
+        self.assertIn('(0 new, 1 updated, 0 rejected)', out)
+        unit = HousingUnit.objects.get(unit_number='A-1')
+        self.assertEqual((unit.address, unit.rooms_count, unit.status), ('Newer', 2, 'OCCUPIED'))
+
+    def test_allocated_status_kept(self):
+        """Test that blank statuses keep existing ones and reserved or occupied units can't be made available"""
+        for number, status in (('A-1', 'RESERVED'), ('A-2', 'MAINTENANCE'), ('A-3', 'OCCUPIED')):
+            HousingUnit.objects.create(unit_number=number, address='Old', floor=1, total_area=Decimal('30.00'),
+                                       rooms_count=1, status=status)
+        path = self.write_file(
+            HEADER
+            + 'A-1,New,1,30,1,,,,\n'
+            + 'A-2,New,1,30,1,,,,\n'
+            + 'A-3,New,1,30,1,available,,,\n'
+            + 'A-4,New,1,30,1,,,,\n'
+        )
+        out, err = self.run_import(path)
+        self.assertIn('(1 new, 2 updated, 1 rejected)', out)
+        self.assertIn('Row 4 (A-3): OCCUPIED units only change status through their allocation', err)
+        self.assertEqual(dict(HousingUnit.objects.values_list('unit_number', 'status')),
+                         {'A-1': 'RESERVED', 'A-2': 'MAINTENANCE', 'A-3': 'OCCUPIED', 'A-4': 'AVAILABLE'})
+        self.assertEqual(HousingUnit.objects.get(unit_number='A-3').address, 'Old')
+
+    def test_error_report_streamed(self):
+        """Test that only the first errors are kept in memory while the report gets all of them"""
+        report = StringIO()
+        content = HEADER + ''.join(f'A-{i},,1,30,1,,,,\n' for i in range(30))
+        with open(self.write_file(content), 'rb') as f:
+            result = import_housing_units(f, 'units.csv', chunk_size=7, report=report)
+        self.assertEqual(result.error_count, 30)
+        self.assertEqual(len(result.errors), 30)
+        with open(self.write_file(content), 'rb') as f, mock.patch.object(importing, 'MAX_KEPT_ERRORS', 5):
+            capped = import_housing_units(f, 'units.csv', chunk_size=7)
+        self.assertEqual((capped.error_count, len(capped.errors)), (30, 5))
+        self.assertEqual(len(report.getvalue().splitlines()), 31)
+
+    def test_dry_run(self):
+        """Test that a dry run validates without writing"""
+        path = self.write_file(HEADER + 'A-1,1 Abay Ave,3,54,2,,,,\n')
+        out, _ = self.run_import(path, dry_run=True)
+        self.assertIn('Would import 1 of 1 rows', out)
+        self.assertFalse(HousingUnit.objects.exists())
+
+    def test_wrong_layout(self):
+        """Test that a file without the unit columns, like house_data.xls, is refused"""
+        with self.assertRaises(CommandError):
+            self.run_import('house_data.xls')
+
+    def test_admin_upload(self):
+        """Test importing through the admin"""
+        admin = User.objects.create_superuser(
+            email='admin@example.com', password='testpass123', first_name='Admin', last_name='User',
+            phone_number='+1234567890', iin='999999999999'
+        )
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile('units.csv', (HEADER + 'A-1,1 Abay Ave,3,54,2,,,,\nA-2,,1,30,1,,,,\n').encode())
+        response = self.client.post(reverse('admin:housing_units_housingunit_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(HousingUnit.objects.values_list('unit_number', flat=True)), ['A-1'])
+        self.assertEqual(response.context['errors'], [(3, 'A-2', 'address is required')])
@@ -0,0 +1,107 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from decimal import Decimal
+from housing_units.inventory import get_inventory
+from housing_units.models import HousingUnit
+from housing_units.offers import offer_unit
+from applications.models import Application
+from users.models import User
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class HousingInventoryTests(TestCase):
+    def setUp(self):
+        """Create units with a spread of rooms, floors, areas and amenities"""
+        cache.clear()
+        for i in range(12):
+            HousingUnit.objects.create(
+                unit_number=f'U-{i:02d}',
+                address='1 Housing Ave',
+                floor=1 + i % 6,
+                total_area=Decimal(30 + 10 * (i % 4)),
+                rooms_count=1 + i % 4,
+                has_elevator=i % 2 == 0,
+                has_heating=i % 3 != 0,
+                status='OCCUPIED' if i >= 10 else 'AVAILABLE'
+            )
+
+    def test_filters_match_database(self):
+        """Test that inventory filters return the same units as the equivalent ORM query"""
+        inventory = get_inventory()
+        result = inventory.query({
+            'status': ['AVAILABLE'], 'rooms_count': [2, 3], 'floor_min': 2, 'area_max': 50, 'has_elevator': False,
+        })
+        expected = HousingUnit.objects.filter(
+            status='AVAILABLE', rooms_count__in=[2, 3], floor__gte=2, total_area__lte=50, has_elevator=False,
+        )
+        self.assertEqual({unit.id for unit in inventory.rows(result['indices'])}, set(expected.values_list('id', flat=True)))
+
+    def test_facet_counts_ignore_own_filter(self):
+        """Test that each facet is counted over every filter except its own"""
+        facets = get_inventory().query({'status': ['AVAILABLE'], 'rooms_count': [1]})['facets']
+        available = HousingUnit.objects.filter(status='AVAILABLE')
+        self.assertEqual(facets['rooms_count'], {
+            rooms: available.filter(rooms_count=rooms).count() for rooms in (1, 2, 3, 4)
+        })
+        self.assertEqual(facets['status'], {'AVAILABLE': 3, 'OCCUPIED': 0})
+        self.assertEqual(sum(facets['has_heating'].values()), 3)
+
+    def test_rows_of_limited_query(self):
+        """Test that a limited query returns the first matching indices and rows match the database"""
+        inventory = get_inventory()
+        result = inventory.query({'status': ['OCCUPIED']}, with_facets=False, limit=1)
+        self.assertEqual(result['count'], 2)
+        [row] = inventory.rows(result['indices'])
+        unit = HousingUnit.objects.filter(status='OCCUPIED').order_by('rooms_count', 'total_area', 'id').first()
+        self.assertEqual(row, tuple(HousingUnit.objects.filter(id=unit.id).values_list(*row._fields).get()))
+
+    def test_served_from_memory(self):
+        """Test that queries after the first load do not touch the database"""
+        get_inventory()
+        with self.assertNumQueries(0):
+            get_inventory().query({'has_heating': True})
+
+    def test_invalidated_on_save(self):
+        """Test that saving a unit reloads the inventory after commit"""
+        inventory = get_inventory()
+        unit = HousingUnit.objects.get(unit_number='U-00')
+        unit.rooms_count = 4
+        with self.captureOnCommitCallbacks(execute=True):
+            unit.save()
+        self.assertIsNot(get_inventory(), inventory)
+        self.assertEqual(get_inventory().query({'rooms_count': [4], 'status': ['AVAILABLE']})['count'], 3)
+
+    def test_invalidated_by_offer(self):
+        """Test that an offer, which updates the unit without save(), invalidates the inventory"""
+        user = User.objects.create_user(
+            email='applicant@example.com', password='testpass123', first_name='John', last_name='Doe',
+            phone_number='+1234567890', iin='123456789012'
+        )
+        application = Application.objects.create(
+            applicant=user, current_address='123 Main St', current_residence_condition='POOR',
+            monthly_income=Decimal('50000.00'), status='IN_QUEUE'
+        )
+        get_inventory()
+        unit = HousingUnit.objects.get(unit_number='U-01')
+        with self.captureOnCommitCallbacks(execute=True):
+            offer_unit(application.id, unit.id)
+        inventory = get_inventory()
+        available = inventory.rows(inventory.query({'status': ['AVAILABLE']})['indices'])
+        self.assertNotIn(unit.id, [u.id for u in available])
+
+    def test_list_page_filters(self):
+        """Test the housing unit list with facet filters"""
+        response = self.client.get(reverse('housing_units:housing-units-list'), {'status': 'AVAILABLE', 'has_elevator': 'true'})
+        self.assertEqual(response.context['housing_units_count'], 5)
+        self.assertEqual(response.context['facets']['has_elevator'], {True: 5, False: 5})
+
+    def test_api(self):
+        """Test the inventory JSON endpoint"""
+        response = self.client.get(reverse('housing_units:api_inventory'), {'rooms_count': [1, 2], 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 6)
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual([unit['rooms_count'] for unit in data['results']], [1, 1])
+        self.assertEqual(data['facets']['rooms_count'], {'1': 3, '2': 3, '3': 2, '4': 2})
@@ -0,0 +1,141 @@
+import itertools
+import os
+import tempfile
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from decimal import Decimal
+from io import StringIO
+from applications.models import Application
+from housing_units.matching import (
+    RANK_WEIGHT, AllocationConflict, commit_allocations, fit_costs, match_units, propose_allocations,
+)
+from housing_units.models import HousingAllocation, HousingUnit
+from notifications.models import Notification
+from users.models import User
+
+
+class MatchUnitsTests(TestCase):
+    def brute_force(self, rooms, areas, ranks, sizes):
+        """(-households housed, total cost) of the best assignment, by enumeration"""
+        fit = fit_costs(sizes, rooms, areas)
+        best = None
+        for assignment in itertools.product(range(-1, len(ranks)), repeat=len(rooms)):
+            used = [c for c in assignment if c >= 0]
+            if len(set(used)) != len(used):
+                continue
+            if not all(np.isfinite(fit[u, c]) for u, c in enumerate(assignment) if c >= 0):
+                continue
+            cost = sum(fit[u, c] + RANK_WEIGHT * (ranks[c] - 1) for u, c in enumerate(assignment) if c >= 0)
+            key = (-len(used), round(cost, 9))
+            if best is None or key < best:
+                best = key
+        return best
+
+    def test_matches_brute_force(self):
+        """Test that the assignment is optimal on small random instances"""
+        rng = np.random.default_rng(42)
+        for _ in range(150):
+            n_units = int(rng.integers(1, 5))
+            n_candidates = int(rng.integers(1, 6))
+            rooms = rng.integers(1, 4, n_units)
+            areas = np.round(rng.uniform(15, 70, n_units), 1)
+            ranks = rng.permutation(np.arange(1, n_candidates + 1))
+            sizes = rng.integers(1, 5, n_candidates)
+            units, candidates, costs = match_units(rooms, areas, ranks, sizes)
+            self.assertEqual(len(set(units.tolist())), len(units))
+            self.assertEqual(len(set(candidates.tolist())), len(candidates))
+            self.assertEqual((-len(units), round(costs.sum(), 9)), self.brute_force(rooms, areas, ranks, sizes))
+
+    def test_only_fitting_pairs(self):
+        """Test that every chosen pair fits and the best ranked of each size are served"""
+        rng = np.random.default_rng(7)
+        rooms = rng.integers(1, 5, 300)
+        areas = np.round(rooms * rng.uniform(14, 25, 300), 2)
+        sizes = rng.integers(1, 8, 3000)
+        ranks = np.arange(1, 3001)
+        units, candidates, _ = match_units(rooms, areas, ranks, sizes)
+        self.assertTrue(np.isfinite(fit_costs(sizes, rooms, areas)[units, candidates]).all())
+        for size in np.unique(sizes[candidates]):
+            served = np.sort(ranks[candidates][sizes[candidates] == size])
+            self.assertEqual(served.tolist(), np.sort(ranks[sizes == size])[:len(served)].tolist())
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class AllocationRoundTests(TestCase):
+    def setUp(self):
+        """Queue four households of different sizes and add three units"""
+        self.applications = []
+        for i, (score, adults, children) in enumerate([(90, 2, 2), (80, 1, 0), (70, 2, 1), (60, 1, 0)]):
+            user = User.objects.create_user(
+                email=f'applicant{i}@example.com',
+                password='testpass123',
+                first_name='Applicant',
+                last_name=str(i),
+                phone_number='+1234567890',
+                iin=f'{i:012d}'
+            )
+            self.applications.append(Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=score,
+                adults_count=adults,
+                children_count=children,
+                status='IN_QUEUE'
+            ))
+        self.units = [
+            HousingUnit.objects.create(unit_number='S-1', address='1 Housing Ave', floor=1,
+                                       total_area=Decimal('30.00'), rooms_count=1),
+            HousingUnit.objects.create(unit_number='L-1', address='1 Housing Ave', floor=2,
+                                       total_area=Decimal('80.00'), rooms_count=2),
+            HousingUnit.objects.create(unit_number='M-1', address='1 Housing Ave', floor=3,
+                                       total_area=Decimal('50.00'), rooms_count=2),
+        ]
+
+    def test_proposal(self):
+        """Test that units go to the best ranked households they fit"""
+        proposals = propose_allocations()
+        pairs = {(p.application_number, p.unit_number) for p in proposals}
+        numbers = [a.application_number for a in self.applications]
+        # The family of four needs 60 m²; the family of three takes the 50 m² unit
+        self.assertEqual(pairs, {(numbers[0], 'L-1'), (numbers[1], 'S-1'), (numbers[2], 'M-1')})
+        self.assertEqual([p.queue_rank for p in proposals], [1, 2, 3])
+
+    def test_top_k(self):
+        """Test that only the first K applications are considered"""
+        self.assertEqual(len(propose_allocations(top_k=1)), 1)
+
+    def test_commit(self):
+        """Test that committing creates offers and takes the applications out of the queue"""
+        proposals = propose_allocations()
+        self.assertEqual(commit_allocations(proposals), 3)
+        self.assertEqual(HousingAllocation.objects.filter(status='OFFERED').count(), 3)
+        self.assertEqual(HousingUnit.objects.filter(status='RESERVED').count(), 3)
+        self.assertEqual(Notification.objects.filter(notification_type='STATUS_CHANGE').count(), 3)
+        remaining = Application.objects.get(pk=self.applications[3].pk)
+        self.assertEqual(remaining.queue_rank, 1)
+
+    def test_stale_proposal(self):
+        """Test that a proposal is rejected as a whole once a unit is taken"""
+        proposals = propose_allocations()
+        HousingUnit.objects.filter(unit_number='S-1').update(status='OCCUPIED')
+        with self.assertRaises(AllocationConflict):
+            commit_allocations(proposals)
+        self.assertFalse(HousingAllocation.objects.exists())
+        self.assertEqual(Application.objects.filter(status='IN_QUEUE').count(), 4)
+
+    def test_command_review_then_commit(self):
+        """Test writing a proposal file and committing it afterwards"""
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+        call_command('allocate_housing', output=path, stdout=StringIO())
+        self.assertFalse(HousingAllocation.objects.exists())
+
+        call_command('allocate_housing', from_proposal=path, commit=True, stdout=StringIO())
+        self.assertEqual(HousingAllocation.objects.count(), 3)
+        with self.assertRaises(CommandError):
+            call_command('allocate_housing', from_proposal=path, commit=True, stdout=StringIO())
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from decimal import Decimal
+from io import StringIO
+from applications.models import Application, ApplicationHistory
+from housing_units.matching import commit_allocations, propose_allocations
+from housing_units.models import HousingAllocation, HousingUnit
+from housing_units.offers import expire_offers
+from notifications.models import Notification
+from users.models import User
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot', HOUSING_OFFER_RESPONSE_DAYS=7)
+class OfferExpiryTests(TestCase):
+    def setUp(self):
+        """Queue three single applicants and offer one unit to the first"""
+        self.applications = []
+        for i, score in enumerate([90, 80, 70]):
+            user = User.objects.create_user(
+                email=f'applicant{i}@example.com',
+                password='testpass123',
+                first_name='Applicant',
+                last_name=str(i),
+                phone_number='+1234567890',
+                iin=f'{i:012d}'
+            )
+            self.applications.append(Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=score,
+                status='IN_QUEUE'
+            ))
+        self.unit = HousingUnit.objects.create(
+            unit_number='A-1', address='1 Housing Ave', floor=1, total_area=Decimal('30.00'), rooms_count=1
+        )
+        commit_allocations(propose_allocations())
+        self.today = timezone.localdate()
+
+    def allocation_of(self, application):
+        return HousingAllocation.objects.get(application=application, housing_unit=self.unit)
+
+    def test_deadline_set_on_offer(self):
+        """Test that new offers get a response deadline"""
+        self.assertEqual(self.allocation_of(self.applications[0]).response_deadline, self.today + timedelta(days=7))
+
+    def test_offers_within_deadline_kept(self):
+        """Test that offers are left alone until their deadline has passed"""
+        self.assertEqual(expire_offers(today=self.today + timedelta(days=7)), (0, 0))
+        self.assertEqual(self.allocation_of(self.applications[0]).status, 'OFFERED')
+
+    def test_expired_offer_cascades(self):
+        """Test that an expired offer frees the unit and offers it to the next applicant"""
+        self.assertEqual(expire_offers(today=self.today + timedelta(days=8)), (1, 1))
+
+        first, second = (Application.objects.get(pk=a.pk) for a in self.applications[:2])
+        self.assertEqual(self.allocation_of(first).status, 'EXPIRED')
+        self.assertEqual(first.status, 'IN_QUEUE')
+        self.assertEqual(first.queue_rank, 1)
+        self.assertTrue(ApplicationHistory.objects.filter(application=first, new_status='IN_QUEUE').exists())
+        self.assertTrue(Notification.objects.filter(application=first, title='Housing Offer Expired').exists())
+
+        self.assertEqual(self.allocation_of(second).status, 'OFFERED')
+        self.assertEqual(second.status, 'HOUSING_OFFERED')
+        self.assertEqual(HousingUnit.objects.get(pk=self.unit.pk).status, 'RESERVED')
+
+    def test_unit_freed_when_nobody_left(self):
+        """Test that the unit becomes available when every candidate let it expire"""
+        HousingAllocation.objects.update(response_deadline=self.today - timedelta(days=1))
+        Application.objects.filter(pk__in=[a.pk for a in self.applications[1:]]).update(status='REJECTED_BY_MANAGER')
+        self.assertEqual(expire_offers(), (1, 0))
+        self.assertEqual(HousingUnit.objects.get(pk=self.unit.pk).status, 'AVAILABLE')
+
+    def test_command_batches(self):
+        """Test that the command works through several batches"""
+        HousingAllocation.objects.update(response_deadline=self.today - timedelta(days=1))
+        out = StringIO()
+        call_command('expire_housing_offers', batch_size=1, stdout=out)
+        self.assertIn('Expired 1 offers; made 1 new offers.', out.getvalue())
+        self.assertEqual(HousingAllocation.objects.filter(status='OFFERED').count(), 1)
@@ -0,0 +1,167 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from decimal import Decimal
+from applications.models import Application
+from housing_units.models import HousingAllocation, HousingUnit
+from housing_units.offers import OfferUnavailable, offer_unit
+from notifications.models import Notification
+from users.models import User
+
+
+def create_queue(count):
+    applications = []
+    for i in range(count):
+        user = User.objects.create_user(
+            email=f'applicant{i}@example.com',
+            password=None,
+            first_name='Applicant',
+            last_name=str(i),
+            phone_number='+1234567890',
+            iin=f'{i:012d}'
+        )
+        applications.append(Application.objects.create(
+            applicant=user,
+            current_address='123 Main St',
+            current_residence_condition='POOR',
+            monthly_income=Decimal('50000.00'),
+            priority_score=100 - i,
+            status='IN_QUEUE'
+        ))
+    return applications
+
+
+def create_unit(number='A-1'):
+    return HousingUnit.objects.create(
+        unit_number=number, address='1 Housing Ave', floor=1, total_area=Decimal('30.00'), rooms_count=1
+    )
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class OfferHousingTests(TestCase):
+    def setUp(self):
+        self.applications = create_queue(3)
+        self.unit = create_unit()
+        self.manager = User.objects.create_user(
+            email='manager@example.com',
+            password='testpass123',
+            first_name='Manager',
+            last_name='User',
+            phone_number='+1234567890',
+            iin='999999999999'
+        )
+        self.client.force_login(self.manager)
+
+    def offer(self, application, key=None):
+        return self.client.post(
+            reverse('housing_units:offer-housing', args=[application.id]),
+            {'housing_unit': self.unit.id, 'idempotency_key': key or uuid.uuid4().hex},
+        )
+
+    def test_offer(self):
+        """Test that an offer reserves the unit and takes the application out of the queue"""
+        self.offer(self.applications[0])
+        application = Application.objects.get(pk=self.applications[0].pk)
+        self.assertEqual(application.status, 'HOUSING_OFFERED')
+        self.assertIsNone(application.queue_rank)
+        self.assertEqual(Application.objects.get(pk=self.applications[1].pk).queue_rank, 1)
+        self.assertEqual(HousingUnit.objects.get(pk=self.unit.pk).status, 'RESERVED')
+        self.assertEqual(HousingAllocation.objects.get().changed_by, self.manager)
+        self.assertEqual(Notification.objects.filter(application=application).count(), 1)
+
+    def test_retry_is_idempotent(self):
+        """Test that resubmitting the same form creates nothing new"""
+        key = uuid.uuid4().hex
+        self.offer(self.applications[0], key)
+        self.offer(self.applications[0], key)
+        self.assertEqual(HousingAllocation.objects.count(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_reserved_unit_rejected(self):
+        """Test that a unit already offered cannot be offered again"""
+        self.offer(self.applications[0])
+        response = self.offer(self.applications[1])
+        self.assertRedirects(response, reverse('applications:view-application', args=[self.applications[1].id]),
+                             fetch_redirect_response=False)
+        self.assertEqual(HousingAllocation.objects.count(), 1)
+        self.assertEqual(Application.objects.get(pk=self.applications[1].pk).status, 'IN_QUEUE')
+
+    def test_one_offer_per_application(self):
+        """Test that an application holding an offer cannot get a second unit"""
+        offer_unit(self.applications[0].id, self.unit.id)
+        other = create_unit('A-2')
+        with self.assertRaises(OfferUnavailable):
+            offer_unit(self.applications[0].id, other.id)
+        self.assertEqual(HousingUnit.objects.get(pk=other.pk).status, 'AVAILABLE')
+
+    def test_only_queued_applications(self):
+        """Test that submitted or rejected applications cannot be offered a unit"""
+        for status in ('SUBMITTED', 'REJECTED_BY_MANAGER'):
+            Application.objects.filter(pk=self.applications[1].pk).update(status=status, queue_rank=None)
+            with self.assertRaisesMessage(OfferUnavailable, 'Only applications in the queue'):
+                offer_unit(self.applications[1].id, self.unit.id)
+            self.assertEqual(Application.objects.get(pk=self.applications[1].pk).status, status)
+        self.assertEqual(HousingUnit.objects.get(pk=self.unit.pk).status, 'AVAILABLE')
+
+    def test_key_reused_for_other_offer(self):
+        """Test that a key cannot be replayed against a different application"""
+        offer_unit(self.applications[0].id, self.unit.id, idempotency_key='key')
+        with self.assertRaises(OfferUnavailable):
+            offer_unit(self.applications[1].id, self.unit.id, idempotency_key='key')
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class ConcurrentOfferTests(TransactionTestCase):
+    workers = 50
+
+    def run_concurrently(self, calls):
+        """Run the calls from separate threads and connections, released together"""
+        barrier = threading.Barrier(len(calls))
+
+        def run(call):
+            barrier.wait()
+            try:
+                # SQLite reports lock contention instead of waiting; retry like a client would
+                for _ in range(200):
+                    try:
+                        return call()
+                    except OperationalError:
+                        time.sleep(0.005)
+                raise AssertionError('database stayed locked')
+            except OfferUnavailable:
+                return None
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            return list(executor.map(run, calls))
+
+    def test_no_double_allocation(self):
+        """Stress test: 50 managers offer the same unit at once to different applicants"""
+        applications = create_queue(self.workers)
+        unit = create_unit()
+        results = self.run_concurrently([
+            lambda application=application: offer_unit(application.id, unit.id) for application in applications
+        ])
+
+        self.assertEqual(sum(result is not None for result in results), 1)
+        self.assertEqual(HousingAllocation.objects.filter(housing_unit=unit).count(), 1)
+        self.assertEqual(Application.objects.filter(status='HOUSING_OFFERED').count(), 1)
+        self.assertEqual(sorted(Application.objects.exclude(queue_rank=None).values_list('queue_rank', flat=True)),
+                         list(range(1, self.workers)))
+
+    def test_retries_with_one_key(self):
+        """Stress test: 50 retries of one offer request create a single allocation"""
+        application = create_queue(1)[0]
+        unit = create_unit()
+        results = self.run_concurrently([
+            lambda: offer_unit(application.id, unit.id, idempotency_key='retry') for _ in range(self.workers)
+        ])
+        self.assertEqual(sum(created for _, created in results), 1)
+        self.assertEqual(len({allocation.id for allocation, _ in results}), 1)
+        self.assertEqual(HousingAllocation.objects.count(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from decimal import Decimal
+from applications.models import Application
+from applications.pagination import KeysetPaginator
+from applications.ranking import RANK_ORDERING
+from users.models import User
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        """Create 25 queued applications with plenty of score ties"""
+        cache.clear()
+        user = User.objects.create_user(
+            email='applicant@example.com',
+            password='testpass123',
+            first_name='John',
+            last_name='Doe',
+            phone_number='+1234567890',
+            iin='123456789012'
+        )
+        for i in range(25):
+            Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=(i % 4) * 10,
+                status='IN_QUEUE'
+            )
+        self.expected = list(Application.objects.order_by(*RANK_ORDERING).values_list('id', flat=True))
+
+    def test_walk_forward_and_back(self):
+        """Test that following next then previous cursors visits every row exactly once, in order"""
+        paginator = KeysetPaginator(Application.objects.all(), RANK_ORDERING, 10)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([a.id for page in pages for a in page], self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        back = [pages[-1]]
+        while back[-1].has_previous():
+            back.append(paginator.page(back[-1].previous_cursor))
+        self.assertEqual([a.id for page in reversed(back) for a in page], self.expected)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Test that a garbage cursor renders the first page"""
+        paginator = KeysetPaginator(Application.objects.all(), RANK_ORDERING, 10)
+        self.assertEqual([a.id for a in paginator.page('not-a-cursor')], self.expected[:10])
+
+    def test_queue_members_seek_without_offset(self):
+        """Test that queue pages use a seek instead of COUNT/OFFSET"""
+        response = self.client.get(reverse('applications:queue_members'))
+        next_cursor = response.context['queue_members'].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('applications:queue_members'), {'cursor': next_cursor})
+        self.assertEqual([a.queue_number for a in response.context['queue_members']], list(range(11, 21)))
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'])
+            self.assertNotIn('COUNT(', query['sql'])
+
+    def test_queue_number_range(self):
+        """Test that the queue number range filter seeks on the stored rank"""
+        response = self.client.get(reverse('applications:queue_members'), {'queue_number_from': 5, 'queue_number_to': 7})
+        self.assertEqual([a.queue_number for a in response.context['queue_members']], [5, 6, 7])
+
+    def test_dashboard_pages(self):
+        """Test that the admin dashboard paginates by cursor"""
+        response = self.client.get(reverse('dashboard:dashboard'))
+        page = response.context['applications']
+        self.assertEqual([a.id for a in page], self.expected[:10])
+        response = self.client.get(reverse('dashboard:dashboard'), {'cursor': page.next_cursor})
+        self.assertEqual([a.id for a in response.context['applications']], self.expected[10:20])
+
+    def test_dashboard_total(self):
+        """Test that the dashboard shows the total count, counted once across pages"""
+        response = self.client.get(reverse('dashboard:dashboard'))
+        self.assertEqual(response.context['total_count'], len(self.expected))
+        self.assertContains(response, f'Total records: {len(self.expected)}')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('dashboard:dashboard'), {'cursor': response.context['applications'].next_cursor})
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
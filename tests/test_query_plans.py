@@ -0,0 +1,149 @@
+import datetime
+import re
+import unittest
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from decimal import Decimal
+from applications.models import Application
+from applications.ranking import RANK_ORDERING, RANKED_STATUS
+from housing_units.inventory import get_inventory
+from housing_units.models import HousingAllocation, HousingUnit
+from notifications.models import Notification
+from users.models import User
+
+# "SCAN <table>" without an index is a full table scan; "SCAN <table> USING INDEX" walks an index
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)\s*$')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'query plans are checked against SQLite')
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Seed applicants, applications in every status, notifications and housing units"""
+        statuses = [status for status, _ in Application.STATUS_CHOICES]
+        cls.users = []
+        for i in range(20):
+            user = User.objects.create_user(
+                email=f'applicant{i}@example.com',
+                password='testpass123',
+                first_name='Applicant',
+                last_name=str(i),
+                phone_number='+1234567890',
+                iin=f'{i:012d}'
+            )
+            cls.users.append(user)
+            for j in range(3):
+                application = Application.objects.create(
+                    applicant=user,
+                    current_address='123 Main St',
+                    current_residence_condition='POOR',
+                    monthly_income=Decimal('50000.00'),
+                    priority_score=(i * 7 + j) % 50,
+                    status=statuses[(i + j) % len(statuses)]
+                )
+                Notification.objects.create(
+                    application=application,
+                    notification_type='QUEUE_UPDATE',
+                    title='Queue Position Update',
+                    message='Your queue position has changed.',
+                )
+        for i in range(30):
+            HousingUnit.objects.create(
+                unit_number=f'U-{i:03d}',
+                address='1 Housing Ave',
+                floor=1 + i % 9,
+                total_area=Decimal('54.50'),
+                rooms_count=1 + i % 4,
+                status='AVAILABLE' if i % 3 else 'OCCUPIED'
+            )
+        cls.application = Application.objects.filter(applicant=cls.users[0]).first()
+
+    def setUp(self):
+        # The inventory is loaded once per housing change, not per request
+        get_inventory()
+
+    def query_plan(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertNoFullScans(self, queries):
+        """EXPLAIN every captured SELECT and fail on any full table scan"""
+        selects = [query['sql'] for query in queries if query['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            plan = self.query_plan(sql)
+            for step in plan:
+                self.assertIsNone(FULL_SCAN.search(step), f'Full table scan:\n{sql}\n' + '\n'.join(plan))
+
+    def assertViewUsesIndexes(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertNoFullScans(queries.captured_queries)
+
+    def test_check_queue(self):
+        """Test the public queue check"""
+        self.assertViewUsesIndexes('post', reverse('applications:check-queue'), {'iin': self.users[3].iin})
+
+    def test_queue_api(self):
+        """Test the JSON queue position API"""
+        self.assertViewUsesIndexes('get', reverse('applications:api_check_queue'), {'iin': self.users[3].iin})
+
+    def test_queue_members(self):
+        """Test the public queue list, plain and filtered"""
+        url = reverse('applications:queue_members')
+        self.assertViewUsesIndexes('get', url)
+        self.assertViewUsesIndexes('get', url, {'queue_number_from': 5, 'queue_number_to': 15})
+        self.assertViewUsesIndexes('get', url, {'iin': '0001'})
+
+    def test_my_applications(self):
+        """Test the applicant's own application list and detail page"""
+        self.client.force_login(self.users[0])
+        self.assertViewUsesIndexes('get', reverse('applications:my-applications-list'))
+        self.assertViewUsesIndexes('get', reverse('applications:view-application', args=[self.application.id]))
+
+    def test_dashboard(self):
+        """Test the admin dashboard with each filter"""
+        url = reverse('dashboard:dashboard')
+        self.assertViewUsesIndexes('get', url)
+        for status, _ in Application.STATUS_CHOICES:
+            self.assertViewUsesIndexes('get', url, {'status': status})
+        self.assertViewUsesIndexes('get', url, {'applicant_iin': '0001', 'status': 'IN_QUEUE'})
+        self.assertViewUsesIndexes('get', url, {'applicant_name': 'Applicant 1'})
+
+    def test_notifications(self):
+        """Test the applicant's notification list"""
+        self.client.force_login(self.users[0])
+        self.assertViewUsesIndexes('get', reverse('notification_list'))
+
+    def test_housing_units(self):
+        """Test that the housing unit list is answered from the inventory"""
+        with self.assertNumQueries(0):
+            self.client.get(reverse('housing_units:housing-units-list'), {'page': 2})
+
+    def test_status_ordered_by_rank_key(self):
+        """Test that status filters ordered by the queue key read the index in order"""
+        queryset = Application.objects.filter(status=RANKED_STATUS).order_by(*RANK_ORDERING)
+        plan = self.query_plan(*queryset.query.sql_with_params())
+        self.assertTrue(any('application_status_rank_idx' in step for step in plan), plan)
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+
+    def test_unread_queue_updates(self):
+        """Test that the unread queue update lookup uses the partial index"""
+        queryset = Notification.objects.filter(
+            notification_type='QUEUE_UPDATE', status='UNREAD'
+        ).values_list('application_id', flat=True).distinct()
+        plan = self.query_plan(*queryset.query.sql_with_params())
+        self.assertTrue(any('notification_unread_queue_idx' in step for step in plan), plan)
+
+    def test_due_offers(self):
+        """Test that the offer expiry sweep finds due offers through the partial index"""
+        queryset = HousingAllocation.objects.filter(
+            status='OFFERED', response_deadline__lt=datetime.date(2030, 1, 1), id__lte=1000
+        ).order_by('response_deadline', 'id')
+        plan = self.query_plan(*queryset.query.sql_with_params())
+        self.assertTrue(any('allocation_offer_due_idx' in step for step in plan), plan)
@@ -0,0 +1,108 @@
+import datetime
+from io import StringIO
+import os
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from decimal import Decimal
+from app_statistics.queue_analytics import compute_queue_analytics, queue_analytics, write_queue_analytics
+from applications.models import Application
+from users.models import User
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class QueueAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        override = override_settings(QUEUE_ANALYTICS_PATH=os.path.join(self.tmpdir, 'queue_analytics.json'))
+        override.enable()
+        self.addCleanup(override.disable)
+        user = User.objects.create_user(
+            email='applicant@example.com',
+            password=None,
+            first_name='Applicant',
+            last_name='One',
+            phone_number='+1234567890',
+            iin='000000000001'
+        )
+        rows = [
+            # category, status, score, income, adults, children, elderly
+            ('ORPHAN', 'IN_QUEUE', 10, '20000.00', 1, 0, 0),
+            ('ORPHAN', 'IN_QUEUE', 55, '60000.00', 2, 2, 0),
+            ('MILITARY', 'SUBMITTED', 30, '100000.00', 2, 3, 2),
+            (None, 'HOUSING_OFFERED', 90, '160000.00', 1, 1, 0),
+        ]
+        for category, status, score, income, adults, children, elderly in rows:
+            Application.objects.create(
+                applicant=user, category=category, status=status, priority_score=score,
+                monthly_income=Decimal(income), adults_count=adults, children_count=children, elderly_count=elderly,
+                current_address='123 Main St', current_residence_condition='POOR',
+            )
+        old = timezone.now() - datetime.timedelta(days=3 * 365)
+        Application.objects.filter(priority_score=90).update(submission_date=old)
+
+    def test_counts(self):
+        """Test every chart's buckets against the applications"""
+        with self.assertNumQueries(4):
+            data = compute_queue_analytics()
+        series = data['series']
+        for name in ('category', 'status', 'priority_score', 'household', 'income'):
+            self.assertEqual(sum(series[name]['values']), 4, name)
+
+        category = dict(zip(series['category']['labels'], series['category']['values']))
+        self.assertEqual(category['Orphan or child without parental care'], 2)
+        self.assertEqual(category['Not specified'], 1)
+        self.assertEqual(dict(zip(series['status']['labels'], series['status']['values']))['In Queue'], 2)
+        self.assertEqual(series['household']['values'], [1, 1, 0, 1, 0, 1])
+        self.assertEqual(series['income']['values'], [1, 0, 1, 0, 1, 1])
+
+        edges = series['priority_score']['edges']
+        self.assertEqual((edges[0], series['priority_score']['values'][0]), (10, 1))
+        self.assertGreater(edges[-1], 90)
+        self.assertEqual(series['priority_score']['values'][(90 - 10) // (edges[1] - edges[0])], 1)
+
+        # The three recent applications fall in the current month; the old one is outside the window
+        self.assertEqual(series['submissions']['y'][-1], 3)
+        self.assertEqual(sum(series['submissions']['y']), 3)
+        self.assertEqual(series['submissions']['x'][-1], timezone.now().strftime('%b %Y'))
+        self.assertEqual(data['stats'], {'total': 4, 'in_queue': 2, 'avg_score': 46.2, 'avg_household': 3.5})
+
+    def test_stored_page(self):
+        """Test that the page only reads the analytics stored by the management command"""
+        response = self.client.get(reverse('app_statistics:queue_analytics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'have not been computed yet')
+        self.assertNotContains(response, 'id="series-priority_score"')
+
+        call_command('compute_queue_analytics', stdout=StringIO())
+        response = self.client.get(reverse('app_statistics:queue_analytics'))
+        self.assertContains(response, 'id="series-priority_score"')
+        self.assertEqual(response.context['stats']['total'], 4)
+
+        # Stale results are served as they are until the next run
+        Application.objects.filter(status='SUBMITTED').delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(queue_analytics()['stats']['total'], 4)
+        call_command('compute_queue_analytics', stdout=StringIO())
+        self.assertEqual(queue_analytics()['stats']['total'], 3)
+
+    def test_stale_flag(self):
+        """Test that analytics older than the refresh interval are shown with their age and flagged"""
+        call_command('compute_queue_analytics', stdout=StringIO())
+        response = self.client.get(reverse('app_statistics:queue_analytics'))
+        self.assertFalse(response.context['stale'])
+        self.assertNotContains(response, 'out of date')
+
+        data = compute_queue_analytics()
+        data['computed_at'] = (timezone.now() - datetime.timedelta(hours=3)).isoformat()
+        write_queue_analytics(data)
+        response = self.client.get(reverse('app_statistics:queue_analytics'))
+        self.assertTrue(response.context['stale'])
+        self.assertContains(response, 'out of date')
+        self.assertContains(response, '3\xa0hours ago')
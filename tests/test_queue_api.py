@@ -0,0 +1,111 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from decimal import Decimal
+from applications.models import Application
+from users.models import User
+
+
+class QueueCheckAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('applications:api_check_queue')
+        self.applications = []
+        for i, score in enumerate([40, 20]):
+            user = User.objects.create_user(
+                email=f'applicant{i}@example.com',
+                password='testpass123',
+                first_name='Applicant',
+                last_name=str(i),
+                phone_number='+1234567890',
+                iin=f'{i + 1:012d}'
+            )
+            self.applications.append(Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=score,
+                status='IN_QUEUE'
+            ))
+
+    def test_post_returns_position(self):
+        """Test the bot-facing POST lookup"""
+        response = self.client.post(self.url, {'iin': '000000000002'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['queue_position'], 2)
+        self.assertEqual(response.json()['total_queued'], 2)
+        self.assertEqual(response.json()['priority_score'], 20)
+
+    def test_unknown_iin(self):
+        """Test that an IIN without applications returns 404"""
+        response = self.client.get(self.url, {'iin': '999999999999'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_new_application_after_unknown_lookup(self):
+        """Test that a lookup finding nothing is not cached and its ETag is specific to the IIN"""
+        response = self.client.get(self.url, {'iin': '000000000009'})
+        self.assertEqual(response.status_code, 404)
+        etag = response['ETag']
+        self.assertNotEqual(self.client.get(self.url, {'iin': '999999999999'})['ETag'], etag)
+
+        user = User.objects.create_user(email='applicant9@example.com', password=None, first_name='Applicant',
+                                        last_name='9', phone_number='+1234567890', iin='000000000009')
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(applicant=user, current_address='123 Main St',
+                                       current_residence_condition='POOR', monthly_income=Decimal('50000.00'))
+        response = self.client.get(self.url, {'iin': '000000000009'}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'SUBMITTED')
+
+    def test_cached_lookup_skips_database(self):
+        """Test that a repeated lookup is served from cache"""
+        self.client.get(self.url, {'iin': '000000000001'})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'iin': '000000000001'})
+        self.assertEqual(response.json()['queue_position'], 1)
+
+    def test_etag_not_modified(self):
+        """Test that a matching If-None-Match gets 304"""
+        etag = self.client.get(self.url, {'iin': '000000000001'})['ETag']
+        response = self.client.get(self.url, {'iin': '000000000001'}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_score_change_invalidates(self):
+        """Test that re-ranking invalidates cached positions of other applicants"""
+        etag = self.client.get(self.url, {'iin': '000000000001'})['ETag']
+        application = self.applications[1]
+        application.priority_score = 90
+        with self.captureOnCommitCallbacks(execute=True):
+            application.save()
+        response = self.client.get(self.url, {'iin': '000000000001'}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['queue_position'], 2)
+
+    def test_etag_list(self):
+        """Test that If-None-Match is parsed as a list of exact ETags"""
+        etag = self.client.get(self.url, {'iin': '000000000001'})['ETag']
+        response = self.client.get(self.url, {'iin': '000000000001'}, headers={'If-None-Match': f'"other", W/{etag}'})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, {'iin': '000000000001'}, headers={'If-None-Match': f'{etag[:-2]}"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_unrelated_changes_keep_position(self):
+        """Test that a new submission or a move behind an applicant keeps their cached position"""
+        self.client.get(self.url, {'iin': '000000000001'})
+        user = User.objects.create_user(email='applicant9@example.com', password=None, first_name='Applicant',
+                                        last_name='9', phone_number='+1234567890', iin='000000000009')
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(applicant=user, current_address='123 Main St',
+                                       current_residence_condition='POOR', monthly_income=Decimal('50000.00'))
+        application = self.applications[1]
+        application.priority_score = 30
+        with self.captureOnCommitCallbacks(execute=True):
+            application.save()
+
+        # Only the queue total is counted again
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'iin': '000000000001'})
+        self.assertEqual(response.json()['queue_position'], 1)
+        self.assertEqual(self.client.get(self.url, {'iin': '000000000009'}).json()['status'], 'SUBMITTED')
+        self.assertEqual(self.client.get(self.url, {'iin': '000000000002'}).json()['priority_score'], 30)
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from decimal import Decimal
+from applications.models import Application
+from notifications.models import Notification
+from users.models import User
+
+
+class QueueUpdateNotificationTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        override = override_settings(QUEUE_SNAPSHOT_PATH=os.path.join(self.tmpdir, 'queue.snapshot'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user = User.objects.create_user(
+            email='applicant@example.com',
+            password='testpass123',
+            first_name='John',
+            last_name='Doe',
+            phone_number='+1234567890'
+        )
+        self.applications = [
+            Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=100 - i,
+                status='IN_QUEUE'
+            )
+            for i in range(10)
+        ]
+        call_command('build_queue_snapshot', stdout=StringIO())
+
+    def notify(self, **options):
+        call_command('notify_queue_updates', stdout=StringIO(), **options)
+
+    def test_notifies_only_moves_past_threshold(self):
+        """Test that only applicants moving at least the threshold are notified"""
+        # Last application jumps from rank 10 to rank 1, everyone else moves down one place
+        last = self.applications[-1]
+        last.priority_score = 200
+        last.save()
+        call_command('build_queue_snapshot', stdout=StringIO())
+        self.notify(threshold=2)
+        notifications = Notification.objects.filter(notification_type='QUEUE_UPDATE')
+        self.assertEqual([n.application_id for n in notifications], [last.id])
+        self.assertIn('from 10 to 1', notifications[0].message)
+
+    def test_skips_unread_and_processed_snapshots(self):
+        """Test that unread updates suppress new ones and a snapshot is processed once"""
+        first = self.applications[0]
+        first.priority_score = 0
+        first.save()
+        Notification.objects.create(
+            application=self.applications[1],
+            notification_type='QUEUE_UPDATE',
+            title='Queue Position Updated',
+            message='',
+        )
+        call_command('build_queue_snapshot', stdout=StringIO())
+        self.notify(threshold=1)
+        updates = Notification.objects.filter(notification_type='QUEUE_UPDATE')
+        self.assertEqual(updates.count(), 10)
+        self.assertEqual(updates.filter(application=self.applications[1]).count(), 1)
+        self.notify(threshold=1)
+        self.assertEqual(updates.count(), 10)
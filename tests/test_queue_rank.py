@@ -0,0 +1,128 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from decimal import Decimal
+from applications.models import Application
+from applications.ranking import RANK_ORDERING, close_rank_gaps, insert_queue_ranks, rebuild_queue_ranks, total_ranked
+from users.models import User
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class QueueRankTests(TestCase):
+    def setUp(self):
+        """Create a handful of applicants with queued applications"""
+        self.applications = []
+        for i, score in enumerate([30, 50, 30, 10]):
+            user = User.objects.create_user(
+                email=f'applicant{i}@example.com',
+                password='testpass123',
+                first_name='Applicant',
+                last_name=str(i),
+                phone_number='+1234567890',
+                iin=f'{i:012d}'
+            )
+            self.applications.append(Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=score,
+                status='IN_QUEUE'
+            ))
+
+    def assertRanksMatchOrdering(self):
+        expected = list(Application.objects.filter(status='IN_QUEUE').order_by(*RANK_ORDERING).values_list('id', flat=True))
+        actual = list(Application.objects.filter(queue_rank__isnull=False).order_by('queue_rank').values_list('id', flat=True))
+        self.assertEqual(actual, expected)
+        ranks = list(Application.objects.filter(queue_rank__isnull=False).order_by('queue_rank').values_list('queue_rank', flat=True))
+        self.assertEqual(ranks, list(range(1, len(expected) + 1)))
+
+    def test_ranks_assigned_on_create(self):
+        """Test that new queued applications get contiguous ranks in canonical order"""
+        self.assertRanksMatchOrdering()
+        self.assertEqual(total_ranked(), 4)
+
+    def test_ties_broken_by_submission_date(self):
+        """Test that equal scores are ordered by submission date"""
+        first, third = self.applications[0], self.applications[2]
+        first.refresh_from_db()
+        third.refresh_from_db()
+        self.assertLess(first.queue_rank, third.queue_rank)
+
+    def test_score_change_moves_rank(self):
+        """Test that a score change re-ranks the application incrementally"""
+        application = self.applications[3]
+        application.priority_score = 100
+        application.save()
+        application.refresh_from_db()
+        self.assertEqual(application.queue_rank, 1)
+        self.assertRanksMatchOrdering()
+
+    def test_moves_shift_only_the_range(self):
+        """Test that moving up or down shifts the ranks in between with one UPDATE"""
+        top, bottom = self.applications[1], self.applications[3]
+        top.priority_score = 5
+        with CaptureQueriesContext(connection) as queries:
+            top.save()
+        self.assertEqual(sum('"queue_rank" - 1' in query['sql'] for query in queries.captured_queries), 1)
+        self.assertEqual(sum('"queue_rank" + 1' in query['sql'] for query in queries.captured_queries), 0)
+        top.refresh_from_db()
+        self.assertEqual(top.queue_rank, 4)
+        self.assertRanksMatchOrdering()
+
+        bottom.priority_score = 40
+        with CaptureQueriesContext(connection) as queries:
+            bottom.save()
+        self.assertEqual(sum('"queue_rank" + 1' in query['sql'] for query in queries.captured_queries), 1)
+        self.assertEqual(sum('"queue_rank" - 1' in query['sql'] for query in queries.captured_queries), 0)
+        bottom.refresh_from_db()
+        self.assertEqual(bottom.queue_rank, 1)
+        self.assertRanksMatchOrdering()
+
+    def test_batch_leave_and_return(self):
+        """Test that ranks given up and taken back by queryset updates stay contiguous without a rebuild"""
+        for i, score in enumerate([45, 20, 60]):
+            Application.objects.create(
+                applicant=self.applications[i].applicant, current_address='123 Main St',
+                current_residence_condition='POOR', monthly_income=Decimal('50000.00'),
+                priority_score=score, status='IN_QUEUE',
+            )
+        leaving = Application.objects.filter(priority_score__in=[60, 30])
+        ranks = list(leaving.values_list('queue_rank', flat=True))
+        ids = list(leaving.values_list('id', flat=True))
+        Application.objects.filter(id__in=ids).update(status='HOUSING_OFFERED', queue_rank=None)
+        close_rank_gaps(ranks)
+        self.assertRanksMatchOrdering()
+
+        Application.objects.filter(id__in=ids).update(status='IN_QUEUE')
+        insert_queue_ranks(ids)
+        self.assertRanksMatchOrdering()
+        self.assertEqual(total_ranked(), 7)
+
+    def test_leaving_queue_releases_rank(self):
+        """Test that an application leaving the queue closes its gap"""
+        application = self.applications[1]
+        application.status = 'HOUSING_OFFERED'
+        application.save()
+        application.refresh_from_db()
+        self.assertIsNone(application.queue_rank)
+        self.assertEqual(total_ranked(), 3)
+        self.assertRanksMatchOrdering()
+
+    def test_delete_releases_rank(self):
+        """Test that deleting a ranked application closes its gap"""
+        self.applications[0].delete()
+        self.assertRanksMatchOrdering()
+
+    def test_rebuild_after_bulk_update(self):
+        """Test that rebuild repairs ranks after updates that bypass save()"""
+        Application.objects.filter(pk=self.applications[3].pk).update(priority_score=99)
+        self.assertEqual(rebuild_queue_ranks(), 4)
+        self.assertRanksMatchOrdering()
+
+    def test_check_queue_uses_stored_rank(self):
+        """Test that the public queue check reports the stored rank"""
+        response = self.client.post(reverse('applications:check-queue'), {'iin': f'{3:012d}'})
+        self.assertEqual(response.context['queue_position'], 4)
+        self.assertEqual(response.context['total_queued_applications'], 4)
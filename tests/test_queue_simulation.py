@@ -0,0 +1,133 @@
+import datetime
+import os
+import shutil
+import tempfile
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from decimal import Decimal
+from io import StringIO
+from applications.models import Application
+from applications.simulation import forecast_inflow, load_estimates, project_offers
+from housing_units.models import HousingAllocation, HousingUnit
+from users.models import User
+
+
+class ProjectOffersTests(TestCase):
+    def reference(self, scores, first_anniversary, inflow, points):
+        """Month-by-month simulation with a full sort"""
+        offer_month = [-1] * len(scores)
+        for month, units in enumerate(inflow):
+            waiting = [i for i in range(len(scores)) if offer_month[i] < 0]
+            projected = {
+                i: scores[i] + points * (1 + (month - first_anniversary[i]) // 12 if month >= first_anniversary[i] else 0)
+                for i in waiting
+            }
+            for i in sorted(waiting, key=lambda i: (-projected[i], i))[:units]:
+                offer_month[i] = month
+        return offer_month
+
+    def test_matches_reference(self):
+        """Test the vectorized projection against a plain simulation"""
+        rng = np.random.default_rng(3)
+        for _ in range(50):
+            n = int(rng.integers(1, 60))
+            scores = rng.integers(0, 40, n)
+            first_anniversary = rng.integers(1, 13, n)
+            inflow = rng.integers(0, 4, 36)
+            self.assertEqual(
+                project_offers(scores, first_anniversary, inflow, 5).tolist(),
+                self.reference(scores.tolist(), first_anniversary.tolist(), inflow.tolist(), 5),
+            )
+
+    def test_waiting_years_growth(self):
+        """Test that an applicant overtakes a better score after their anniversary"""
+        months = project_offers([50, 52], [1, 6], [0, 1, 1], 5)
+        self.assertEqual(months.tolist(), [1, 2])
+        months = project_offers([50, 52], [1, 6], [1, 1], 5)
+        self.assertEqual(months.tolist(), [1, 0])
+
+
+@override_settings(QUEUE_SNAPSHOT_PATH='/nonexistent/queue.snapshot')
+class QueueSimulationTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        override = override_settings(QUEUE_ESTIMATES_PATH=os.path.join(self.tmpdir, 'wait_estimates.npy'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.today = timezone.localdate()
+        self.users = []
+        self.applications = []
+        for i, score in enumerate([90, 80, 70]):
+            user = User.objects.create_user(
+                email=f'applicant{i}@example.com',
+                password=None,
+                first_name='Applicant',
+                last_name=str(i),
+                phone_number='+1234567890',
+                iin=f'{i:012d}'
+            )
+            self.users.append(user)
+            self.applications.append(Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=score,
+                status='IN_QUEUE'
+            ))
+
+    def add_unit(self, number, **fields):
+        return HousingUnit.objects.create(unit_number=number, address='1 Housing Ave', floor=1,
+                                          total_area=Decimal('40.00'), rooms_count=1, **fields)
+
+    def months_ahead(self, months):
+        return datetime.date(self.today.year + (self.today.month - 1 + months) // 12,
+                             (self.today.month - 1 + months) % 12 + 1, 1)
+
+    def test_forecast_inflow(self):
+        """Test that known availability dates and the historical rate are combined"""
+        self.add_unit('A-1')
+        self.add_unit('O-1', status='OCCUPIED', next_available_date=self.months_ahead(2))
+        tenancy = self.add_unit('O-2', status='OCCUPIED')
+        HousingAllocation.objects.create(application=self.applications[0], housing_unit=tenancy,
+                                         status='ACTIVE', tenancy_end_date=self.months_ahead(3))
+        self.add_unit('R-1', status='RESERVED', next_available_date=self.months_ahead(1))
+        self.assertEqual(forecast_inflow(5, self.today).tolist(), [1, 0, 1, 1, 0])
+
+        # Twelve offers over the last 24 months: half a unit a month
+        unit = self.add_unit('H-1', status='OCCUPIED')
+        HousingAllocation.objects.bulk_create([
+            HousingAllocation(application=self.applications[1], housing_unit=unit, status='ACTIVE')
+            for _ in range(12)
+        ])
+        self.assertEqual(forecast_inflow(5, self.today).tolist(), [1, 0, 1, 1, 1])
+
+    def test_command_and_check_queue_page(self):
+        """Test that stored estimates are shown on the queue check page"""
+        self.add_unit('A-1')
+        self.add_unit('O-1', status='OCCUPIED', next_available_date=self.months_ahead(4))
+        call_command('simulate_queue', years=1, stdout=StringIO())
+
+        estimates = load_estimates()
+        months = estimates.offer_months(application.id for application in self.applications)
+        self.assertEqual(months, {
+            self.applications[0].id: self.months_ahead(0),
+            self.applications[1].id: self.months_ahead(4),
+            self.applications[2].id: None,
+        })
+
+        response = self.client.post(reverse('applications:check-queue'), {'iin': self.users[1].iin})
+        self.assertEqual(response.context['estimated_offer'], self.months_ahead(4))
+        self.assertContains(response, self.months_ahead(4).strftime('%B %Y'))
+        response = self.client.post(reverse('applications:check-queue'), {'iin': self.users[2].iin})
+        self.assertContains(response, 'Not expected within the projection period')
+
+    def test_dry_run(self):
+        """Test that a dry run stores nothing"""
+        call_command('simulate_queue', dry_run=True, stdout=StringIO())
+        self.assertIsNone(load_estimates())
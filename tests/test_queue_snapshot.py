@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from decimal import Decimal
+from applications.models import Application
+from applications.snapshot import load_snapshot
+from users.models import User
+
+
+class QueueSnapshotTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'queue.snapshot')
+        override = override_settings(QUEUE_SNAPSHOT_PATH=self.path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(
+            email='applicant@example.com',
+            password='testpass123',
+            first_name='John',
+            last_name='Doe',
+            phone_number='+1234567890',
+            iin='123456789012'
+        )
+        self.applications = [
+            Application.objects.create(
+                applicant=self.user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                priority_score=score,
+                status='IN_QUEUE'
+            )
+            for score in [10, 50, 30, 20, 40] * 3
+        ]
+
+    def test_snapshot_matches_ranks(self):
+        """Test that the snapshot holds the stored ranks in rank order"""
+        call_command('build_queue_snapshot', stdout=StringIO())
+        snapshot = load_snapshot()
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.count, 15)
+        self.assertEqual(snapshot.records['rank'].tolist(), list(range(1, 16)))
+        for application in Application.objects.all():
+            self.assertEqual(snapshot.rank_of(application.id), application.queue_rank)
+        self.assertIsNone(snapshot.rank_of(10 ** 9))
+
+    def test_rebuild_bumps_version(self):
+        """Test that rebuilding replaces the mapped snapshot with a new version"""
+        call_command('build_queue_snapshot', stdout=StringIO())
+        Application.objects.filter(pk=self.applications[0].pk).update(status='HOUSING_OFFERED', queue_rank=None)
+        call_command('build_queue_snapshot', stdout=StringIO())
+        snapshot = load_snapshot()
+        self.assertEqual(snapshot.version, 2)
+        self.assertEqual(snapshot.count, 14)
+
+    def test_queue_members_from_snapshot(self):
+        """Test that the public queue reads ranks from the snapshot"""
+        call_command('build_queue_snapshot', stdout=StringIO())
+        # Ranks moving after the snapshot are not visible until the next build
+        Application.objects.update(queue_rank=None)
+        response = self.client.get(reverse('applications:queue_members'), {'queue_number_from': 3, 'queue_number_to': 14})
+        page = response.context['queue_members']
+        self.assertEqual([a.queue_number for a in page], list(range(3, 13)))
+        response = self.client.get(reverse('applications:queue_members'), {
+            'queue_number_from': 3, 'queue_number_to': 14, 'cursor': page.next_cursor
+        })
+        self.assertEqual([a.queue_number for a in response.context['queue_members']], [13, 14])
+        self.assertContains(response, 'snapshot v1')
+
+    def test_check_queue_from_snapshot(self):
+        """Test that the queue check reports the snapshot rank and total"""
+        call_command('build_queue_snapshot', stdout=StringIO())
+        response = self.client.post(reverse('applications:check-queue'), {'iin': '123456789012'})
+        self.assertEqual(response.context['queue_position'], 1)
+        self.assertEqual(response.context['total_queued_applications'], 15)
@@ -0,0 +1,82 @@
+import random
+from io import StringIO
+from decimal import Decimal
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from applications.models import Application
+from applications.ranking import RANK_ORDERING
+from users.models import User
+
+
+class RescoreQueueCommandTests(TestCase):
+    def setUp(self):
+        """Create applications covering the income, space and flag bands"""
+        rng = random.Random(42)
+        user = User.objects.create_user(
+            email='applicant@example.com',
+            password='testpass123',
+            first_name='John',
+            last_name='Doe',
+            phone_number='+1234567890'
+        )
+        incomes = ['0.00', '49999.99', '50000.00', '85000.00', '99999.99', '100000.00', '250000.00']
+        areas = [None, '0.00', '17.99', '18.00', '29.99', '30.00', '44.99', '45.00', '120.00']
+        for i in range(60):
+            area = rng.choice(areas)
+            Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal(rng.choice(incomes)),
+                current_living_area=Decimal(area) if area is not None else None,
+                adults_count=rng.randint(0, 2),
+                children_count=rng.randint(0, 3),
+                elderly_count=rng.randint(0, 1),
+                has_disability=rng.random() < 0.3,
+                is_veteran=rng.random() < 0.3,
+                is_single_parent=rng.random() < 0.3,
+                waiting_years=rng.randint(0, 10),
+                status=rng.choice(['SUBMITTED', 'IN_QUEUE', 'IN_QUEUE']),
+            )
+
+    def test_matches_calculate_priority(self):
+        """Test that bulk scores equal the per-row model implementation"""
+        call_command('rescore_queue', chunk_size=7, stdout=StringIO())
+        for application in Application.objects.all():
+            self.assertEqual(application.priority_score, application.calculate_priority())
+
+    def test_ranks_follow_new_scores(self):
+        """Test that ranks are rewritten in canonical order after rescoring"""
+        call_command('rescore_queue', stdout=StringIO())
+        expected = list(Application.objects.filter(status='IN_QUEUE').order_by(*RANK_ORDERING).values_list('id', flat=True))
+        actual = list(Application.objects.filter(queue_rank__isnull=False).order_by('queue_rank').values_list('id', flat=True))
+        self.assertEqual(actual, expected)
+
+    def test_reads_under_rank_lock(self):
+        """Test that rows are read after the rank lock is taken, so changes made before it are not overwritten"""
+        application = Application.objects.filter(status='IN_QUEUE').first()
+
+        def concurrent_change():
+            # A change committed just before the lock is granted
+            Application.objects.filter(pk=application.pk).update(
+                monthly_income=Decimal('0.00'), has_disability=True, is_veteran=True, waiting_years=20,
+            )
+
+        with mock.patch('applications.management.commands.rescore_queue.lock_ranking',
+                        side_effect=concurrent_change) as lock:
+            call_command('rescore_queue', stdout=StringIO())
+        lock.assert_called_once()
+        application.refresh_from_db()
+        self.assertEqual(application.priority_score, application.calculate_priority())
+        self.assertEqual(
+            list(Application.objects.filter(queue_rank__isnull=False).order_by('queue_rank').values_list('id', flat=True)),
+            list(Application.objects.filter(status='IN_QUEUE').order_by(*RANK_ORDERING).values_list('id', flat=True)),
+        )
+
+    def test_dry_run_does_not_write(self):
+        """Test that a dry run reports changes but leaves scores untouched"""
+        out = StringIO()
+        call_command('rescore_queue', dry_run=True, stdout=out)
+        self.assertIn('would change', out.getvalue())
+        self.assertFalse(Application.objects.exclude(priority_score=0).exists())
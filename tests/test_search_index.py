@@ -0,0 +1,90 @@
+from django.test import TestCase
+from django.urls import reverse
+from decimal import Decimal
+from unittest import mock
+from applications.models import Application, ApplicationSearchGram
+from applications.search import filter_applications
+from users.models import User
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                email=f'applicant{i}@example.com',
+                password='testpass123',
+                first_name=first_name,
+                last_name=last_name,
+                phone_number='+1234567890',
+                iin=iin
+            )
+            for i, (first_name, last_name, iin) in enumerate([
+                ('Aigerim', 'Bekova', '990101300123'),
+                ('Nurlan', 'Sadykov', '850505400456'),
+                ('Aliya', 'Nurlanova', '010203500789'),
+            ])
+        ]
+        self.applications = [
+            Application.objects.create(
+                applicant=user,
+                current_address='123 Main St',
+                current_residence_condition='POOR',
+                monthly_income=Decimal('50000.00'),
+                status='IN_QUEUE'
+            )
+            for user in self.users
+        ]
+
+    def search(self, field, query):
+        return set(filter_applications(Application.objects.all(), field, query).values_list('id', flat=True))
+
+    def test_substring_matches(self):
+        """Test substring search on each indexed field"""
+        first, second, third = (a.id for a in self.applications)
+        self.assertEqual(self.search('iin', '0101'), {first})
+        self.assertEqual(self.search('iin', '00'), {first, second, third})  # shorter than a trigram
+        self.assertEqual(self.search('name', 'nurlan'), {second, third})
+        self.assertEqual(self.search('name', 'ov'), {first, second, third})
+        number = self.applications[1].application_number
+        self.assertEqual(self.search('number', number[-4:]), {second})
+
+    def test_number_prefix(self):
+        """Test that the shared number prefix is not indexed but still matches in queries"""
+        second = self.applications[1]
+        number = second.application_number
+        self.assertFalse(ApplicationSearchGram.objects.filter(field='number', gram='app').exists())
+        self.assertEqual(self.search('number', number), {second.id})
+        self.assertEqual(self.search('number', number.lower()[1:]), {second.id})
+        self.assertEqual(self.search('number', number[:3]), {a.id for a in self.applications})
+
+    def test_common_grams(self):
+        """Test that a query whose rarest gram is too common to fetch still matches exactly"""
+        first = self.applications[0].id
+        with mock.patch('applications.search.RARE_GRAM_LIMIT', 1):
+            self.assertEqual(self.search('iin', '0101'), {first})
+            self.assertEqual(self.search('name', 'nurlan'), {a.id for a in self.applications[1:]})
+
+    def test_no_false_positives(self):
+        """Test that sharing all trigrams is not enough to match"""
+        # '101' and '010' both occur in the first IIN but '1010' does not
+        self.assertEqual(self.search('iin', '1010'), set())
+
+    def test_user_changes_reindex(self):
+        """Test that editing the applicant's IIN or name updates the index"""
+        user = self.users[0]
+        user.iin = '777777777777'
+        user.save()
+        self.assertEqual(self.search('iin', '7777'), {self.applications[0].id})
+        self.assertEqual(self.search('iin', '0101'), set())
+
+    def test_score_saves_do_not_reindex(self):
+        """Test that saves not touching indexed fields leave the index alone"""
+        application = Application.objects.get(pk=self.applications[0].pk)
+        gram_ids = set(ApplicationSearchGram.objects.filter(application=application).values_list('id', flat=True))
+        application.calculate_priority()
+        self.assertEqual(set(ApplicationSearchGram.objects.filter(application=application).values_list('id', flat=True)), gram_ids)
+
+    def test_dashboard_filters(self):
+        """Test that the dashboard filters go through the index"""
+        response = self.client.get(reverse('dashboard:dashboard'), {'applicant_name': 'sadyk'})
+        self.assertEqual([a.id for a in response.context['applications']], [self.applications[1].id])
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from django.test import TestCase, override_settings
+from app_statistics.aggregates import SUMS, frame_group_stats, group_stats, rebuild_unit_aggregates
+from app_statistics.models import GroupAggregate
+from app_statistics.house_data import UNIT_DEFAULTS, normalize
+from app_statistics.loading import load_housing_units
+from app_statistics.views import load_statistics_frame
+from housing_units.models import HousingUnit
+from housing_units.signals import units_updated
+
+
+def housing_units_frame():
+    """Housing units as house_data.csv rows, the layout unit_groups and the GroupAggregate rows stand for"""
+    units = load_housing_units(['status', 'address', 'rooms_count', 'total_area'])
+    return pd.DataFrame({
+        'availability': units['status'].astype(object),
+        'location': units['address'],
+        'size': units['rooms_count'].astype(str) + ' BHK',
+        'total_sqft': units['total_area'],
+        **UNIT_DEFAULTS,
+    })
+
+
+class GroupAggregateTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        override = override_settings(HOUSE_DATA_CACHE_PATH=os.path.join(tmpdir, 'house_data.columns'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def create_unit(self, number, address, area, rooms=2, status='AVAILABLE'):
+        return HousingUnit.objects.create(unit_number=number, address=address, floor=1, total_area=Decimal(area),
+                                          rooms_count=rooms, status=status)
+
+    def aggregates(self):
+        rows = GroupAggregate.objects.filter(count__gt=0).values_list('dimension', 'group', *SUMS)
+        return {(dimension, group): np.round(sums, 6).tolist() for dimension, group, *sums in rows}
+
+    def assert_matches_rebuild(self):
+        incremental = self.aggregates()
+        rebuild_unit_aggregates()
+        self.assertEqual(incremental, self.aggregates())
+
+    def test_frame_stats(self):
+        """Test that group stats from sums match pandas groupby"""
+        df = pd.DataFrame({
+            'location': ['A', 'B', 'A', 'A', None], 'size': ['1 BHK', '2 BHK', '2 BHK', '2 BHK', '1 BHK'],
+            'availability': ['Ready'] * 5, 'area_type': ['Plot  Area'] * 5,
+            'bath': [1.0, 2.0, 2.0, np.nan, 1.0], 'balcony': [0.0, 1.0, 1.0, 2.0, 0.0],
+            'price': [40.0, 60.0, 120.0, 250.0, 10.0], 'sqft': [600.0, 900.0, 1500.0, 2400.0, 100.0],
+        })
+        stats = frame_group_stats(df)
+        grouped = df.groupby('location')['price']
+        pd.testing.assert_series_equal(stats['location']['price_mean'], grouped.mean(), check_names=False)
+        pd.testing.assert_series_equal(stats['location']['price_var'], grouped.var(), check_names=False)
+        self.assertEqual(stats['bath']['count'].to_dict(), {1.0: 2, 2.0: 2})
+        self.assertEqual(stats['size']['sqft_mean']['2 BHK'], 1600.0)
+
+    def test_incremental_updates(self):
+        """Test that saves, deletes and bulk status changes keep the aggregates equal to a rebuild"""
+        first = self.create_unit('U-1', '1 Abay Ave', '40.00')
+        second = self.create_unit('U-2', '1 Abay Ave', '60.50', rooms=3)
+        self.create_unit('U-3', '2 Abay Ave', '35.00', status='OCCUPIED')
+        self.assertEqual(self.aggregates()[('location', '1 Abay Ave')][:2], [2, 100.0])
+        self.assert_matches_rebuild()
+
+        first.address = '3 Abay Ave'
+        first.total_area = Decimal('45.00')
+        first.save()
+        self.assertEqual(self.aggregates()[('location', '1 Abay Ave')][0], 1)
+        self.assertEqual(self.aggregates()[('size', '2 BHK')][3], 80.0)
+        self.assert_matches_rebuild()
+
+        HousingUnit.objects.filter(pk=second.pk).update(status='RESERVED')
+        units_updated.send(HousingUnit, unit_ids=[second.pk], previous_status='AVAILABLE', status='RESERVED')
+        self.assertEqual(self.aggregates()[('availability', 'RESERVED')][0], 1)
+        self.assert_matches_rebuild()
+
+        second.delete()
+        self.assertNotIn(('location', '1 Abay Ave'), self.aggregates())
+        self.assertEqual(self.aggregates()[('bath', '1')][0], 2)
+        self.assert_matches_rebuild()
+
+        HousingUnit.objects.update(rooms_count=4)
+        units_updated.send(HousingUnit, unit_ids=None)
+        self.assertEqual(self.aggregates()[('size', '4 BHK')][0], 2)
+
+    def test_group_stats_merge_house_data(self):
+        """Test that group stats of house_data plus units equal those of the full statistics frame"""
+        self.create_unit('U-1', 'Whitefield', '1200.00')
+        self.create_unit('U-2', 'Nowhere Lane', '800.00', rooms=15, status='RESERVED')
+
+        units = normalize(housing_units_frame()).dropna(subset=['price', 'sqft'])
+        expected = frame_group_stats(pd.concat([load_statistics_frame(), units], ignore_index=True))
+        with self.assertNumQueries(1):
+            stats = group_stats()
+        for dimension, frame in expected.items():
+            pd.testing.assert_frame_equal(stats[dimension].sort_index(), frame.sort_index(), check_exact=False)
+        self.assertEqual(stats['location'].loc['Nowhere Lane', 'count'], 1)
+        self.assertEqual(stats['size'].loc['15 BHK', 'sqft_mean'], 800.0)
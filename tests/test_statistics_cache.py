@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from decimal import Decimal
+from app_statistics.render_cache import STATISTICS_KEY, cached_render, data_fingerprint
+from housing_units.models import HousingUnit
+
+
+# The single-flight lock cached_render takes for its default key
+LOCK_KEY = f'{STATISTICS_KEY}:lock'
+
+
+class RenderCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'house_data.csv')
+        with open(self.path, 'w') as f:
+            f.write('price\n1\n')
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return self.builds
+
+    def test_fingerprint(self):
+        """Test that editing the file or a housing unit changes the fingerprint"""
+        fingerprint = data_fingerprint(self.path)
+        self.assertEqual(data_fingerprint(self.path), fingerprint)
+        with open(self.path, 'a') as f:
+            f.write('2\n')
+        changed = data_fingerprint(self.path)
+        self.assertNotEqual(changed, fingerprint)
+        with self.captureOnCommitCallbacks(execute=True):
+            HousingUnit.objects.create(unit_number='U-1', address='1 Housing Ave', floor=1,
+                                       total_area=Decimal('40.00'), rooms_count=1)
+        self.assertNotEqual(data_fingerprint(self.path), changed)
+
+    def test_built_once_per_fingerprint(self):
+        """Test that a result is reused until the fingerprint changes"""
+        self.assertEqual(cached_render('a', self.build), 1)
+        self.assertEqual(cached_render('a', self.build), 1)
+        self.assertEqual(cached_render('b', self.build), 2)
+
+    def test_stale_copy_while_regenerating(self):
+        """Test that other workers serve the stale copy while one holds the lock"""
+        cached_render('a', self.build)
+        cache.add(LOCK_KEY, 'another worker', 60)
+        self.assertEqual(cached_render('b', self.build), 1)
+        self.assertEqual(self.builds, 1)
+        cache.delete(LOCK_KEY)
+        self.assertEqual(cached_render('b', self.build), 2)
+
+    def test_waits_without_copy(self):
+        """Test that without any copy a worker waits, then builds itself"""
+        cache.add(LOCK_KEY, 'another worker', 60)
+        start = time.monotonic()
+        self.assertEqual(cached_render('a', self.build, wait_timeout=0.3), 1)
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+
+
+class StatisticsPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        override = override_settings(HOUSE_DATA_CACHE_PATH=os.path.join(tmpdir, 'house_data.columns'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_warm_page(self):
+        """Test that a warm statistics export page is served without queries or re-rendering"""
+        response = self.client.get(reverse('app_statistics:statistics_export'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['plots']), 16)
+
+        with self.assertNumQueries(0), mock.patch('app_statistics.views.render_charts') as render_charts:
+            warm = self.client.get(reverse('app_statistics:statistics_export'))
+        render_charts.assert_not_called()
+        self.assertEqual(warm.context['plots'], response.context['plots'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HousingUnit.objects.create(unit_number='U-1', address='1 Housing Ave', floor=1,
+                                       total_area=Decimal('40.00'), rooms_count=1)
+        response = self.client.get(reverse('app_statistics:statistics_export'))
+        self.assertEqual(response.context['stats']['total'], warm.context['stats']['total'] + 1)